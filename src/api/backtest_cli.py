@@ -0,0 +1,72 @@
+# src/api/backtest_cli.py
+"""Offline backtest of a ``STRATEGY_MAP`` strategy over stored OHLCV files.
+
+    python -m src.api.backtest_cli --strategy Momentum --data data/BTC_USDT-1m.csv data/ETH_USDT-1m.npy
+"""
+import argparse
+import json
+import os
+import time
+import numpy as np
+from src.utils.logger import get_logger
+from src.trading.backtest import BacktestEngine, load_ohlcv, symbol_from_path
+from src.trading.strategies import STRATEGY_MAP
+
+logger = get_logger("BacktestCLI")
+
+
+def write_outputs(out_dir, results, timestamps, equity):
+    os.makedirs(out_dir, exist_ok=True)
+    np.savetxt(os.path.join(out_dir, "equity.csv"), np.column_stack((timestamps, equity)),
+               delimiter=",", header="timestamp,equity", comments="", fmt=["%d", "%.6f"])
+    with open(os.path.join(out_dir, "trades.csv"), "w") as f:
+        f.write("symbol,entry_ts,exit_ts,side,entry_price,exit_price,pnl\n")
+        for symbol, result in results.items():
+            for t in result.trades:
+                f.write(f"{symbol},{t['entry_ts']},{t['exit_ts']},{'buy' if t['side'] > 0 else 'sell'},"
+                        f"{t['entry_price']:.8f},{t['exit_price']:.8f},{t['pnl']:.6f}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest a strategy over stored OHLCV files")
+    parser.add_argument("--strategy", choices=sorted(STRATEGY_MAP), default="Scalping")
+    parser.add_argument("--data", nargs="+", required=True,
+                        help="CSV (timestamp,open,high,low,close,volume) or .npy files, or "
+                             "store:SYMBOL@TIMEFRAME from the local OHLCV store, one per symbol")
+    parser.add_argument("--params", default="{}", help='strategy parameters as JSON, e.g. \'{"threshold": 0.003}\'')
+    parser.add_argument("--balance", type=float, default=1000.0)
+    parser.add_argument("--trade-size", type=float, default=0.01, help="fraction of equity per position")
+    parser.add_argument("--fee", type=float, default=0.0006)
+    parser.add_argument("--slippage", type=float, default=0.0002)
+    parser.add_argument("--window", type=int, default=50)
+    parser.add_argument("--out", default=None, help="directory for equity.csv and trades.csv")
+    args = parser.parse_args()
+
+    strategy = STRATEGY_MAP[args.strategy](**json.loads(args.params))
+    engine = BacktestEngine(strategy, initial_balance=args.balance, trade_size=args.trade_size,
+                            fee_rate=args.fee, slippage=args.slippage, window=args.window)
+
+    started = time.perf_counter()
+    datasets = {symbol_from_path(path): load_ohlcv(path) for path in args.data}
+    loaded = time.perf_counter()
+    results, timestamps, equity = engine.run_many(datasets)
+    finished = time.perf_counter()
+
+    summary = {
+        "strategy": args.strategy,
+        "params": strategy.params(),
+        "bars": int(sum(len(c) for c in datasets.values())),
+        "load_seconds": round(loaded - started, 3),
+        "run_seconds": round(finished - loaded, 3),
+        "final_balance": float(equity[-1]) if equity.size else args.balance,
+        "symbols": [r.stats() for r in results.values()],
+    }
+    print(json.dumps(summary, indent=2))
+
+    if args.out:
+        write_outputs(args.out, results, timestamps, equity)
+        logger.info(f"Wrote equity curve and trade list to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
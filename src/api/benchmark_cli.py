@@ -0,0 +1,74 @@
+# src/api/benchmark_cli.py
+"""Benchmark the trading cycle against the simulated exchange and compare with the last run.
+
+    python -m src.api.benchmark_cli --pairs 10 100 1000 --timeframes 1 3 7 --cycles 5
+"""
+import argparse
+import json
+import os
+import sys
+
+# এক্সচেঞ্জ/লগার মডিউল ইমপোর্টের সময় env পড়ে, তাই আগে সেট করা হয়
+for _key, _value in {
+    "EXCHANGE_BACKEND": "sim",
+    "SIM_SOURCE": "synthetic",
+    "SIM_LATENCY": "0",
+    "SIM_LATENCY_JITTER": "0",
+    "SIM_HISTORY_BARS": "3000",
+    "PAPER_EXCHANGE": "sim",
+    "LOG_LEVEL": "WARNING",
+}.items():
+    os.environ.setdefault(_key, _value)
+
+from src.utils.logger import get_logger
+from src.trading.benchmark import (BENCH_ALLOC_CYCLES, BENCH_CYCLES, BENCH_PAIRS, BENCH_TIMEFRAME_COUNTS,
+                                   BENCH_TIMEFRAMES, REGRESSION_THRESHOLD, RESULTS_DIR, compare,
+                                   latest_report, run_benchmarks, save_report)
+from src.trading.strategies import STRATEGY_MAP
+
+logger = get_logger("BenchmarkCLI")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the trading cycle and strategies")
+    parser.add_argument("--pairs", type=int, nargs="+", default=BENCH_PAIRS)
+    parser.add_argument("--timeframes", type=int, nargs="+", default=BENCH_TIMEFRAME_COUNTS,
+                        choices=range(1, len(BENCH_TIMEFRAMES) + 1), help="timeframe counts per scenario")
+    parser.add_argument("--strategy", nargs="+", choices=sorted(STRATEGY_MAP), default=["Scalping"],
+                        help="several names run as one ensemble")
+    parser.add_argument("--cycles", type=int, default=BENCH_CYCLES)
+    parser.add_argument("--alloc-cycles", type=int, default=BENCH_ALLOC_CYCLES)
+    parser.add_argument("--cached", action="store_true", help="let back-to-back cycles hit the candle cache")
+    parser.add_argument("--no-micro", action="store_true", help="skip the strategy/risk micro-benchmarks")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    parser.add_argument("--out", default=RESULTS_DIR)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    previous_path, previous = latest_report(args.out)
+    report = run_benchmarks(args.pairs, args.timeframes, args.strategy, args.cycles,
+                            args.alloc_cycles, refetch=not args.cached, micro=not args.no_micro)
+    if previous:
+        report["baseline"] = os.path.basename(previous_path)
+        report["regressions"] = compare(report, previous, args.threshold)
+    path = save_report(report, args.out)
+
+    print(f"{'scenario':<10} {'jobs':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'cpu ms':>9} "
+          f"{'ex/cyc':>8} {'db/cyc':>8} {'peak KB':>9}")
+    for s in report["scenarios"]:
+        print(f"{s['name']:<10} {s['jobs']:>6} {s['latency_ms'].get('p50', 0):>9.1f} "
+              f"{s['latency_ms'].get('p95', 0):>9.1f} {s['latency_ms'].get('p99', 0):>9.1f} "
+              f"{s['cpu_ms'].get('p50', 0):>9.1f} {s['exchange_calls']:>8.0f} {s['db_calls']:>8.0f} "
+              f"{s['alloc_peak_kb'] or 0:>9.0f}")
+    if report.get("micro"):
+        print(json.dumps(report["micro"], indent=2))
+    for r in report.get("regressions", []):
+        print(f"REGRESSION {r['metric']}: {r['before']} -> {r['after']}")
+    logger.warning(f"Saved benchmark report to {path}")
+
+    if args.fail_on_regression and report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,10 @@ import dash
 from dash_extensions.enrich import Output, Input, State, html, dcc, callback
 import datetime
 import os
-import asyncio
 import requests
-from threading import Thread
 from dash import callback_context
 from src.utils.logger import get_logger
-from src.database.mongo import MongoDB
+from src.api.dashboard_data import get_data_service
 
 # Initialize logger
 logger = get_logger("Dashboard")
@@ -19,27 +17,24 @@ from patch_dash import PatchedDashProxy
 app = PatchedDashProxy(__name__, prevent_initial_callbacks=True)
 server = app.server
 
-# Initialize database
-db = MongoDB()
-
 # Configuration
 BASE_API_URL = os.getenv("BASE_API_URL", "http://localhost:8000")
+DATA_TIMEOUT = float(os.getenv("DASHBOARD_DATA_TIMEOUT", "20"))
 AVAILABLE_TIMEFRAMES = ['1m', '3m', '5m', '15m', '1h', '4h', '1d']
 AVAILABLE_STRATEGIES = ['Mean Reversion', 'Momentum', 'Scalping']
 
 # Reuse HTTP session to reduce latency on periodic health checks
 _http_session = requests.Session()
 
+@server.route("/cache-stats")
+def cache_stats():
+    return get_data_service().cache_stats()
+
 # Fetch Bitget futures pairs lazily to avoid blocking startup
 AVAILABLE_PAIRS = []
 def fetch_bitget_futures_pairs():
     try:
-        # Import locally to avoid heavy import at startup
-        import ccxt
-        bitget = ccxt.bitget()
-        markets = bitget.load_markets()
-        pairs = [m for m in markets if '/USDT' in m and markets[m].get('type') == 'swap']
-        return sorted(pairs)[:100]  # Limit to top 100 pairs
+        return get_data_service().load_pairs(100).result(DATA_TIMEOUT)  # Limit to top 100 pairs
     except Exception as e:
         logger.error(f"Error fetching pairs: {e}")
         return []
@@ -105,7 +100,8 @@ app.layout = html.Div([
                 dcc.Dropdown(
                     id='strategy-dropdown',
                     options=[{'label': s, 'value': s} for s in AVAILABLE_STRATEGIES],
-                    value='Scalping',
+                    value=['Scalping'],
+                    multi=True,
                     clearable=False,
                 ),
             ], className="col-md-3"),
@@ -232,6 +228,10 @@ def update_bot_status(n):
         pass
     return "স্ট্যাটাস: অজানা"
 
+def _log_save_error(future):
+    if not future.cancelled() and future.exception():
+        logger.error(f"সেটিংস সংরক্ষণে ত্রুটি: {future.exception()}")
+
 @callback(
     Output("apply-message", "children"),
     Input("apply-settings", "n_clicks"),
@@ -245,14 +245,19 @@ def update_bot_status(n):
     State("api-secret-input", "value"),
     prevent_initial_call=True
 )
-def save_settings(n_clicks, pairs, timeframes, strategy, strategy_mode, trade_mode, trade_size, api_key, api_secret):
+def save_settings(n_clicks, pairs, timeframes, strategies, strategy_mode, trade_mode, trade_size, api_key, api_secret):
     if not pairs or not timeframes:
         return "অনুগ্রহ করে অন্তত একটি পেয়ার এবং টাইমফ্রেম নির্বাচন করুন"
+    strategies = strategies if isinstance(strategies, list) else [strategies]
+    if not strategies:
+        return "অনুগ্রহ করে অন্তত একটি স্ট্র্যাটেজি নির্বাচন করুন"
     
     settings = {
         "pairs": pairs,
         "timeframes": timeframes,
-        "strategy": strategy,
+        "strategy": strategies[0],
+        # একাধিক স্ট্র্যাটেজি একই ডেটায় ভোট দেয়, সমান মূলধন বরাদ্দে
+        "strategies": [{"name": s, "allocation": 1.0} for s in strategies],
         "strategy_mode": strategy_mode,
         "trade_mode": trade_mode,
         "trade_size": trade_size / 100,
@@ -261,14 +266,8 @@ def save_settings(n_clicks, pairs, timeframes, strategy, strategy_mode, trade_mo
         "last_updated": datetime.datetime.utcnow()
     }
     
-    # Save to database in a thread
-    def save_to_db():
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(db.save_settings(settings))
-        loop.close()
-    
-    Thread(target=save_to_db).start()
+    # Save to database on the shared data loop without blocking the callback
+    get_data_service().save_settings(settings).add_done_callback(_log_save_error)
     return f"সেটিংস সংরক্ষিত! {len(pairs)} টি পেয়ারে {len(timeframes)} টি টাইমফ্রেমে ট্রেডিং"
 
 @callback(
@@ -278,12 +277,20 @@ def save_settings(n_clicks, pairs, timeframes, strategy, strategy_mode, trade_mo
 )
 def update_trade_logs(n):
     try:
-        trades = asyncio.run(db.get_trades(limit=20))
+        service = get_data_service()
+        # তিনটি কুয়েরি একসাথে যায়; ওপেন ট্রেড ও মোট হিসাব ইনডেক্স/রোলআপ থেকে আসে
+        trades_future = service.get_trades(limit=20)
+        open_future = service.get_trades(limit=20, status='open')
+        stats_future = service.get_trade_stats()
+        trades = trades_future.result(DATA_TIMEOUT)
         if not trades:
             return "কোন একটিভ ট্রেড নেই", "কোন ট্রেড হিস্টোরি নেই"
 
-        current_trades = [t for t in trades if t.get('status') == 'open']
-        trade_text = "\n".join([
+        current_trades = open_future.result(DATA_TIMEOUT)
+        stats = stats_future.result(DATA_TIMEOUT)
+        summary = (f"মোট: {stats.get('trades', 0)} ট্রেড | ভলিউম: ${stats.get('volume', 0):.2f} | "
+                   f"লাভ: ${stats.get('profit', 0):.2f} | জয়/পরাজয়: {stats.get('wins', 0)}/{stats.get('losses', 0)}")
+        trade_text = summary + "\n" + "\n".join([
             f"{t['timestamp'].strftime('%Y-%m-%d %H:%M')} | {t['pair']} | "
             f"{t['side'].upper()} | ${t.get('amount', 0):.2f} | "
             f"লাভ: ${t.get('profit', 0):.2f}"
@@ -314,15 +321,13 @@ def update_chart(pair, timeframes):
         return go.Figure()
 
     try:
-        # Fetch historical data lazily
-        from src.trading.data_fetcher import AsyncDataFetcher
-        fetcher = AsyncDataFetcher()
-        data = asyncio.run(fetcher.fetch_historical_data(pair, timeframes[0], 100))
+        # Candles come from the shared fetcher and its candle cache
+        data = get_data_service().fetch_ohlcv(pair, timeframes[0], 100).result(DATA_TIMEOUT)
 
         if not data:
             return go.Figure()
 
-        df = pd.DataFrame(data, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        df = pd.DataFrame(data.data, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
         df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
 
         fig = go.Figure(data=[go.Candlestick(
@@ -347,13 +352,6 @@ def update_chart(pair, timeframes):
         # Ensure failure does not break UI
         logger.error(f"চার্টে ত্রুটি: {e}")
         return go.Figure()
-    finally:
-        try:
-            # Close underlying exchange connection
-            from src.trading.data_fetcher import AsyncDataFetcher as _ADF  # noqa
-            asyncio.run(fetcher.close())
-        except Exception:
-            pass
 
 @callback(
     Output("dummy-output", "children"), 
@@ -1,8 +1,12 @@
 # src/api/bot_service.py
-from fastapi import FastAPI, BackgroundTasks
+import asyncio
+from fastapi import FastAPI, BackgroundTasks, Response
 from src.trading.bot import TradingBot
 from src.database.mongo import MongoDB
-from src.utils.logger import get_logger
+from src.utils.logger import get_logger, logging_stats
+from src.trading.exchange_registry import close_exchange_registry, get_exchange_registry
+from src.trading.rate_limiter import get_rate_limiter
+from src.utils.metrics import monitor_loop_lag, render_latest
 
 logger = get_logger("BotService")
 
@@ -10,14 +14,39 @@ app = FastAPI()
 db = MongoDB()
 bot = TradingBot(db)
 
+async def prepare_database():
+    # ইনডেক্স তৈরি আইডেমপোটেন্ট; ব্যর্থ হলে শুধু লগ হয়, বট তবুও চালু হয়।
+    # স্ট্যাটস রিবিল্ড শুধু এখান থেকে, ড্যাশবোর্ড ওয়ার্কাররা কখনো করে না
+    await db.ensure_indexes()
+    await db.rebuild_trade_stats(if_missing=True)
+
 @app.on_event("startup")
 async def startup_event():
+    app.state.loop_lag_task = asyncio.create_task(monitor_loop_lag())
+    # প্রথম ট্রেডের আগেই মার্কেট মেটাডেটা ও কানেকশন পুল প্রস্তুত থাকে
+    try:
+        await get_exchange_registry().warm()
+    except Exception as e:
+        logger.warning(f"Exchange warm-up failed: {e}")
+    # ইনডেক্স ও স্ট্যাটস ব্যাকগ্রাউন্ডে; মঙ্গো ধীর হলেও /health সাথে সাথে সাড়া দেয়
+    app.state.db_setup_task = asyncio.create_task(prepare_database())
     # avoid blocking startup if DB is slow
     try:
         await bot.update_settings()
     except Exception:
         pass
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    bot.stop()
+    # অর্ডার ড্রেন ও জার্নাল ফ্লাশ শেষ হলে তবেই ক্লায়েন্ট বন্ধ
+    await bot.wait_stopped()
+    for task in (app.state.loop_lag_task, app.state.db_setup_task):
+        task.cancel()
+    await asyncio.gather(app.state.loop_lag_task, app.state.db_setup_task, return_exceptions=True)
+    await db.close()
+    await close_exchange_registry()
+
 @app.post("/start")
 async def start_bot(background_tasks: BackgroundTasks):
     try:
@@ -34,7 +63,8 @@ async def stop_bot():
     try:
         if bot.running:
             bot.stop()
-            return {"status": "stopped"}
+            stopped = await bot.wait_stopped()
+            return {"status": "stopped" if stopped else "stopping"}
         return {"status": "not running"}
     except Exception as e:
         logger.error(f"Stop failed: {str(e)}")
@@ -43,7 +73,33 @@ async def stop_bot():
 @app.get("/health")
 async def health():
     try:
-        return {"status": "ok", "bot_running": bot.running}
+        return {
+            "status": "ok",
+            "bot_running": bot.running,
+            "last_cycle_seconds": round(bot.scanner.last_cycle_seconds, 3),
+            "last_cycle_jobs": bot.scanner.last_job_count,
+            "schedule": bot.schedule.stats(),
+            "trade_journal": db.journal.stats(),
+            "trade_stats": {**db.rollups.stats(), "indexes_ready": db.indexes_ready},
+            "orders": bot.orders.stats(),
+            "portfolio": bot.portfolio.stats(),
+            "shards": bot.shards.stats() if bot.shards else None,
+            "rate_limiter": get_rate_limiter().stats(),
+            "logging": logging_stats(),
+            "exchange": get_exchange_registry().stats(),
+        }
     except Exception as e:
         logger.error(f"Health check failed: {str(e)}")
-        return {"status": "error", "message": str(e)}
\ No newline at end of file
+        return {"status": "error", "message": str(e)}
+
+@app.get("/stats")
+async def trade_stats(mode: str = "*", pair: str = "*", day: str = "*"):
+    """Aggregated trade totals; ``*`` matches everything, ``day`` is YYYY-MM-DD"""
+    stats = await db.get_trade_stats(mode, pair, day)
+    stats.pop("_id", None)
+    return stats
+
+@app.get("/metrics")
+async def metrics():
+    body, content_type = render_latest()
+    return Response(content=body, media_type=content_type)
@@ -0,0 +1,134 @@
+# src/api/dashboard_data.py
+import asyncio
+import os
+import threading
+from src.trading.exchange_registry import close_exchange_registry, get_exchange_registry
+from src.utils.cache import AsyncTTLCache
+from src.utils.logger import get_logger
+
+logger = get_logger("DashboardData")
+
+CHART_CACHE_TTL = float(os.getenv("CHART_CACHE_TTL", "10"))
+TRADES_CACHE_TTL = float(os.getenv("TRADES_CACHE_TTL", "5"))
+
+
+class DashboardDataService:
+    """One long-lived event loop thread that owns the dashboard's Mongo and ccxt clients.
+
+    Dash callbacks run in gunicorn threads. They submit coroutines here and
+    block on the returned ``concurrent.futures.Future``, so no callback creates
+    its own event loop, Motor client or exchange client. Chart candles and
+    recent trades are cached with a TTL and identical concurrent requests
+    share one upstream call, so load does not grow with open browser tabs.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, name="dashboard-data-loop", daemon=True)
+        self._db = None
+        self._fetcher = None
+        self.chart_cache = AsyncTTLCache(CHART_CACHE_TTL)
+        self.trades_cache = AsyncTTLCache(TRADES_CACHE_TTL)
+        self.thread.start()
+        # পেয়ার লিস্টের জন্য মার্কেট ডেটা প্রথম রেন্ডারের আগেই লোড শুরু হয়
+        self.submit(self._warm()).add_done_callback(self._log_warm_error)
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    # ক্লায়েন্টগুলো লুপ থ্রেডের ভেতরেই তৈরি হয়, যাতে সেগুলো এই লুপে বাঁধা থাকে
+    def _get_db(self):
+        if self._db is None:
+            from src.database.mongo import MongoDB
+            self._db = MongoDB()
+            self.loop.create_task(self._db.ensure_indexes())
+        return self._db
+
+    def _get_fetcher(self):
+        if self._fetcher is None:
+            from src.trading.data_fetcher import AsyncDataFetcher
+            self._fetcher = AsyncDataFetcher()
+        return self._fetcher
+
+    async def _warm(self):
+        await get_exchange_registry().warm()
+
+    @staticmethod
+    def _log_warm_error(future):
+        if not future.cancelled() and future.exception() is not None:
+            logger.warning(f"Market metadata warm-up failed: {future.exception()}")
+
+    async def _get_trades(self, limit, status=None):
+        query = {"status": status} if status else None
+        return await self.trades_cache.get_or_load(
+            (limit, status), lambda: self._get_db().get_trades(query, limit=limit))
+
+    async def _get_trade_stats(self):
+        return await self.trades_cache.get_or_load("stats", lambda: self._get_db().get_trade_stats())
+
+    async def _save_settings(self, settings):
+        return await self._get_db().save_settings(settings)
+
+    async def _fetch_ohlcv(self, pair, timeframe, limit):
+        return await self.chart_cache.get_or_load(
+            (pair, timeframe, limit),
+            lambda: self._get_fetcher().fetch_historical_data(pair, timeframe, limit))
+
+    async def _load_pairs(self, limit):
+        markets = await get_exchange_registry().load_markets()
+        pairs = [m for m in markets if '/USDT' in m and markets[m].get('type') == 'swap']
+        return sorted(pairs)[:limit]
+
+    def get_trades(self, limit=20, status=None):
+        return self.submit(self._get_trades(limit, status))
+
+    def get_trade_stats(self):
+        return self.submit(self._get_trade_stats())
+
+    def save_settings(self, settings):
+        return self.submit(self._save_settings(settings))
+
+    def fetch_ohlcv(self, pair, timeframe, limit=100):
+        return self.submit(self._fetch_ohlcv(pair, timeframe, limit))
+
+    def load_pairs(self, limit=100):
+        return self.submit(self._load_pairs(limit))
+
+    def cache_stats(self):
+        return {"chart": self.chart_cache.stats(), "trades": self.trades_cache.stats()}
+
+    async def _close(self):
+        if self._fetcher is not None:
+            await self._fetcher.close()
+        await close_exchange_registry()
+        if self._db is not None:
+            await self._db.close()
+
+    def close(self, timeout=10):
+        try:
+            self.submit(self._close()).result(timeout)
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+_service = None
+_service_pid = None
+_service_lock = threading.Lock()
+
+
+def get_data_service():
+    """Return the process-wide service, starting it lazily.
+
+    gunicorn ``--preload`` forks workers after import and threads do not
+    survive a fork, so the service is recreated once per process.
+    """
+    global _service, _service_pid
+    with _service_lock:
+        if _service is None or _service_pid != os.getpid():
+            _service = DashboardDataService()
+            _service_pid = os.getpid()
+        return _service
@@ -0,0 +1,52 @@
+# src/api/optimize_cli.py
+"""Parameter sweep / walk-forward optimization over stored OHLCV files.
+
+    python -m src.api.optimize_cli --strategy Momentum --data data/BTC_USDT-1m.npy --mode grid --walk-forward 4
+"""
+import argparse
+import json
+from src.utils.logger import get_logger
+from src.trading.backtest import load_ohlcv, symbol_from_path
+from src.trading.optimizer import Optimizer, param_grid, param_samples, save_report, RESULTS_DIR
+from src.trading.strategies import STRATEGY_MAP, PARAM_SPACE
+
+logger = get_logger("OptimizeCLI")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Optimize strategy parameters over stored OHLCV files")
+    parser.add_argument("--strategy", choices=sorted(STRATEGY_MAP), default="Scalping")
+    parser.add_argument("--data", nargs="+", required=True)
+    parser.add_argument("--mode", choices=["grid", "random"], default="grid")
+    parser.add_argument("--samples", type=int, default=20, help="parameter sets for --mode random")
+    parser.add_argument("--space", default=None, help="JSON search space, defaults to PARAM_SPACE")
+    parser.add_argument("--walk-forward", type=int, default=0, help="number of walk-forward splits")
+    parser.add_argument("--train-fraction", type=float, default=0.7)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--score", choices=["total_return", "max_drawdown"], default="total_return")
+    parser.add_argument("--trade-size", type=float, default=0.01)
+    parser.add_argument("--fee", type=float, default=0.0006)
+    parser.add_argument("--slippage", type=float, default=0.0002)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--out", default=RESULTS_DIR)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    space = json.loads(args.space) if args.space else PARAM_SPACE[args.strategy]
+    if args.mode == "grid":
+        param_sets = param_grid(space)
+    else:
+        param_sets = param_samples(space, args.samples, args.seed)
+
+    datasets = {symbol_from_path(path): load_ohlcv(path) for path in args.data}
+    optimizer = Optimizer(args.strategy, datasets, workers=args.workers, score=args.score,
+                          trade_size=args.trade_size, fee_rate=args.fee, slippage=args.slippage)
+    report = optimizer.run(param_sets, n_splits=args.walk_forward, train_fraction=args.train_fraction)
+    path = save_report(report, args.out)
+
+    print(json.dumps(report["ranked"][:args.top], indent=2))
+    logger.info(f"Saved optimizer report to {path}")
+
+
+if __name__ == "__main__":
+    main()
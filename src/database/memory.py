@@ -0,0 +1,248 @@
+# src/database/memory.py
+import copy
+from collections import Counter
+from pymongo import ReplaceOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from src.utils.logger import get_logger
+from src.database.mongo import MongoDB
+from src.database.trade_journal import TradeJournal
+from src.database.trade_stats import TradeRollups
+
+logger = get_logger("InMemoryDB")
+
+OPERATORS = {
+    "$gt": lambda a, b: a is not None and a > b,
+    "$gte": lambda a, b: a is not None and a >= b,
+    "$lt": lambda a, b: a is not None and a < b,
+    "$lte": lambda a, b: a is not None and a <= b,
+    "$ne": lambda a, b: a != b,
+    "$in": lambda a, b: a in b,
+}
+
+
+def matches(doc, query):
+    """Top-level equality and comparison operators and ``$or``, enough for the bot's queries."""
+    for key, cond in (query or {}).items():
+        if key == "$or":
+            if not any(matches(doc, q) for q in cond):
+                return False
+            continue
+        value = doc.get(key)
+        if isinstance(cond, dict) and cond and all(k in OPERATORS for k in cond):
+            if not all(OPERATORS[op](value, arg) for op, arg in cond.items()):
+                return False
+        elif value != cond:
+            return False
+    return True
+
+
+def project(doc, projection):
+    if not projection:
+        return copy.deepcopy(doc)
+    keys = {k for k, v in projection.items() if v} | {"_id"}
+    return {k: copy.deepcopy(v) for k, v in doc.items() if k in keys}
+
+
+UPDATE_OPERATORS = {
+    "$set": lambda old, new: new,
+    "$inc": lambda old, new: (old or 0) + new,
+    "$min": lambda old, new: new if old is None else min(old, new),
+    "$max": lambda old, new: new if old is None else max(old, new),
+}
+
+
+def apply_update(doc, update):
+    for op, fields in update.items():
+        for key, value in fields.items():
+            doc[key] = UPDATE_OPERATORS[op](doc.get(key), copy.deepcopy(value))
+
+
+class InMemoryCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, key, direction=1):
+        self.docs.sort(key=lambda d: (d.get(key) is not None, d.get(key)), reverse=direction < 0)
+        return self
+
+    def limit(self, n):
+        if n:
+            self.docs = self.docs[:n]
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    async def to_list(self, length=None):
+        return self.docs[:length] if length else self.docs
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self.docs:
+            yield doc
+
+
+class InMemoryCollection:
+    """The subset of Motor's collection API the bot uses, backed by a list; counts calls per operation."""
+
+    def __init__(self, name, calls, database=None):
+        self.name = name
+        self.docs = []
+        self.calls = calls
+        self.database = database
+        # স্কিমা ভ্যালিডেটরের মতো: ডকুমেন্ট বাতিল হলে এরর মেসেজ, নইলে None
+        self.validator = None
+
+    def _count(self, op):
+        self.calls[f"{self.name}.{op}"] += 1
+
+    async def insert_many(self, docs, ordered=True):
+        """Per-document errors are raised together as a ``BulkWriteError``, like Mongo's."""
+        self._count("insert_many")
+        ids = {d.get("_id") for d in self.docs}
+        errors, inserted = [], 0
+        for i, doc in enumerate(docs):
+            reason = self.validator(doc) if self.validator is not None else None
+            if doc.get("_id") is not None and doc["_id"] in ids:
+                error = {"code": 11000, "errmsg": f"E11000 duplicate key error {self.name} _id"}
+            elif reason:
+                error = {"code": 121, "errmsg": f"Document failed validation: {reason}"}
+            else:
+                self.docs.append(copy.deepcopy(doc))
+                ids.add(doc.get("_id"))
+                inserted += 1
+                continue
+            errors.append({"index": i, "op": doc, **error})
+            if ordered:
+                break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "writeConcernErrors": [], "nInserted": inserted})
+
+    async def insert_one(self, doc):
+        self._count("insert_one")
+        self.docs.append(copy.deepcopy(doc))
+
+    async def find_one(self, query=None, projection=None):
+        self._count("find_one")
+        for doc in self.docs:
+            if matches(doc, query):
+                return project(doc, projection)
+        return None
+
+    def find(self, query=None, projection=None):
+        self._count("find")
+        return InMemoryCursor([project(d, projection) for d in self.docs if matches(d, query)])
+
+    async def replace_one(self, query, doc, upsert=False):
+        self._count("replace_one")
+        self._upsert(query, doc, True, upsert)
+
+    def _upsert(self, query, update, replace, upsert):
+        for i, existing in enumerate(self.docs):
+            if matches(existing, query):
+                if replace:
+                    self.docs[i] = {"_id": existing.get("_id"), **copy.deepcopy(update)}
+                else:
+                    apply_update(existing, update)
+                return
+        if upsert:
+            doc = {k: v for k, v in query.items() if not k.startswith("$") and not isinstance(v, dict)}
+            if "_id" in doc and any(d.get("_id") == doc["_id"] for d in self.docs):
+                raise DuplicateKeyError("E11000 duplicate key error", code=11000)
+            if replace:
+                doc.update(copy.deepcopy(update))
+            else:
+                apply_update(doc, update)
+            self.docs.append(doc)
+
+    async def update_one(self, query, update, upsert=False):
+        self._count("update_one")
+        self._upsert(query, update, False, upsert)
+
+    async def bulk_write(self, requests, ordered=True):
+        self._count("bulk_write")
+        # UpdateOne/ReplaceOne-এর ভেতরের ফিল্ডগুলোই pymongo নিজে ব্যবহার করে
+        for op in requests:
+            self._upsert(op._filter, op._doc, isinstance(op, ReplaceOne), op._upsert)
+
+    async def delete_many(self, query):
+        self._count("delete_many")
+        self.docs = [d for d in self.docs if not matches(d, query)]
+
+    async def delete_one(self, query):
+        self._count("delete_one")
+        for i, doc in enumerate(self.docs):
+            if matches(doc, query):
+                del self.docs[i]
+                return
+
+    async def drop(self):
+        self._count("drop")
+        self.docs = []
+
+    async def rename(self, new_name, dropTarget=False):
+        self._count("rename")
+        # মঙ্গোর মতো নাম ধরে: লক্ষ্য কালেকশনের অবজেক্ট একই থাকে, ডেটা বদলায়
+        target = self.database[new_name]
+        if target.docs and not dropTarget:
+            raise OperationFailure("target namespace exists", code=48)
+        target.docs, self.docs = self.docs, []
+
+    async def create_indexes(self, indexes):
+        self._count("create_indexes")
+        return [index.document["name"] for index in indexes]
+
+    async def count_documents(self, query=None):
+        self._count("count_documents")
+        return sum(1 for d in self.docs if matches(d, query))
+
+    def watch(self, *args, **kwargs):
+        # স্ট্যান্ডঅ্যালোন মঙ্গোর মতো: চেঞ্জ স্ট্রিম নেই, ওয়াচার পোলিং-এ যায়
+        raise OperationFailure("The $changeStream stage is only supported on replica sets", code=40573)
+
+
+class InMemoryDatabase:
+    def __init__(self):
+        self.calls = Counter()
+        self.collections = {}
+
+    def __getitem__(self, name):
+        collection = self.collections.get(name)
+        if collection is None:
+            collection = self.collections[name] = InMemoryCollection(name, self.calls, self)
+        return collection
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    async def list_collection_names(self):
+        return list(self.collections)
+
+    async def create_collection(self, name, **options):
+        return self[name]
+
+
+class InMemoryMongoDB(MongoDB):
+    """``MongoDB`` over in-process collections, for benchmarks and offline runs."""
+
+    def __init__(self, settings=None):
+        self.client = None
+        self.db = InMemoryDatabase()
+        self.rollups = TradeRollups(self.db.trade_stats)
+        self.journal = TradeJournal(self.db.trades, rollups=self.rollups)
+        self.indexes_ready = False
+        self.owner_id = f"memory-{id(self)}"
+        if settings:
+            self.db.settings.docs.append(dict(settings))
+        logger.info("Using in-memory database")
+
+    @property
+    def calls(self):
+        return self.db.calls
+
+    async def close(self):
+        await self.journal.stop()
@@ -1,41 +1,138 @@
+import datetime
 import os
+import socket
 import motor.motor_asyncio
+from bson import ObjectId
 from src.utils.logger import get_logger
-from pymongo.errors import PyMongoError
+from src.database.trade_journal import TradeJournal
+from src.database.trade_stats import ANY, TradeRollups, rollup_id
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import DuplicateKeyError, PyMongoError
 
 logger = get_logger("MongoDB")
 
+# নতুন ডাটাবেসে trades কালেকশন টাইম-সিরিজ হিসেবে তৈরি হবে (MongoDB 5.0+)
+TRADES_TIMESERIES = os.getenv("TRADES_TIMESERIES", "false").lower() in ("1", "true", "yes")
+
+# স্ট্যাটস রিবিল্ডের লিজ; একসাথে একটি প্রসেসই রিবিল্ড করে
+STATS_REBUILD_LEASE_TTL = float(os.getenv("STATS_REBUILD_LEASE_TTL", "600"))
+STATS_REBUILD_LEASE = "trade_stats_rebuild"
+
+# ড্যাশবোর্ড/API-তে যে ফিল্ডগুলো লাগে; strategies অ্যাট্রিবিউশনের মতো বড় ফিল্ড বাদ
+TRADE_FIELDS = {"pair": 1, "side": 1, "amount": 1, "price": 1, "filled": 1, "fee": 1, "profit": 1,
+                "status": 1, "mode": 1, "timestamp": 1}
+
+# প্রতিটি কুয়েরির ফিল্টার + timestamp সর্ট একটি ইনডেক্সেই মেটে
+TRADE_INDEXES = [
+    IndexModel([("timestamp", DESCENDING)], name="timestamp_desc"),
+    IndexModel([("pair", ASCENDING), ("timestamp", DESCENDING)], name="pair_timestamp"),
+    IndexModel([("status", ASCENDING), ("timestamp", DESCENDING)], name="status_timestamp"),
+    IndexModel([("mode", ASCENDING), ("timestamp", DESCENDING)], name="mode_timestamp"),
+]
+
 
 class MongoDB:
     def __init__(self):
         mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017")
         self.client = motor.motor_asyncio.AsyncIOMotorClient(mongo_uri)
         self.db = self.client["trading_bot_db"]
+        self.rollups = TradeRollups(self.db.trade_stats)
+        self.journal = TradeJournal(self.db.trades, rollups=self.rollups)
+        self.indexes_ready = False
+        self.owner_id = f"{socket.gethostname()}-{os.getpid()}"
         logger.info(f"Connected to MongoDB at {mongo_uri}")
 
     async def insert_trade(self, trade_data: dict):
-        """Insert a trade into the trades collection"""
+        """Queue a trade for a batched write to the trades collection; returns its _id"""
+        trade_id = await self.journal.append(trade_data)
+        logger.debug("Queued trade %s (%d pending)", trade_id, len(self.journal.buffer))
+        return trade_id
+
+    async def close(self):
+        """Flush pending trades and close the client"""
+        await self.journal.stop()
+        self.client.close()
+
+    async def ensure_indexes(self):
+        """Create the trades layout and indexes if missing; safe to call from every process"""
         try:
-            logger.debug(f"Inserting trade: {trade_data}")
-            result = await self.db.trades.insert_one(trade_data)
-            logger.info(f"Inserted trade with id {result.inserted_id}")
-            return result
+            if TRADES_TIMESERIES and "trades" not in await self.db.list_collection_names():
+                # টাইম-সিরিজে _id ইউনিক ইনডেক্স থাকে না; জার্নালের রিপ্লে তখন ডুপ্লিকেট ধরতে পারে না
+                await self.db.create_collection(
+                    "trades", timeseries={"timeField": "timestamp", "metaField": "pair", "granularity": "seconds"})
+                logger.info("Created trades as a time-series collection")
+            created = await self.db.trades.create_indexes(TRADE_INDEXES)
+            logger.debug("Trade indexes ready: %s", created)
+            self.indexes_ready = True
+        except PyMongoError as e:
+            logger.error(f"Mongo ensure_indexes error: {e}")
+        return self.indexes_ready
+
+    async def get_trade_stats(self, mode: str = ANY, pair: str = ANY, day: str = ANY):
+        """Pre-aggregated totals for one bucket (``*`` = all); a single lookup by _id"""
+        try:
+            return await self.rollups.get(mode, pair, day)
         except PyMongoError as e:
-            logger.error(f"Mongo insert_trade error: {e}")
+            logger.error(f"Mongo get_trade_stats error: {e}")
+            return {}
+
+    async def _take_lease(self, name, ttl):
+        # শর্তসাপেক্ষ upsert: অন্য প্রসেসের বৈধ লিজ থাকলে duplicate key
+        now = datetime.datetime.utcnow()
+        try:
+            await self.db.maintenance_leases.update_one(
+                {"_id": name, "$or": [{"owner": self.owner_id}, {"expires_at": {"$lte": now}}]},
+                {"$set": {"owner": self.owner_id, "expires_at": now + datetime.timedelta(seconds=ttl)}},
+                upsert=True,
+            )
+            return True
+        except DuplicateKeyError:
+            return False
+
+    async def _release_lease(self, name):
+        await self.db.maintenance_leases.delete_one({"_id": name, "owner": self.owner_id})
+
+    async def rebuild_trade_stats(self, if_missing: bool = False):
+        """Recompute the trade stats from the trades collection; returns the trade count or None if skipped
+
+        Only the API service calls this (at startup with ``if_missing``). A
+        lease keeps other processes out, and this process's journal is paused
+        so no trade is inserted or counted while the trades are scanned.
+        Other bot replicas must not be trading during an explicit rebuild.
+        """
+        try:
+            if not await self._take_lease(STATS_REBUILD_LEASE, STATS_REBUILD_LEASE_TTL):
+                logger.info("Trade stats rebuild already running elsewhere, skipping")
+                return None
+            try:
+                async with self.journal.paused():
+                    # আগের ডাটাবেসে স্ট্যাটস না থাকলে একবারই পুরো কালেকশন থেকে তৈরি হয়
+                    if if_missing and (await self.db.trade_stats.find_one({"_id": rollup_id()}) is not None
+                                       or await self.db.trades.find_one({}, {"_id": 1}) is None):
+                        return None
+                    return await self.rollups.rebuild(self.db.trades)
+            finally:
+                await self._release_lease(STATS_REBUILD_LEASE)
+        except PyMongoError as e:
+            logger.error(f"Mongo rebuild_trade_stats error: {e}")
             return None
 
-    async def get_trades(self, filter_query: dict = None, limit: int = 100):
-        """Fetch recent trades, sorted by timestamp desc"""
+    async def get_open_trades(self, limit: int = 100):
+        """Open trades, newest first, served by the status/timestamp index"""
+        return await self.get_trades({"status": "open"}, limit)
+
+    async def get_trades(self, filter_query: dict = None, limit: int = 100, projection: dict = TRADE_FIELDS):
+        """Fetch recent trades, sorted by timestamp desc; pass ``projection=None`` for full documents"""
         try:
             filter_query = filter_query or {}
-            logger.debug(f"Fetching trades with filter: {filter_query}")
+            logger.debug("Fetching trades with filter: %s", filter_query)
             cursor = (
-                self.db.trades.find(filter_query)
+                self.db.trades.find(filter_query, projection)
                 .sort("timestamp", -1)
                 .limit(limit)
             )
             result = await cursor.to_list(length=limit)
-            logger.debug(f"Fetched {len(result)} trades")
+            logger.debug("Fetched %d trades", len(result))
             return result
         except PyMongoError as e:
             logger.error(f"Mongo get_trades error: {e}")
@@ -46,7 +143,8 @@ class MongoDB:
         try:
             logger.debug("Fetching settings")
             result = await self.db.settings.find_one({})
-            logger.debug(f"Settings fetched: {result}")
+            # পুরো ডকুমেন্টে API key থাকে, তাই শুধু ভার্সন লগ হয়
+            logger.debug("Settings fetched (version %s)", result and result.get("version"))
             return result or {}
         except PyMongoError as e:
             logger.error(f"Mongo get_settings error: {e}")
@@ -55,7 +153,9 @@ class MongoDB:
     async def save_settings(self, settings_dict: dict):
         """Save/replace settings document"""
         try:
-            logger.debug(f"Saving settings: {settings_dict}")
+            logger.debug("Saving settings: %s", sorted(k for k in settings_dict if k not in ("api_key", "api_secret")))
+            # প্রতিটি সেভে নতুন version, যাতে পোলিং শুধু এই ফিল্ড তুলনা করতে পারে
+            settings_dict["version"] = str(ObjectId())
             result = await self.db.settings.replace_one(
                 {}, settings_dict, upsert=True
             )
@@ -0,0 +1,103 @@
+# src/database/settings_watcher.py
+import asyncio
+import os
+from pymongo.errors import OperationFailure, PyMongoError
+from src.utils.logger import get_logger
+
+logger = get_logger("SettingsWatcher")
+
+SETTINGS_POLL_INTERVAL = float(os.getenv("SETTINGS_POLL_INTERVAL", "10"))
+
+
+class SettingsWatcher:
+    """Caches the settings document and tracks which keys changed.
+
+    Updates arrive through a Mongo change stream. Standalone servers do not
+    support change streams, so there the watcher polls only the ``version``
+    field and fetches the full document when it changes.
+    """
+
+    def __init__(self, db, poll_interval=SETTINGS_POLL_INTERVAL):
+        self.db = db
+        self.poll_interval = poll_interval
+        self.settings = {}
+        self.mode = None
+        self._changed = set()
+        self._task = None
+
+    @staticmethod
+    def version_of(doc):
+        if not doc:
+            return None
+        # পুরোনো ডকুমেন্টে version না থাকলে last_updated ব্যবহার হয়
+        return doc.get("version") or doc.get("last_updated")
+
+    def _apply(self, doc):
+        if not doc:
+            # ফাঁকা ফলাফল (যেমন ক্ষণস্থায়ী ত্রুটি) ক্যাশ করা সেটিংস মুছে দেয় না
+            return set()
+        doc = {k: v for k, v in doc.items() if k != "_id"}
+        keys = set(doc) | set(self.settings)
+        changed = {k for k in keys if doc.get(k) != self.settings.get(k)}
+        if changed:
+            self.settings = doc
+            self._changed |= changed
+            logger.info(f"Settings changed: {sorted(k for k in changed if k not in ('api_key', 'api_secret'))}")
+        return changed
+
+    async def refresh(self):
+        """Read the settings document now and return ``(settings, changed_keys)``."""
+        self._apply(await self.db.get_settings())
+        return self.take_changes() or (self.settings, set())
+
+    def take_changes(self):
+        """Return ``(settings, changed_keys)`` accumulated since the last call, or None."""
+        if not self._changed:
+            return None
+        changed, self._changed = self._changed, set()
+        return self.settings, changed
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _watch(self):
+        while True:
+            try:
+                await self._watch_change_stream()
+            except OperationFailure as e:
+                logger.info(f"Change streams unavailable ({e.code}), polling settings version")
+                await self._poll()
+            except PyMongoError as e:
+                logger.error(f"Settings change stream error: {e}")
+                await asyncio.sleep(self.poll_interval)
+
+    async def _watch_change_stream(self):
+        async with self.db.db.settings.watch(full_document="updateLookup") as stream:
+            self.mode = "change_stream"
+            # স্ট্রিম খোলার আগের পরিবর্তন যেন হারিয়ে না যায়
+            self._apply(await self.db.get_settings())
+            async for change in stream:
+                if change["operationType"] == "delete":
+                    continue
+                self._apply(change.get("fullDocument"))
+
+    async def _poll(self):
+        self.mode = "poll"
+        while True:
+            try:
+                head = await self.db.db.settings.find_one({}, {"version": 1, "last_updated": 1})
+                if self.version_of(head) != self.version_of(self.settings):
+                    self._apply(await self.db.get_settings())
+            except PyMongoError as e:
+                logger.error(f"Settings poll error: {e}")
+            await asyncio.sleep(self.poll_interval)
@@ -0,0 +1,184 @@
+# src/database/shard_coordinator.py
+import asyncio
+import bisect
+import datetime
+import hashlib
+import os
+import socket
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+from src.utils.logger import get_logger
+
+logger = get_logger("ShardCoordinator")
+
+SHARDING_ENABLED = os.getenv("SHARDING_ENABLED", "false").lower() in ("1", "true", "yes")
+SHARD_LEASE_TTL = float(os.getenv("SHARD_LEASE_TTL", "30"))
+SHARD_VNODES = int(os.getenv("SHARD_VNODES", "64"))
+
+
+class HashRing:
+    """Consistent hash ring; adding or removing a node moves only ~1/N of the keys."""
+
+    def __init__(self, nodes=(), vnodes=SHARD_VNODES):
+        self.vnodes = vnodes
+        self.nodes = set()
+        self._hashes = []
+        self._owners = []
+        self.rebuild(nodes)
+
+    @staticmethod
+    def _hash(value):
+        return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+    def rebuild(self, nodes):
+        points = sorted(
+            (self._hash(f"{node}#{i}"), node) for node in nodes for i in range(self.vnodes)
+        )
+        self.nodes = set(nodes)
+        self._hashes = [h for h, _ in points]
+        self._owners = [node for _, node in points]
+
+    def owner(self, key):
+        if not self._hashes:
+            return None
+        i = bisect.bisect(self._hashes, self._hash(key)) % len(self._hashes)
+        return self._owners[i]
+
+
+class ShardCoordinator:
+    """Splits the pair universe across bot replicas with Mongo leases.
+
+    Every worker heartbeats into ``shard_workers`` and builds the same hash
+    ring from the live members. It leases the pairs the ring assigns to it in
+    ``pair_leases``; a lease is taken with a conditional upsert, so a pair
+    still leased by another worker fails with a duplicate key and is skipped
+    until that worker releases it or its lease expires. When a replica dies
+    its heartbeat and leases expire and the survivors pick up its pairs.
+
+    Shards are per pair, not per pair/timeframe, because trades are per pair.
+    ``owns`` stops reporting a pair one heartbeat before its lease ends, so an
+    owner that cannot renew stops trading before anyone else may take over.
+    """
+
+    def __init__(self, db, worker_id=None, lease_ttl=SHARD_LEASE_TTL, vnodes=SHARD_VNODES):
+        self.workers = db.db.shard_workers
+        self.leases = db.db.pair_leases
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.lease_ttl = datetime.timedelta(seconds=lease_ttl)
+        self.interval = lease_ttl / 3
+        self.ring = HashRing(vnodes=vnodes)
+        self.universe = []
+        self._leases = {}  # pair -> এই ওয়ার্কারের লিজ কখন শেষ হবে
+        self._task = None
+        self.rebalances = 0
+
+    @staticmethod
+    def _now():
+        return datetime.datetime.utcnow()
+
+    def set_universe(self, pairs):
+        self.universe = list(pairs)
+
+    def owns(self, pair, now=None):
+        expires = self._leases.get(pair)
+        if expires is None:
+            return False
+        now = now or self._now()
+        return (expires - now).total_seconds() > self.interval
+
+    def owned(self, pairs):
+        now = self._now()
+        return [p for p in pairs if self.owns(p, now)]
+
+    def stats(self):
+        return {
+            "worker_id": self.worker_id,
+            "members": len(self.ring.nodes),
+            "universe": len(self.universe),
+            "owned": len(self.owned(self.universe)),
+            "rebalances": self.rebalances,
+        }
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            try:
+                await self.workers.create_index("expires_at", expireAfterSeconds=0)
+            except PyMongoError as e:
+                logger.warning(f"Could not create shard_workers TTL index: {e}")
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop heartbeating and hand every lease back so peers rebalance at once."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.release(list(self._leases))
+            await self.workers.delete_one({"_id": self.worker_id})
+        except PyMongoError as e:
+            logger.error(f"Shard release on stop failed: {e}")
+
+    async def _run(self):
+        while True:
+            try:
+                await self.heartbeat()
+            except PyMongoError as e:
+                # রিনিউ না হলে লোকাল লিজ নিজে থেকেই মেয়াদোত্তীর্ণ হয়, তাই ট্রেড বন্ধ থাকে
+                logger.error(f"Shard heartbeat failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def heartbeat(self):
+        now = self._now()
+        expires = now + self.lease_ttl
+        await self.workers.update_one(
+            {"_id": self.worker_id},
+            {"$set": {"expires_at": expires, "heartbeat_at": now}},
+            upsert=True,
+        )
+        docs = await self.workers.find({"expires_at": {"$gt": now}}, {"_id": 1}).to_list(length=None)
+        members = {d["_id"] for d in docs}
+        if members != self.ring.nodes:
+            self.ring.rebuild(members)
+            self.rebalances += 1
+            logger.info(f"Shard ring rebuilt with {len(members)} workers")
+
+        wanted = {p for p in self.universe if self.ring.owner(p) == self.worker_id}
+        await self.release([p for p in self._leases if p not in wanted])
+        await self._acquire(sorted(wanted), now, expires)
+
+    async def _acquire(self, pairs, now, expires):
+        if not pairs:
+            return
+        ops = [
+            UpdateOne(
+                {"_id": pair, "$or": [{"owner": self.worker_id}, {"expires_at": {"$lte": now}}]},
+                {"$set": {"owner": self.worker_id, "expires_at": expires}},
+                upsert=True,
+            )
+            for pair in pairs
+        ]
+        failed = set()
+        try:
+            await self.leases.bulk_write(ops, ordered=False)
+        except BulkWriteError as e:
+            # duplicate key মানে পেয়ারটি অন্য ওয়ার্কারের বৈধ লিজে আছে
+            failed = {err["index"] for err in e.details.get("writeErrors", [])}
+        for i, pair in enumerate(pairs):
+            if i in failed:
+                self._leases.pop(pair, None)
+            else:
+                if pair not in self._leases:
+                    logger.info(f"Acquired lease for {pair}")
+                self._leases[pair] = expires
+
+    async def release(self, pairs):
+        if not pairs:
+            return
+        for pair in pairs:
+            self._leases.pop(pair, None)
+        await self.leases.delete_many({"_id": {"$in": list(pairs)}, "owner": self.worker_id})
+        logger.info(f"Released leases for {len(pairs)} pairs")
@@ -0,0 +1,228 @@
+# src/database/trade_journal.py
+import asyncio
+import contextlib
+import os
+import shutil
+import time
+from bson import ObjectId, json_util
+from pymongo.errors import BulkWriteError, PyMongoError
+from src.utils.logger import get_logger
+from src.utils.metrics import MONGO_INSERT_LATENCY, MONGO_INSERTED
+from src.utils.paths import DATA_DIR
+
+logger = get_logger("TradeJournal")
+
+JOURNAL_BATCH_SIZE = int(os.getenv("JOURNAL_BATCH_SIZE", "100"))
+JOURNAL_FLUSH_INTERVAL = float(os.getenv("JOURNAL_FLUSH_INTERVAL", "1.0"))
+JOURNAL_SLOW_FLUSH = float(os.getenv("JOURNAL_SLOW_FLUSH", "0.5"))
+JOURNAL_MAX_BACKOFF = float(os.getenv("JOURNAL_MAX_BACKOFF", "30"))
+JOURNAL_SPILL_PATH = os.getenv("JOURNAL_SPILL_PATH", os.path.join(DATA_DIR, "trade_journal_spill.jsonl"))
+# মঙ্গো যে ট্রেড স্থায়ীভাবে ফিরিয়ে দেয় (ভ্যালিডেশন, বড় ডকুমেন্ট) সেগুলো রিপ্লে না হয়ে এখানে যায়
+JOURNAL_DEAD_LETTER_PATH = os.getenv(
+    "JOURNAL_DEAD_LETTER_PATH", os.path.join(DATA_DIR, "trade_journal_rejected.jsonl"))
+
+DUPLICATE_KEY = 11000
+
+
+class TradeJournal:
+    """Write-behind buffer for trade documents.
+
+    Trades are buffered in memory and written with unordered ``insert_many``
+    once ``batch_size`` trades are queued or ``flush_interval`` has passed.
+    Slow flushes stretch the interval. Batches that cannot be written go to an
+    append-only spill file, which is replayed after the next successful flush.
+    Each document gets its ``_id`` up front, so replays are idempotent.
+    Documents Mongo rejects individually (validation, size) would fail on
+    every replay, so they go to a dead-letter file instead of the spill.
+    Documents that were actually inserted are passed on to ``rollups`` so the
+    pre-aggregated trade stats stay in step with the collection.
+    """
+
+    def __init__(self, collection, batch_size=JOURNAL_BATCH_SIZE, flush_interval=JOURNAL_FLUSH_INTERVAL,
+                 spill_path=JOURNAL_SPILL_PATH, slow_flush=JOURNAL_SLOW_FLUSH, max_backoff=JOURNAL_MAX_BACKOFF,
+                 rollups=None, dead_letter_path=JOURNAL_DEAD_LETTER_PATH):
+        self.collection = collection
+        self.rollups = rollups
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spill_path = spill_path
+        self.replay_path = spill_path + ".replay"
+        self.dead_letter_path = dead_letter_path
+        self.slow_flush = slow_flush
+        self.max_backoff = max_backoff
+        self.buffer = []
+        self.interval = flush_interval
+        self.last_flush_latency = 0.0
+        self.flushed = 0
+        self.spilled = 0
+        self.rejected = 0
+        self.failures = 0
+        self._wake = None
+        self._task = None
+        self._flush_lock = None
+        self._stopping = False
+
+    def stats(self):
+        return {
+            "queue_depth": len(self.buffer),
+            "last_flush_latency": self.last_flush_latency,
+            "flush_interval": self.interval,
+            "flushed": self.flushed,
+            "spilled": self.spilled,
+            "rejected": self.rejected,
+            "failures": self.failures,
+            "spill_pending": self._spill_pending(),
+        }
+
+    async def append(self, trade_data: dict):
+        trade_data.setdefault("_id", ObjectId())
+        self.buffer.append(trade_data)
+        if self._task is None or self._task.done():
+            self._wake = self._wake or asyncio.Event()
+            self._flush_lock = self._flush_lock or asyncio.Lock()
+            self._task = asyncio.create_task(self._run())
+        if len(self.buffer) >= self.batch_size:
+            self._wake.set()
+        return trade_data["_id"]
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Write everything buffered so far; returns the number of trades written."""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            written = 0
+            while self.buffer:
+                batch = self.buffer[:self.batch_size]
+                del self.buffer[:len(batch)]
+                if not await self._write(batch):
+                    # মঙ্গো পৌঁছানো না গেলে বাকি বাফারও স্পিল ফাইলে যায়
+                    rest, self.buffer = self.buffer, []
+                    if rest:
+                        await self._spill(rest)
+                    return written
+                written += len(batch)
+            if written and self._spill_pending():
+                await self._replay_spill()
+            return written
+
+    @contextlib.asynccontextmanager
+    async def paused(self):
+        """Hold back flushes (trades keep buffering) for the duration of the block."""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            yield
+
+    async def _write(self, batch):
+        started = time.perf_counter()
+        inserted = batch
+        try:
+            await self.collection.insert_many(batch, ordered=False)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            # ডুপ্লিকেট আগেই লেখা ও গোনা হয়েছে, ব্যর্থগুলো রিপ্লের সময় গোনা হবে
+            rejected = {err["index"] for err in errors}
+            inserted = [doc for i, doc in enumerate(batch) if i not in rejected]
+            failed = [err for err in errors if err.get("code") != DUPLICATE_KEY]
+            if failed:
+                logger.error(f"Trade journal: {len(failed)} of {len(batch)} trades rejected, "
+                             f"moved to {self.dead_letter_path}")
+                await self._dead_letter([
+                    {"error": {"code": err.get("code"), "errmsg": err.get("errmsg")}, "trade": batch[err["index"]]}
+                    for err in failed])
+        except PyMongoError as e:
+            self.failures += 1
+            self.interval = min(self.interval * 2, self.max_backoff)
+            logger.error(f"Trade journal flush failed, spilling {len(batch)} trades: {e}")
+            await self._spill(batch)
+            return False
+
+        self.last_flush_latency = time.perf_counter() - started
+        self.flushed += len(inserted)
+        MONGO_INSERT_LATENCY.observe(self.last_flush_latency)
+        MONGO_INSERTED.inc(len(inserted))
+        if self.last_flush_latency > self.slow_flush:
+            # মঙ্গো ধীর হলে ফ্লাশের ব্যবধান বাড়ানো হয়, যাতে ব্যাচ বড় হয়
+            self.interval = min(self.interval * 2, self.max_backoff)
+        else:
+            self.interval = self.flush_interval
+        if self.rollups is not None and inserted:
+            await self.rollups.apply(inserted)
+        return True
+
+    @staticmethod
+    def _append_lines(path, docs):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a") as f:
+            for doc in docs:
+                f.write(json_util.dumps(doc) + "\n")
+
+    async def _spill(self, docs):
+        await asyncio.to_thread(self._append_lines, self.spill_path, docs)
+        self.spilled += len(docs)
+
+    async def _dead_letter(self, entries):
+        await asyncio.to_thread(self._append_lines, self.dead_letter_path, entries)
+        self.rejected += len(entries)
+
+    def _spill_pending(self):
+        return os.path.exists(self.spill_path) or os.path.exists(self.replay_path)
+
+    def _read_spill(self):
+        replay_path = self.replay_path
+        if os.path.exists(replay_path):
+            # আগের রিপ্লে মাঝপথে থেমে গেলে সেই ট্রেডগুলো ফেলে দেওয়া যাবে না; নতুন স্পিল তার সাথে যোগ হয়
+            if os.path.exists(self.spill_path):
+                with open(self.spill_path, "rb") as src, open(replay_path, "ab+") as dst:
+                    size = dst.seek(0, os.SEEK_END)
+                    if size:
+                        # অর্ধেক লেখা শেষ লাইনের সাথে নতুন লাইন জুড়ে না যায়
+                        dst.seek(size - 1)
+                        if dst.read(1) != b"\n":
+                            dst.write(b"\n")
+                    shutil.copyfileobj(src, dst)
+                os.remove(self.spill_path)
+        else:
+            os.replace(self.spill_path, replay_path)
+        docs = []
+        with open(replay_path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    docs.append(json_util.loads(line))
+                except ValueError:
+                    # ক্র্যাশের সময় অর্ধেক লেখা শেষ লাইন
+                    logger.warning(f"Skipping unreadable spilled trade line in {replay_path}")
+        return replay_path, docs
+
+    async def _replay_spill(self):
+        replay_path, docs = await asyncio.to_thread(self._read_spill)
+        logger.info(f"Replaying {len(docs)} spilled trades")
+        for i in range(0, len(docs), self.batch_size):
+            if not await self._write(docs[i:i + self.batch_size]):
+                # বাকি ট্রেডগুলো আবার স্পিল ফাইলে ফেরত যায়
+                await self._spill(docs[i + self.batch_size:])
+                break
+        os.remove(replay_path)
+
+    async def stop(self):
+        """Stop the background flusher and write out everything still buffered."""
+        self._stopping = True
+        try:
+            if self._task is not None and not self._task.done():
+                self._wake.set()
+                await self._task
+            self._task = None
+            await self.flush()
+        finally:
+            self._stopping = False
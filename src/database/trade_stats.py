@@ -0,0 +1,152 @@
+# src/database/trade_stats.py
+import datetime
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+from src.utils.logger import get_logger
+
+logger = get_logger("TradeStats")
+
+ANY = "*"
+COUNTERS = ("trades", "volume", "fees", "profit", "wins", "losses", "buys", "sells")
+
+
+def _number(value):
+    # এক্সচেঞ্জের info ফিল্ড (যেমন realizedPnl) স্ট্রিং হিসেবে আসতে পারে
+    try:
+        return float(value) if value is not None and not isinstance(value, bool) else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def rollup_id(mode=ANY, pair=ANY, day=ANY):
+    return f"{mode}|{pair}|{day}"
+
+
+class TradeRollups:
+    """Pre-aggregated trade counters, one document per (mode, pair, day) bucket.
+
+    Every batch the journal writes is folded into the ``*`` wildcard buckets
+    (all trades, per mode, per mode and pair, per mode and day) with one
+    unordered ``bulk_write`` of ``$inc`` upserts, so dashboard totals are a
+    single ``find_one`` by ``_id`` however many trades exist. Counters are
+    derived data: if an update is lost they drift until ``rebuild``
+    recomputes them from the trades collection.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.applied = 0
+        self.failures = 0
+
+    @staticmethod
+    def buckets(trade):
+        mode, pair = trade.get("mode") or ANY, trade.get("pair") or ANY
+        ts = trade.get("timestamp")
+        day = ts.strftime("%Y-%m-%d") if isinstance(ts, datetime.datetime) else ANY
+        return {rollup_id(), rollup_id(mode), rollup_id(mode, pair), rollup_id(mode, ANY, day)}
+
+    @staticmethod
+    def counters(trade):
+        profit = _number(trade.get("profit"))
+        return {
+            "trades": 1,
+            "volume": _number(trade.get("amount")),
+            "fees": _number(trade.get("fee")),
+            "profit": profit,
+            "wins": int(profit > 0),
+            "losses": int(profit < 0),
+            "buys": int(trade.get("side") == "buy"),
+            "sells": int(trade.get("side") == "sell"),
+        }
+
+    def _fold(self, trades):
+        """``{bucket_id: (counters, first_ts, last_ts)}`` summed over ``trades``."""
+        folded = {}
+        for trade in trades:
+            counters = self.counters(trade)
+            ts = trade.get("timestamp")
+            for key in self.buckets(trade):
+                entry = folded.get(key)
+                if entry is None:
+                    folded[key] = [dict(counters), ts, ts]
+                    continue
+                for name, value in counters.items():
+                    entry[0][name] += value
+                if ts is not None:
+                    entry[1] = ts if entry[1] is None else min(entry[1], ts)
+                    entry[2] = ts if entry[2] is None else max(entry[2], ts)
+        return folded
+
+    async def apply(self, trades):
+        """Add a batch of newly written trades to their buckets."""
+        folded = self._fold(trades)
+        if not folded:
+            return
+        requests = []
+        for key, (counters, first, last) in folded.items():
+            update = {"$inc": counters}
+            if first is not None:
+                update["$min"] = {"first": first}
+                update["$max"] = {"last": last}
+            requests.append(UpdateOne({"_id": key}, update, upsert=True))
+        try:
+            await self.collection.bulk_write(requests, ordered=False)
+            self.applied += len(trades)
+        except PyMongoError as e:
+            self.failures += 1
+            logger.error(f"Trade stats update failed for {len(trades)} trades: {e}")
+
+    async def get(self, mode=ANY, pair=ANY, day=ANY):
+        doc = await self.collection.find_one({"_id": rollup_id(mode, pair, day)})
+        if doc is None:
+            return dict.fromkeys(COUNTERS, 0)
+        return doc
+
+    async def rebuild(self, trades_collection, batch_size=1000):
+        """Recompute every bucket from ``trades_collection``.
+
+        The buckets go to a scratch collection that replaces the live one in
+        a single rename, so readers never see a half-built result. Trades
+        inserted during the scan would be missed or counted twice, so callers
+        keep the journal paused (see ``MongoDB.rebuild_trade_stats``).
+        """
+        projection = {"mode": 1, "pair": 1, "timestamp": 1, "amount": 1, "fee": 1, "profit": 1, "side": 1}
+        folded = {}
+        count = 0
+        batch = []
+        # ট্রেডগুলো টুকরো টুকরো পড়ে ফোল্ড হয়, পুরো কালেকশন মেমরিতে আসে না
+        async for trade in trades_collection.find({}, projection).batch_size(batch_size):
+            batch.append(trade)
+            if len(batch) >= batch_size:
+                self._merge(folded, self._fold(batch))
+                count += len(batch)
+                batch = []
+        self._merge(folded, self._fold(batch))
+        count += len(batch)
+        docs = [{"_id": key, **counters, "first": first, "last": last}
+                for key, (counters, first, last) in folded.items()]
+        if docs:
+            scratch = self.collection.database[f"{self.collection.name}_rebuild"]
+            await scratch.drop()
+            await scratch.insert_many(docs, ordered=False)
+            await scratch.rename(self.collection.name, dropTarget=True)
+        else:
+            await self.collection.delete_many({})
+        logger.info(f"Rebuilt {len(docs)} trade stats buckets from {count} trades")
+        return count
+
+    @staticmethod
+    def _merge(into, folded):
+        for key, (counters, first, last) in folded.items():
+            entry = into.get(key)
+            if entry is None:
+                into[key] = [counters, first, last]
+                continue
+            for name, value in counters.items():
+                entry[0][name] += value
+            if first is not None:
+                entry[1] = first if entry[1] is None else min(entry[1], first)
+                entry[2] = last if entry[2] is None else max(entry[2], last)
+
+    def stats(self):
+        return {"applied": self.applied, "failures": self.failures}
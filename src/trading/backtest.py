@@ -0,0 +1,191 @@
+# src/trading/backtest.py
+import os
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from src.utils.logger import get_logger
+from src.trading.risk_manager import RiskManager
+from src.trading.strategies import STRATEGY_MAP
+
+logger = get_logger("Backtest")
+
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+TRADE_DTYPE = np.dtype([
+    ('entry_ts', np.int64), ('exit_ts', np.int64), ('side', np.int8),
+    ('entry_price', np.float64), ('exit_price', np.float64), ('pnl', np.float64),
+])
+
+
+STORE_PREFIX = 'store:'
+
+
+def load_ohlcv(path):
+    """Load a ``timestamp, open, high, low, close, volume`` file as an ``n x 6`` float64 array.
+
+    ``.npy`` files are memory-mapped; CSV files need a header row with the column names.
+    ``store:SYMBOL@TIMEFRAME`` (e.g. ``store:BTC/USDT:USDT@1m``) is a memory-mapped
+    view of the local OHLCV store.
+    """
+    if path.startswith(STORE_PREFIX):
+        from src.trading.ohlcv_store import OHLCVStore
+        symbol, timeframe = path[len(STORE_PREFIX):].rsplit('@', 1)
+        return OHLCVStore().candles(symbol, timeframe)
+    if path.endswith('.npy'):
+        return np.load(path, mmap_mode='r')
+    import pandas as pd
+    df = pd.read_csv(path, usecols=OHLCV_COLUMNS)
+    return np.ascontiguousarray(df[OHLCV_COLUMNS].to_numpy(dtype=np.float64))
+
+
+class BacktestResult:
+    def __init__(self, symbol, timestamps, equity, trades, initial_balance):
+        self.symbol = symbol
+        self.timestamps = timestamps
+        self.equity = equity
+        self.trades = trades
+        self.initial_balance = initial_balance
+
+    def stats(self):
+        equity = self.equity
+        if equity.size == 0:
+            return {"symbol": self.symbol, "trades": 0}
+        peak = np.maximum.accumulate(equity)
+        drawdown = (equity - peak) / peak
+        returns = np.diff(equity) / equity[:-1] if equity.size > 1 else np.zeros(1)
+        std = returns.std()
+        pnl = self.trades['pnl']
+        return {
+            "symbol": self.symbol,
+            "final_balance": float(equity[-1]),
+            "total_return": float(equity[-1] / self.initial_balance - 1),
+            "max_drawdown": float(drawdown.min()),
+            "sharpe_per_bar": float(returns.mean() / std) if std > 0 else 0.0,
+            "trades": int(pnl.size),
+            "win_rate": float((pnl > 0).mean()) if pnl.size else 0.0,
+        }
+
+
+class BacktestEngine:
+    """Replays OHLCV arrays through a ``STRATEGY_MAP`` strategy and ``RiskManager``.
+
+    Signals are computed for every bar in one ``analyze_many`` call over a
+    sliding window of closes, the same window length the bot uses (at least
+    ``strategy.min_bars``). A signal on
+    bar ``t`` is filled at the open of bar ``t + 1`` with slippage and fees, and
+    the position is held until an opposite signal. Each position is sized at
+    ``trade_size`` of the current equity, like the paper trades of the bot.
+    """
+
+    def __init__(self, strategy, risk_manager=None, initial_balance=1000.0, trade_size=0.01,
+                 fee_rate=0.0006, slippage=0.0002, window=50, volatility_window=100):
+        if isinstance(strategy, str):
+            strategy = STRATEGY_MAP[strategy]()
+        self.strategy = strategy
+        self.risk_manager = risk_manager or RiskManager()
+        self.initial_balance = initial_balance
+        self.trade_size = trade_size
+        self.fee_rate = fee_rate
+        self.slippage = slippage
+        # ছোট উইন্ডোতে analyze_many সব শূন্য দেয়, তখন ব্যাকটেস্ট নীরবে "কোনো ট্রেড নেই" দেখাত
+        self.window = max(window, strategy.min_bars)
+        self.volatility_window = volatility_window
+
+    def generate_signals(self, candles):
+        closes = np.ascontiguousarray(candles[:, 4], dtype=np.float64)
+        signals = np.zeros(closes.shape[0], dtype=np.int8)
+        if closes.shape[0] < self.window:
+            return signals
+        windows = sliding_window_view(closes, self.window)
+        signals[self.window - 1:] = self.strategy.analyze_many(windows)
+
+        volatility = self.risk_manager.rolling_volatility(closes, self.volatility_window)
+        accepted = self.risk_manager.should_accept_trades(
+            self.trade_size * self.initial_balance, volatility, self.initial_balance)
+        signals[~accepted] = 0
+        return signals
+
+    def positions(self, signals):
+        """Position held during each bar: the last accepted signal, entered one bar later."""
+        idx = np.where(signals != 0, np.arange(signals.shape[0]), -1)
+        idx = np.maximum.accumulate(idx)
+        held = np.where(idx >= 0, signals[np.maximum(idx, 0)], 0).astype(np.int8)
+        position = np.zeros_like(held)
+        position[1:] = held[:-1]
+        return position
+
+    def run(self, candles, symbol="", initial_balance=None):
+        candles = np.asarray(candles, dtype=np.float64)
+        balance = self.initial_balance if initial_balance is None else initial_balance
+        ts, opens, closes = candles[:, 0], candles[:, 1], candles[:, 4]
+        n = candles.shape[0]
+        if n < 2:
+            return BacktestResult(symbol, ts.astype(np.int64), np.full(n, balance),
+                                  np.zeros(0, dtype=TRADE_DTYPE), balance)
+
+        position = self.positions(self.generate_signals(candles)).astype(np.float64)
+        prev_position = np.concatenate(([0.0], position[:-1]))
+        prev_close = np.concatenate(([opens[0]], closes[:-1]))
+
+        # গ্যাপ অংশে পুরোনো পজিশন, বারের ভেতরে নতুন পজিশন
+        bar_return = (prev_position * (opens / prev_close - 1)
+                      + position * (closes / opens - 1))
+        turnover = np.abs(position - prev_position)
+        cost = turnover * (self.fee_rate + self.slippage)
+        growth = 1 + self.trade_size * (bar_return - cost)
+        equity = balance * np.cumprod(growth)
+
+        trades = self._trades(ts, opens, closes, position, equity, balance)
+        return BacktestResult(symbol, ts.astype(np.int64), equity, trades, balance)
+
+    def _trades(self, ts, opens, closes, position, equity, balance):
+        changes = np.flatnonzero(np.diff(np.concatenate(([0.0], position, [0.0]))))
+        # প্রতিটি পরিবর্তন একটি পজিশন বন্ধ করে আরেকটি খোলে
+        starts = changes[:-1]
+        ends = changes[1:]
+        sides = position[np.minimum(starts, position.shape[0] - 1)]
+        mask = sides != 0
+        starts, ends, sides = starts[mask], ends[mask], sides[mask]
+
+        last = ts.shape[0] - 1
+        exit_idx = np.minimum(ends, last)
+        entry_price = opens[starts] * (1 + sides * self.slippage)
+        # শেষ বার পর্যন্ত খোলা পজিশন শেষ ক্লোজে বন্ধ ধরা হয়
+        exit_price = np.where(ends <= last, opens[exit_idx], closes[last]) * (1 - sides * self.slippage)
+        equity_before = np.concatenate(([balance], equity))[starts]
+        notional = equity_before * self.trade_size
+        pnl = notional * (sides * (exit_price / entry_price - 1) - 2 * self.fee_rate)
+
+        trades = np.zeros(starts.shape[0], dtype=TRADE_DTYPE)
+        trades['entry_ts'] = ts[starts]
+        trades['exit_ts'] = ts[exit_idx]
+        trades['side'] = sides
+        trades['entry_price'] = entry_price
+        trades['exit_price'] = exit_price
+        trades['pnl'] = pnl
+        return trades
+
+    def run_many(self, datasets):
+        """Backtest ``{symbol: candles}`` with the balance split equally across symbols.
+
+        Returns the per-symbol results and the combined equity curve on the union
+        of all timestamps (each symbol's equity is carried forward between its bars).
+        """
+        allocation = self.initial_balance / max(len(datasets), 1)
+        results = {symbol: self.run(candles, symbol, allocation)
+                   for symbol, candles in datasets.items()}
+        if not results:
+            return results, np.zeros(0, dtype=np.int64), np.zeros(0)
+
+        timestamps = np.unique(np.concatenate([r.timestamps for r in results.values()]))
+        total = np.zeros(timestamps.shape[0])
+        for r in results.values():
+            pos = np.searchsorted(r.timestamps, timestamps, side='right') - 1
+            total += np.where(pos >= 0, r.equity[np.maximum(pos, 0)], allocation)
+        logger.info(f"Backtested {len(results)} symbols over {timestamps.shape[0]} bars")
+        return results, timestamps, total
+
+
+def symbol_from_path(path):
+    if path.startswith(STORE_PREFIX):
+        return path[len(STORE_PREFIX):].rsplit('@', 1)[0]
+    return os.path.splitext(os.path.basename(path))[0]
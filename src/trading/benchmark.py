@@ -0,0 +1,325 @@
+# src/trading/benchmark.py
+"""End-to-end and micro benchmarks of the trading cycle.
+
+Scenarios drive ``TradingBot.run`` against the ``SimulatedExchange`` and an
+``InMemoryMongoDB``, so they need ``EXCHANGE_BACKEND=sim`` in the
+environment before ``src.trading.exchange_registry`` is imported (the CLI
+sets it). Results are saved as JSON and compared with the previous run.
+"""
+import asyncio
+import datetime
+import glob
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+from src.utils.logger import get_logger
+from src.utils.paths import ROOT_DIR
+from src.database.memory import InMemoryMongoDB
+from src.trading.bot import TradingBot
+from src.trading.exchange_registry import close_exchange_registry, get_exchange_registry
+from src.trading.portfolio_risk import PortfolioRisk
+from src.trading.rate_limiter import BITGET_LIMITS, RateLimitScheduler, set_rate_limiter
+from src.trading.risk_manager import RiskManager
+from src.trading.strategies import STRATEGY_MAP
+
+logger = get_logger("Benchmark")
+
+RESULTS_DIR = os.getenv("BENCH_RESULTS_DIR", os.path.join(ROOT_DIR, "results", "benchmarks"))
+BENCH_PAIRS = [10, 100, 1000]
+BENCH_TIMEFRAME_COUNTS = [1, 3, 7]
+BENCH_TIMEFRAMES = ["1m", "3m", "5m", "15m", "30m", "1h", "2h"]
+BENCH_CYCLES = int(os.getenv("BENCH_CYCLES", "5"))
+BENCH_ALLOC_CYCLES = int(os.getenv("BENCH_ALLOC_CYCLES", "2"))
+# আগের রানের চেয়ে এত ভাগ খারাপ হলে রিগ্রেশন
+REGRESSION_THRESHOLD = float(os.getenv("BENCH_REGRESSION_THRESHOLD", "0.10"))
+
+
+def bench_pairs(n):
+    """``n`` distinct linear swap symbols for the simulator."""
+    return [f"B{i:04d}/USDT:USDT" for i in range(n)]
+
+
+def percentiles(values, scale=1000.0):
+    """p50/p95/p99/mean/max of ``values`` (seconds) in milliseconds."""
+    values = np.asarray(values, dtype=np.float64) * scale
+    if not len(values):
+        return {}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"p50": round(float(p50), 3), "p95": round(float(p95), 3), "p99": round(float(p99), 3),
+            "mean": round(float(values.mean()), 3), "max": round(float(values.max()), 3)}
+
+
+class CycleProbe:
+    """Wraps ``bot.scanner.scan_jobs`` to sample every scan cycle and stop the bot after the last one.
+
+    Every job is made due before each cycle, as at a boundary where all
+    timeframes close together, so a cycle covers the whole universe. The
+    first cycle only warms caches and indicator state. With ``refetch``
+    every later cycle starts with the candle cache marked stale, as in live
+    polling once a bar has moved on, so each job does its incremental
+    fetch; without it back-to-back cycles are served from the cache. The
+    next ``cycles`` are timed; DB and
+    exchange calls are counted from one cycle start to the next, so order
+    execution and background tasks triggered by a cycle are included. The
+    last ``alloc_cycles`` run under ``tracemalloc``, which is slow, so their
+    timings are not used.
+    """
+
+    def __init__(self, bot, db, exchange, cycles=BENCH_CYCLES, alloc_cycles=BENCH_ALLOC_CYCLES, refetch=True):
+        self.bot = bot
+        self.refetch = refetch
+        self.db = db
+        self.exchange = exchange
+        self.cycles = cycles
+        self.alloc_cycles = alloc_cycles
+        self.scan = bot.scanner.scan_jobs
+        self.wait_due = bot.schedule.wait_due
+        self.seen = 0
+        self.first_cycle = None
+        self.wall = []
+        self.cpu = []
+        self.db_calls = []
+        self.exchange_calls = []
+        self.alloc_peak = []
+        self.alloc_blocks = []
+        self._db_ops = None
+        self._exchange_ops = None
+        self._mark = None
+        bot.scanner.scan_jobs = self
+        bot.schedule.wait_due = self._all_due
+
+    def _counts(self):
+        return sum(self.db.calls.values()), sum(self.exchange.calls.values())
+
+    async def _all_due(self, timeout=None):
+        self.bot.schedule.reset()
+        return await self.wait_due(timeout)
+
+    async def __call__(self, jobs, worker):
+        done, self.seen = self.seen, self.seen + 1
+        if self.refetch:
+            for ring in self.bot.data_fetcher.cache.series.values():
+                ring.last_fetch = 0.0
+        counts = self._counts()
+        if self._mark is not None and 1 < done <= self.cycles + 1:
+            self.db_calls.append(counts[0] - self._mark[0])
+            self.exchange_calls.append(counts[1] - self._mark[1])
+        if done == 1:
+            self._db_ops, self._exchange_ops = dict(self.db.calls), dict(self.exchange.calls)
+        elif done == self.cycles + 1:
+            self._db_ops = {k: v - self._db_ops.get(k, 0) for k, v in self.db.calls.items()}
+            self._exchange_ops = {k: v - self._exchange_ops.get(k, 0) for k, v in self.exchange.calls.items()}
+        self._mark = counts
+
+        traced = done > self.cycles
+        if traced:
+            tracemalloc.start()
+            blocks = sys.getallocatedblocks()
+        wall, cpu = time.perf_counter(), time.process_time()
+        results = await self.scan(jobs, worker)
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+
+        if traced:
+            self.alloc_peak.append(tracemalloc.get_traced_memory()[1])
+            self.alloc_blocks.append(sys.getallocatedblocks() - blocks)
+            tracemalloc.stop()
+        elif done == 0:
+            self.first_cycle = wall
+        else:
+            self.wall.append(wall)
+            self.cpu.append(cpu)
+
+        if self.seen > self.cycles + self.alloc_cycles:
+            self.bot.stop()
+        return results
+
+    def report(self):
+        jobs = self.bot.scanner.last_job_count
+        return {
+            "jobs": jobs,
+            "cycles": len(self.wall),
+            "first_cycle_ms": round((self.first_cycle or 0.0) * 1000, 3),
+            "latency_ms": percentiles(self.wall),
+            "cpu_ms": percentiles(self.cpu),
+            "db_calls": round(float(np.mean(self.db_calls)), 2) if self.db_calls else 0.0,
+            "exchange_calls": round(float(np.mean(self.exchange_calls)), 2) if self.exchange_calls else 0.0,
+            "db_operations": {k: v for k, v in sorted((self._db_ops or {}).items()) if v},
+            "exchange_endpoints": {k: v for k, v in sorted((self._exchange_ops or {}).items()) if v},
+            "alloc_peak_kb": round(max(self.alloc_peak) / 1024, 1) if self.alloc_peak else None,
+            "alloc_blocks": int(max(self.alloc_blocks)) if self.alloc_blocks else None,
+        }
+
+
+async def run_scenario(n_pairs, timeframes, strategy="Scalping", cycles=BENCH_CYCLES,
+                       alloc_cycles=BENCH_ALLOC_CYCLES, refetch=True, trade_size=0.01):
+    """Run the bot for ``cycles`` timed scan cycles over ``n_pairs`` x ``timeframes``.
+
+    ``strategy`` is one ``STRATEGY_MAP`` name or a list of them run as an ensemble.
+    """
+    names = [strategy] if isinstance(strategy, str) else list(strategy)
+    # বেঞ্চমার্ক বটের নিজের কাজ মাপে, এক্সচেঞ্জ সীমার অপেক্ষা নয়
+    set_rate_limiter(RateLimitScheduler(limits={k: (1e9, 1e9) for k in BITGET_LIMITS}, global_rate=1e9))
+    registry = get_exchange_registry()
+    if not registry.simulated:
+        raise RuntimeError("Benchmarks need EXCHANGE_BACKEND=sim")
+    exchange = registry.public
+    pairs = bench_pairs(n_pairs)
+    exchange.listed = pairs
+    await registry.load_markets(reload=True)
+
+    db = InMemoryMongoDB({
+        "pairs": pairs, "timeframes": list(timeframes), "strategy": names[0],
+        "strategies": [{"name": name} for name in names],
+        "trade_mode": "paper", "trade_size": trade_size,
+    })
+    bot = TradingBot(db)
+    probe = CycleProbe(bot, db, exchange, cycles, alloc_cycles, refetch)
+    started = time.perf_counter()
+    try:
+        await bot.run()
+    finally:
+        await db.close()
+        await close_exchange_registry()
+    result = {"name": f"{n_pairs}x{len(timeframes)}", "pairs": n_pairs, "timeframes": list(timeframes),
+              "strategy": "+".join(names), "refetch": refetch, **probe.report(),
+              "trades": len(db.db.trades.docs),
+              "seconds": round(time.perf_counter() - started, 2)}
+    logger.info("Scenario %s: p50 %.1fms p99 %.1fms, %.0f exchange / %.0f DB calls per cycle",
+                   result["name"], result["latency_ms"].get("p50", 0), result["latency_ms"].get("p99", 0),
+                   result["exchange_calls"], result["db_calls"])
+    return result
+
+
+# --- মাইক্রো-বেঞ্চমার্ক ---
+
+def synthetic_candles(n, seed=0, start_ms=1_700_000_000_000, tf_ms=60_000):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.002, n))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    return np.column_stack((start_ms + tf_ms * np.arange(n), open_, np.maximum(open_, close),
+                            np.minimum(open_, close), close, rng.lognormal(5, 1, n)))
+
+
+def time_call(fn, number=None, repeat=5, budget=0.2):
+    """Best per-call time of ``fn`` in microseconds, like ``timeit``."""
+    if number is None:
+        number, elapsed = 1, 0.0
+        while elapsed < budget / repeat and number < 10 ** 7:
+            number *= 10 if elapsed < budget / repeat / 10 else 2
+            started = time.perf_counter()
+            for _ in range(number):
+                fn()
+            elapsed = time.perf_counter() - started
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - started) / number)
+    return round(best * 1e6, 3)
+
+
+def micro_benchmarks(symbols=1000, bars=50):
+    """Per-call time in µs of every strategy, ``calculate_volatility`` and portfolio sizing."""
+    candles = synthetic_candles(bars)
+    block = np.stack([synthetic_candles(bars, seed=i) for i in range(symbols)])
+    stream = synthetic_candles(10_000, seed=1)
+    results = {}
+    for name, strategy_class in STRATEGY_MAP.items():
+        strategy = strategy_class()
+        results[f"{name}.analyze"] = time_call(lambda: strategy.analyze(candles))
+        results[f"{name}.analyze_many[{symbols}]"] = time_call(lambda: strategy.analyze_many(block), repeat=3)
+        state = strategy.new_state()
+        rows = itertools.cycle(stream.tolist())
+        results[f"{name}.update"] = time_call(lambda: strategy.update(state, next(rows)))
+
+    risk = RiskManager()
+    hist = synthetic_candles(100)
+    results["RiskManager.calculate_volatility"] = time_call(lambda: risk.calculate_volatility(hist))
+
+    portfolio = PortfolioRisk(bench_pairs(100), timeframe="1m", window=100)
+    for i, symbol in enumerate(portfolio.symbols):
+        portfolio.observe(symbol, synthetic_candles(101, seed=i), now_ms=1_800_000_000_000)
+    portfolio.refresh()
+    trades = np.random.default_rng(2).normal(0, 50, len(portfolio.symbols))
+    results["PortfolioRisk.size[1]"] = time_call(lambda: portfolio.size(portfolio.symbols[:1], trades[:1], 1000.0))
+    results[f"PortfolioRisk.size[{len(trades)}]"] = time_call(
+        lambda: portfolio.size(portfolio.symbols, trades, 1000.0))
+    return results
+
+
+# --- ফলাফল ---
+
+def flatten(report):
+    """Lower-is-better metrics of a report as ``{key: value}``, for comparing runs."""
+    metrics = {}
+    for scenario in report.get("scenarios", []):
+        prefix = f"{scenario['name']}:{scenario['strategy']}{'' if scenario.get('refetch', True) else ':cached'}"
+        for stat in ("p50", "p95", "p99"):
+            if stat in scenario["latency_ms"]:
+                metrics[f"{prefix}.latency_{stat}_ms"] = scenario["latency_ms"][stat]
+        if "p50" in scenario["cpu_ms"]:
+            metrics[f"{prefix}.cpu_p50_ms"] = scenario["cpu_ms"]["p50"]
+        metrics[f"{prefix}.db_calls"] = scenario["db_calls"]
+        metrics[f"{prefix}.exchange_calls"] = scenario["exchange_calls"]
+        if scenario.get("alloc_peak_kb") is not None:
+            metrics[f"{prefix}.alloc_peak_kb"] = scenario["alloc_peak_kb"]
+    for name, us in report.get("micro", {}).items():
+        metrics[f"micro.{name}_us"] = us
+    return metrics
+
+
+def compare(report, previous, threshold=REGRESSION_THRESHOLD):
+    """Metrics that got worse than ``previous`` by more than ``threshold``."""
+    old = flatten(previous)
+    regressions = []
+    for key, value in flatten(report).items():
+        before = old.get(key)
+        if before is None or value is None:
+            continue
+        # শূন্যের কাছের মানে ছোট পরিবর্তনকে রিগ্রেশন ধরা হয় না
+        if value > before * (1 + threshold) and value - before > 1e-3:
+            regressions.append({"metric": key, "before": before, "after": value,
+                                "change": round(value / before - 1, 3) if before else None})
+    return regressions
+
+
+def latest_report(out_dir=RESULTS_DIR):
+    paths = sorted(glob.glob(os.path.join(out_dir, "*.json")))
+    if not paths:
+        return None, None
+    with open(paths[-1]) as f:
+        return paths[-1], json.load(f)
+
+
+def save_report(report, out_dir=RESULTS_DIR):
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"{time.strftime('%Y%m%d-%H%M%S', time.gmtime())}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def run_benchmarks(pair_counts=BENCH_PAIRS, timeframe_counts=BENCH_TIMEFRAME_COUNTS, strategy="Scalping",
+                   cycles=BENCH_CYCLES, alloc_cycles=BENCH_ALLOC_CYCLES, refetch=True, micro=True):
+    """Run every scenario in a fresh event loop, then the micro-benchmarks; return the report."""
+    report = {
+        "started": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()} ({os.cpu_count()} CPUs)",
+        "numpy": np.__version__,
+        "scenarios": [],
+    }
+    for n_pairs in pair_counts:
+        for n_timeframes in timeframe_counts:
+            timeframes = BENCH_TIMEFRAMES[:n_timeframes]
+            report["scenarios"].append(asyncio.run(
+                run_scenario(n_pairs, timeframes, strategy, cycles, alloc_cycles, refetch)))
+    if micro:
+        report["micro"] = micro_benchmarks()
+    return report
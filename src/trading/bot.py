@@ -1,20 +1,46 @@
 # src/trading/bot.py
 import asyncio
+import os
 import random
+import time
 import datetime
+import numpy as np
 from src.utils.logger import get_logger
-from src.trading.data_fetcher import AsyncDataFetcher
-from src.trading.exchange import ResilientExchangeClient
-from src.trading.risk_manager import RiskManager
-from src.trading.strategies import STRATEGY_MAP
+from src.trading.stream import StreamingDataFetcher, create_data_fetcher
+from src.trading.exchange import FINAL_ORDER_STATUSES, ResilientExchangeClient
+from src.trading.exchange_registry import EXCHANGE_BACKEND
+from src.trading.sim_exchange import SimulatedExchange
+from src.trading.portfolio_risk import RISK_TIMEFRAME, RISK_WINDOW, PortfolioRisk
+from src.trading.candle_cache import timeframe_ms
+from src.trading.ensemble import Ensemble
+from src.trading.scanner import CandleScheduler, ScanScheduler
+from src.trading.order_pipeline import OrderPipeline
+from src.trading.rate_limiter import PRIORITY_BACKGROUND, PRIORITY_TRADE
 from src.database.mongo import MongoDB
+from src.database.settings_watcher import SettingsWatcher
+from src.database.shard_coordinator import SHARDING_ENABLED, ShardCoordinator
+from src.utils.metrics import CYCLE_DURATION, CYCLE_JOBS, ORDER_FILL_TIME, PORTFOLIO_GROSS, PORTFOLIO_VAR, RISK_CHECK_TIME, TRADES
 
 logger = get_logger("TradingBot")
 
+# স্ট্রিম মোডে এত সেকেন্ড কোনো ক্যান্ডেল ক্লোজ না হলেও লুপ ঘোরে, যাতে সেটিংস পরিবর্তন প্রয়োগ হয়
+STREAM_IDLE_TIMEOUT = float(os.getenv("STREAM_IDLE_TIMEOUT", "60"))
+# পোলিং মোডে পরের জব যত দূরেই থাকুক, লুপ এত সেকেন্ড পরপর জাগে
+SCHEDULE_IDLE_TIMEOUT = float(os.getenv("SCHEDULE_IDLE_TIMEOUT", "10"))
+# stop-এর পর অর্ডার ড্রেন ও জার্নাল ফ্লাশ শেষ হওয়ার জন্য সর্বোচ্চ অপেক্ষা
+BOT_STOP_TIMEOUT = float(os.getenv("BOT_STOP_TIMEOUT", "40"))
+# sim: পেপার অর্ডার সিমুলেটেড এক্সচেঞ্জে ম্যাচ হয়; random: পুরোনো র‍্যান্ডম লাভের পেপার ট্রেড
+PAPER_EXCHANGE = os.getenv("PAPER_EXCHANGE", "sim")
+
+STRATEGY_KEYS = {"strategy", "strategy_params", "strategies", "ensemble_threshold"}
+EXCHANGE_KEYS = {"trade_mode", "api_key", "api_secret"}
+
 class TradingBot:
     def __init__(self, db: MongoDB):
         self.running = False
         self.db = db
+        self.settings_watcher = SettingsWatcher(db)
+        self.shards = ShardCoordinator(db) if SHARDING_ENABLED else None
         self.pairs = []
         self.timeframes = []
         self.strategy_name = 'Scalping'
@@ -22,90 +48,200 @@ class TradingBot:
         self.strategy_mode = 'auto'
         self.trade_mode = 'paper'
         self.balance = 1000.0
-        self.data_fetcher = AsyncDataFetcher()
+        self.data_fetcher = create_data_fetcher()
+        self.streaming = isinstance(self.data_fetcher, StreamingDataFetcher)
         self.exchange = None
-        self.risk_manager = RiskManager()
+        self.paper_exchange = None
+        self.portfolio = PortfolioRisk()
+        self._risk_task = None
+        self._stop_requested = None
+        self._stopped = None
+        self.scanner = ScanScheduler()
+        self.schedule = CandleScheduler()
+        self._scheduled = None
+        self.orders = OrderPipeline(self.execute_trade)
+        self.indicator_states = {}
         self.api_key = None
         self.api_secret = None
         self.trade_size = 0.01
         self.min_balance = 100.0
+        self.history_limit = 50
+        self.idle_timeout = SCHEDULE_IDLE_TIMEOUT
 
     async def update_settings(self):
-        settings = await self.db.get_settings()
+        """Read the settings document now and apply whatever changed."""
+        settings, changed = await self.settings_watcher.refresh()
         if settings:
-            self.pairs = settings.get("pairs", [])
-            self.timeframes = settings.get("timeframes", [])
-            self.strategy_name = settings.get("strategy", "Scalping")
-            self.strategy_mode = settings.get("strategy_mode", "auto")
-            self.trade_mode = settings.get("trade_mode", "paper")
-            self.api_key = settings.get("api_key")
-            self.api_secret = settings.get("api_secret")
-            self.trade_size = settings.get("trade_size", 0.01)
-            self.min_balance = settings.get("min_balance", 100.0)
-            
-            strategy_class = STRATEGY_MAP.get(self.strategy_name)
-            if strategy_class:
-                self.strategy = strategy_class()
-            else:
-                logger.error(f"Invalid strategy: {self.strategy_name}")
-                self.strategy = STRATEGY_MAP["Scalping"]()
-            
-            if self.trade_mode == 'live' and not self.exchange and self.api_key and self.api_secret:
-                self.exchange = ResilientExchangeClient(self.api_key, self.api_secret)
+            await self.apply_settings(settings, changed)
+
+    async def apply_settings(self, settings, changed):
+        self.pairs = settings.get("pairs", [])
+        self.timeframes = settings.get("timeframes", [])
+        self.strategy_name = settings.get("strategy", "Scalping")
+        self.strategy_mode = settings.get("strategy_mode", "auto")
+        self.trade_mode = settings.get("trade_mode", "paper")
+        self.api_key = settings.get("api_key")
+        self.api_secret = settings.get("api_secret")
+        self.trade_size = settings.get("trade_size", 0.01)
+        self.min_balance = settings.get("min_balance", 100.0)
+        self.portfolio.set_universe(self.pairs)
+        if self.shards:
+            self.shards.set_universe(self.pairs)
+        
+        # স্ট্র্যাটেজি শুধু তার নিজের ইনপুট বদলালে নতুন করে তৈরি হয়, যাতে স্টেট না হারায়
+        if self.strategy is None or changed & STRATEGY_KEYS:
+            self.strategy = Ensemble.from_settings(settings)
+            self.history_limit = max(50, self.strategy.min_bars)
+            logger.info("Strategies: %s", self.strategy.name)
+            # নতুন স্ট্র্যাটেজির স্টেট পরের ক্লোজের অপেক্ষা না করে এখনই তৈরি হয়
+            self.schedule.reset()
+        
+        if self.exchange and changed & EXCHANGE_KEYS:
+            await self.exchange.close()
+            self.exchange = None
+        
+        if self.trade_mode == 'live' and not self.exchange and self.api_key and self.api_secret:
+            self.exchange = ResilientExchangeClient(self.api_key, self.api_secret)
 
     async def run(self):
         self.running = True
+        self._stop_requested = asyncio.Event()
+        self._stopped = asyncio.Event()
+        try:
+            await self._run()
+        finally:
+            self._stopped.set()
+
+    async def _until_stopped(self, awaitable):
+        """Await one of the loop's idle waits, giving up (None) as soon as ``stop`` is called."""
+        task = asyncio.ensure_future(awaitable)
+        stopper = asyncio.ensure_future(self._stop_requested.wait())
+        done, _ = await asyncio.wait({task, stopper}, return_when=asyncio.FIRST_COMPLETED)
+        stopper.cancel()
+        if task in done:
+            return task.result()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return None
+
+    async def _run(self):
         logger.info(f"Bot started with balance: {self.balance} USD in {self.trade_mode} mode")
         
+        if self.strategy is None:
+            await self.update_settings()
+        await self.settings_watcher.start()
+        if self.shards:
+            await self.shards.start()
+        self.orders.start()
+        self._risk_task = asyncio.create_task(self.refresh_risk())
+        
         while self.running:
             try:
-                await self.update_settings()
+                update = self.settings_watcher.take_changes()
+                if update:
+                    await self.apply_settings(*update)
                 
-                if not self.pairs or not self.timeframes:
-                    await asyncio.sleep(5)
+                # শার্ডিং চালু থাকলে শুধু এই ওয়ার্কারের লিজ করা পেয়ারগুলো স্ক্যান হয়
+                pairs = self.shards.owned(self.pairs) if self.shards else self.pairs
+                if not pairs or not self.timeframes:
+                    await self._until_stopped(asyncio.sleep(5))
                     continue
                 
-                for pair in self.pairs:
-                    for timeframe in self.timeframes:
-                        try:
-                            hist_data = await self.data_fetcher.fetch_historical_data(
-                                pair, timeframe=timeframe, limit=50
-                            )
-                            
-                            if not hist_data or len(hist_data) < 10:
-                                continue
-                            
-                            signal = self.strategy.analyze(hist_data)
-                            
-                            if signal != 0:
-                                logger.info(f"Signal detected for {pair} @ {timeframe}: {'BUY' if signal > 0 else 'SELL'}")
-                                await self.execute_trade(pair, signal)
-                            
-                        except Exception as e:
-                            logger.error(f"Error processing {pair}@{timeframe}: {e}")
+                # ক্যান্ডেল ক্লোজ হলে শুধু সেই পেয়ার/টাইমফ্রেম মূল্যায়ন হয়
+                if self.streaming:
+                    await self.data_fetcher.subscribe(pairs, self.timeframes)
+                    closed = await self._until_stopped(self.data_fetcher.wait_for_closed(STREAM_IDLE_TIMEOUT)) or []
+                    jobs = [(p, tf) for p, tf in closed if p in pairs and tf in self.timeframes]
+                else:
+                    # পোলিং: প্রতিটি জব তার টাইমফ্রেমের বাউন্ডারি + সেটল ডিলেতে শিডিউল হয়
+                    if self._scheduled != (pairs, self.timeframes):
+                        self._scheduled = (list(pairs), list(self.timeframes))
+                        self.schedule.set_jobs((p, tf) for p in pairs for tf in self.timeframes)
+                    jobs = await self._until_stopped(self.schedule.wait_due(self.idle_timeout))
+                if not jobs:
+                    continue
                 
-                await asyncio.sleep(10)
+                cycle_started = time.perf_counter()
+                results = await self.scanner.scan_jobs(jobs, self.analyze_closed)
+                
+                # সিগন্যালগুলো পেয়ার/টাইমফ্রেম ক্রমে অর্ডার পাইপলাইনে যায়; স্ক্যান অপেক্ষা করে না
+                for pair, timeframe, signal in results:
+                    if not signal:
+                        continue
+                    logger.info("Signal detected for %s @ %s: %s %s", pair, timeframe,
+                                'BUY' if signal.direction > 0 else 'SELL', signal.votes)
+                    self.orders.submit(pair, signal)
+                
+                CYCLE_DURATION.observe(time.perf_counter() - cycle_started)
+                CYCLE_JOBS.set(len(results))
             except Exception as e:
                 logger.error(f"Error in main loop: {e}")
-                await asyncio.sleep(30)
+                await self._until_stopped(asyncio.sleep(30))
         
+        self._risk_task.cancel()
+        await asyncio.gather(self._risk_task, return_exceptions=True)
+        await self.orders.stop()
+        await self.settings_watcher.stop()
+        if self.shards:
+            await self.shards.stop()
+        await self.data_fetcher.flush_store()
+        await self.db.journal.flush()
         logger.info("Bot stopped.")
 
-    async def execute_trade(self, pair, signal):
-        # USD ট্রেড সাইজ
-        usd_amount = self.balance * self.trade_size
+    async def analyze_closed(self, pair, timeframe):
+        key = (pair, timeframe)
+        # একটি ফেচ সব স্ট্র্যাটেজির জন্য; স্ট্র্যাটেজি বাড়লেও এক্সচেঞ্জ রিকোয়েস্ট বাড়ে না।
+        # রিট্রাইয়ে ক্যাশ এড়ানো হয়, নইলে বাউন্ডারির ফেচের একই পুরোনো সিরিজ ফেরত আসত
+        max_age = 0 if self.schedule.retrying(key) else None
+        hist_data = await self.data_fetcher.fetch_closed_candles(
+            pair, timeframe, limit=self.history_limit, max_age=max_age)
+        
+        if not hist_data or len(hist_data) < 10:
+            self.schedule.retry(key)
+            return None
+        
+        # ইনক্রিমেন্টাল ইন্ডিকেটর: শুধু নতুন ক্লোজ হওয়া ক্যান্ডেলগুলো ফিড করা হয়
+        owner, state = self.indicator_states.get(key, (None, None))
+        if owner is not self.strategy:
+            state = self.strategy.new_state()
+            self.indicator_states[key] = (self.strategy, state)
+        
+        start = 0
+        if state["last_ts"] is not None:
+            start = int(np.searchsorted(hist_data.ts, state["last_ts"], side="right"))
+        
+        # বাউন্ডারির ক্যান্ডেল এক্সচেঞ্জে এখনো না এলে একটু পরে আবার
+        expected = self.schedule.expected_close(key)
+        if expected is not None and hist_data.last_ts < expected:
+            self.schedule.retry(key)
+        if start >= len(hist_data):
+            return None
+        return self.strategy.update(state, hist_data[start:])
+
+    async def execute_trade(self, pair, signal, client_order_id=None):
+        # স্ক্যানের মাঝে লিজ হাতছাড়া হলে অন্য ওয়ার্কার পেয়ারটি ট্রেড করবে
+        if self.shards and not self.shards.owns(pair):
+            logger.warning(f"Lease for {pair} lost, skipping trade")
+            return
+        
+        side = "buy" if signal.direction > 0 else "sell"
         
-        # ভোলাটিলিটি চেক
-        hist_data = await self.data_fetcher.fetch_historical_data(pair, '5m', 100)
-        volatility = self.risk_manager.calculate_volatility(hist_data)
+        # USD ট্রেড সাইজ: একমত স্ট্র্যাটেজিগুলোর মূলধন বরাদ্দ অনুযায়ী, তারপর
+        # পোর্টফোলিওর এক্সপোজার/কোরিলেশন/VaR সীমা অনুযায়ী ছোট হতে পারে
+        requested = self.balance * self.trade_size * signal.size * signal.direction
+        with RISK_CHECK_TIME.time():
+            reserved = self.portfolio.size_trade(pair, requested, self.balance)
         
-        if not self.risk_manager.should_accept_trade(usd_amount, volatility, self.balance):
+        if not reserved:
             logger.warning("Risk manager rejected trade")
             return
         
-        side = "buy" if signal > 0 else "sell"
+        # চেক ও রিজার্ভের মাঝে কোনো await নেই, তাই সমান্তরাল অর্ডার ওয়ার্কাররা একই সীমা দুবার পায় না
+        usd_amount = abs(reserved)
+        self.portfolio.apply(pair, reserved)
+        self.publish_risk()
         
-        if self.trade_mode == 'paper':
+        if self.trade_mode == 'paper' and PAPER_EXCHANGE == 'random':
             if self.balance >= usd_amount:
                 self.balance -= usd_amount
                 profit = usd_amount * (random.uniform(-0.01, 0.02))
@@ -119,40 +255,157 @@ class TradingBot:
                     "profit": profit,
                     "balance": self.balance,
                     "mode": "paper",
+                    "strategies": signal.attribution(usd_amount),
                     "timestamp": datetime.datetime.utcnow()
                 }
+                # র‍্যান্ডম ট্রেড সাথে সাথে ক্লোজড, তাই কোনো খোলা এক্সপোজার থাকে না
+                self.portfolio.apply(pair, -reserved)
+                self.publish_risk()
                 await self.db.insert_trade(trade_data)
-                logger.info(f"PAPER TRADE: {side} {usd_amount} USD of {pair}. Profit: ${profit:.2f}, Balance: ${self.balance:.2f}")
+                TRADES.labels("paper", side).inc()
+                logger.info("PAPER TRADE: %s %.2f USD of %s. Profit: $%.2f, Balance: $%.2f",
+                            side, usd_amount, pair, profit, self.balance)
             else:
+                self.portfolio.apply(pair, -reserved)
+                self.publish_risk()
                 logger.warning("Insufficient balance for paper trade")
-        else:
+            return
+        
+        # পেপার ট্রেডও লাইভের একই অর্ডার পথে যায়, শুধু এক্সচেঞ্জটি সিমুলেটেড
+        mode = self.trade_mode
+        client = self.paper_client() if mode == 'paper' else self.exchange
+        try:
+            if client is None:
+                self.portfolio.apply(pair, -reserved)
+                self.publish_risk()
+                logger.error("Exchange not configured for live trading!")
+                return
+            
+            # ক্রিপ্টো অ্যামাউন্ট ক্যালকুলেশন
+            ticker = await self.data_fetcher.fetch_ticker(pair, priority=PRIORITY_TRADE)
+            current_price = ticker['last']
+            crypto_amount = usd_amount / current_price
+            if mode == 'paper':
+                client.exchange.quote(pair, ticker)
+            
+            # অর্ডার এক্সিকিউট; একই client order id-তে রিট্রাই দুবার ফিল হয় না
+            order = await client.create_market_order(pair, side, crypto_amount, client_order_id)
+            logger.info("%s ORDER accepted: %s (%s)", mode.upper(), order.get('id'),
+                        order.get('clientOrderId') or client_order_id)
+            self.orders.track(self.record_fill(client, mode, order, pair, side, reserved, current_price,
+                                               client_order_id, signal))
+        except Exception as e:
+            self.portfolio.apply(pair, -reserved)
+            self.publish_risk()
+            logger.error(f"{mode.capitalize()} trade failed: {e}")
+
+    def paper_client(self):
+        """Order client for paper mode: the simulated account, filled at live ticker prices."""
+        if self.paper_exchange is None:
+            # EXCHANGE_BACKEND=sim হলে মার্কেট ডেটা ও অ্যাকাউন্ট একই সিমুলেটরে
+            sim = None if EXCHANGE_BACKEND == "sim" else SimulatedExchange(source="quotes", balance=self.balance)
+            self.paper_exchange = ResilientExchangeClient(client=sim)
+        return self.paper_exchange
+
+    async def mark_paper_positions(self, sim, skip=None):
+        """Re-quote every open paper position so the simulated equity is not valued at fill-time prices.
+
+        Prices come from the fetcher's cache (stream tickers or the latest
+        candle close); only symbols with nothing cached cost a ticker request.
+        ``skip`` is the pair just filled, whose quote is already current.
+        """
+        if getattr(sim, "source", None) != "quotes":
+            return
+        for symbol in [s for s in sim.positions if s != skip]:
+            price = self.data_fetcher.cached_price(symbol)
+            if price is None:
+                try:
+                    price = (await self.data_fetcher.fetch_ticker(symbol))['last']
+                except Exception as e:
+                    logger.warning(f"Could not re-quote paper position {symbol}: {e}")
+                    continue
+            sim.quote(symbol, price)
+
+    async def record_fill(self, client, mode, order, pair, side, reserved, quoted_price, client_order_id, signal):
+        """Wait for an order to reach a final status and journal it."""
+        started = time.perf_counter()
+        order = await client.wait_for_fill(order, pair)
+        ORDER_FILL_TIME.observe(time.perf_counter() - started)
+        
+        # রিজার্ভ করা এক্সপোজার আসল ফিল অনুযায়ী ঠিক করা হয়; খোলা অর্ডারের রিজার্ভ থেকে যায়
+        if order.get('status') in FINAL_ORDER_STATUSES:
+            cost = order.get('cost') or (order.get('filled') or 0) * (order.get('average') or 0)
+            self.portfolio.apply(pair, (cost if side == "buy" else -cost) - reserved)
+            self.publish_risk()
+        
+        trade_data = {
+            "pair": pair,
+            "side": side,
+            "amount": abs(reserved),
+            "price": order.get('average') or order.get('price') or quoted_price,
+            "filled": order.get('filled'),
+            "fee": (order.get('fee') or {}).get('cost'),
+            "status": order.get('status'),
+            "order_id": order.get('id'),
+            "client_order_id": order.get('clientOrderId') or client_order_id,
+            "mode": mode,
+            "strategies": signal.attribution(abs(reserved)),
+            "timestamp": datetime.datetime.utcnow()
+        }
+        if mode == 'paper':
+            # সিমুলেটেড অ্যাকাউন্টের রিয়ালাইজড PnL ও ইকুইটি
+            trade_data["profit"] = (order.get('info') or {}).get('realizedPnl', 0.0)
+            await self.mark_paper_positions(client.exchange, skip=pair)
             try:
-                if self.exchange is None:
-                    logger.error("Exchange not configured for live trading!")
-                    return
-                
-                # ক্রিপ্টো অ্যামাউন্ট ক্যালকুলেশন
-                ticker = await self.data_fetcher.fetch_ticker(pair)
-                current_price = ticker['last']
-                crypto_amount = usd_amount / current_price
-                
-                # অর্ডার এক্সিকিউট
-                order = await self.exchange.create_market_order(pair, side, crypto_amount)
-                
-                trade_data = {
-                    "pair": pair,
-                    "side": side,
-                    "amount": usd_amount,
-                    "price": current_price,
-                    "order_id": order['id'],
-                    "mode": "live",
-                    "timestamp": datetime.datetime.utcnow()
-                }
-                await self.db.insert_trade(trade_data)
-                logger.info(f"LIVE TRADE executed: {order}")
+                self.balance = (await client.fetch_balance())['USDT']['total']
             except Exception as e:
-                logger.error(f"Live trade failed: {e}")
+                logger.warning(f"Paper balance refresh failed: {e}")
+            trade_data["balance"] = self.balance
+        await self.db.insert_trade(trade_data)
+        TRADES.labels(mode, side).inc()
+        logger.info("%s TRADE %s: %s %s %s @ %s", mode.upper(), trade_data['status'], side,
+                    trade_data['filled'], pair, trade_data['price'])
+
+    async def refresh_risk(self):
+        """Feed closed ``RISK_TIMEFRAME`` candles of every pair into the portfolio covariance once per bar."""
+        bar_seconds = timeframe_ms(RISK_TIMEFRAME) / 1000
+        while self.running:
+            try:
+                pairs = self.shards.owned(self.pairs) if self.shards else self.pairs
+                # সবচেয়ে কম প্রায়োরিটি: চাপ থাকলে অর্ডার ও স্ক্যান আগে যায়, বাদ পড়লে পরের বারে আসে
+                results = await asyncio.gather(*(
+                    self.data_fetcher.fetch_historical_data(pair, RISK_TIMEFRAME, RISK_WINDOW + 1,
+                                                            priority=PRIORITY_BACKGROUND)
+                    for pair in pairs), return_exceptions=True)
+                for pair, candles in zip(pairs, results):
+                    if isinstance(candles, Exception):
+                        logger.debug("No risk data for %s: %s", pair, candles)
+                        continue
+                    self.portfolio.observe(pair, candles)
+                self.portfolio.refresh()
+                self.publish_risk()
+            except Exception as e:
+                logger.error(f"Portfolio risk refresh failed: {e}")
+            # পরের বার ক্লোজের ঠিক পরে আবার
+            await asyncio.sleep(bar_seconds - time.time() % bar_seconds + 1)
+
+    def publish_risk(self):
+        PORTFOLIO_VAR.set(self.portfolio.var())
+        PORTFOLIO_GROSS.set(self.portfolio.gross)
 
     def stop(self):
         self.running = False
-        logger.info("Stop signal received")
\ No newline at end of file
+        if self._stop_requested is not None:
+            self._stop_requested.set()
+        logger.info("Stop signal received")
+
+    async def wait_stopped(self, timeout=BOT_STOP_TIMEOUT):
+        """Wait for ``run`` to drain orders and flush the journal; False if it is still going after ``timeout``."""
+        if self._stopped is None:
+            return True
+        try:
+            await asyncio.wait_for(asyncio.shield(self._stopped.wait()), timeout)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(f"Bot did not stop within {timeout}s")
+            return False
\ No newline at end of file
@@ -0,0 +1,114 @@
+# src/trading/candle_cache.py
+import os
+import time
+import numpy as np
+import ccxt.async_support as ccxt
+from src.utils.logger import get_logger
+
+logger = get_logger("CandleCache")
+
+CANDLE_CACHE_SIZE = int(os.getenv("CANDLE_CACHE_SIZE", "500"))
+# একটি সিরিজ টাইমফ্রেমের এই ভগ্নাংশ পার হলে আবার পোল করা হয়
+CANDLE_STALE_RATIO = float(os.getenv("CANDLE_STALE_RATIO", "0.1"))
+CANDLE_MIN_REFRESH = float(os.getenv("CANDLE_MIN_REFRESH", "2"))
+
+
+def timeframe_ms(timeframe):
+    return ccxt.Exchange.parse_timeframe(timeframe) * 1000
+
+
+class CandleRing:
+    """Fixed-size ring buffer of ccxt candles ``[ts, open, high, low, close, volume]``."""
+
+    def __init__(self, capacity=CANDLE_CACHE_SIZE):
+        self.capacity = capacity
+        self.data = np.zeros((capacity, 6), dtype=np.float64)
+        self.head = 0  # পরবর্তী লেখার অবস্থান
+        self.count = 0
+        self.last_fetch = 0.0
+        self.history_limit = 0  # পূর্ণ ফেচে যত ক্যান্ডেল চাওয়া হয়েছিল
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def last_ts(self):
+        if not self.count:
+            return None
+        return int(self.data[(self.head - 1) % self.capacity, 0])
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+
+    def merge(self, candles):
+        """Merge candles in ascending order; an equal timestamp overwrites the last row."""
+        merged = 0
+        for candle in candles:
+            ts = candle[0]
+            last_ts = self.last_ts
+            if last_ts is not None and ts < last_ts:
+                continue
+            if last_ts is not None and ts == last_ts:
+                self.data[(self.head - 1) % self.capacity] = candle[:6]
+            else:
+                self.data[self.head] = candle[:6]
+                self.head = (self.head + 1) % self.capacity
+                self.count = min(self.count + 1, self.capacity)
+            merged += 1
+        return merged
+
+    def window(self, limit):
+        """Return the most recent ``limit`` candles in chronological order."""
+        n = min(limit, self.count)
+        start = (self.head - n) % self.capacity
+        if start + n <= self.capacity:
+            return self.data[start:start + n]
+        return np.concatenate((self.data[start:], self.data[:self.head]))
+
+
+class CandleCache:
+    """Per (symbol, timeframe) candle cache with timeframe-aware staleness."""
+
+    def __init__(self, capacity=CANDLE_CACHE_SIZE, stale_ratio=CANDLE_STALE_RATIO,
+                 min_refresh=CANDLE_MIN_REFRESH):
+        self.capacity = capacity
+        self.stale_ratio = stale_ratio
+        self.min_refresh = min_refresh
+        self.series = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, symbol, timeframe):
+        key = (symbol, timeframe)
+        ring = self.series.get(key)
+        if ring is None:
+            ring = self.series[key] = CandleRing(self.capacity)
+        return ring
+
+    def is_fresh(self, ring, timeframe, limit, now=None, max_age=None):
+        """``max_age`` (seconds) overrides the timeframe-based staleness; 0 always refetches."""
+        if not ring.count or (limit > ring.count and limit > ring.history_limit):
+            return False
+        now = now or time.time()
+        tf_ms = timeframe_ms(timeframe)
+        # নতুন ক্যান্ডেল শুরু হলে সাথে সাথে রিফ্রেশ
+        if int(now * 1000) // tf_ms != int(ring.last_fetch * 1000) // tf_ms:
+            return False
+        if max_age is None:
+            max_age = max(self.min_refresh, tf_ms / 1000 * self.stale_ratio)
+        return now - ring.last_fetch < max_age
+
+    def since_for(self, ring, timeframe, limit, now=None):
+        """Return ``(since, fetch_limit)`` for the next fetch; ``since`` is None for a full fetch."""
+        if not ring.count or (limit > ring.count and limit > ring.history_limit):
+            return None, limit
+        now_ms = int((now or time.time()) * 1000)
+        tf_ms = timeframe_ms(timeframe)
+        missing = (now_ms - ring.last_ts) // tf_ms + 1
+        if missing >= min(limit, self.capacity):
+            return None, limit
+        return ring.last_ts, int(missing) + 1
+
+    def stats(self):
+        return {"series": len(self.series), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,89 @@
+# src/trading/candles.py
+import numpy as np
+
+COLUMNS = ("ts", "open", "high", "low", "close", "volume")
+
+
+class CandleSeries:
+    """Candles of one symbol/timeframe as a single ``(n, 6)`` float64 array.
+
+    Rows use the ccxt layout ``[ts, open, high, low, close, volume]``; the
+    named properties are column views, so reading closes does not build a
+    list. Indexing with an int returns one row, slicing returns another
+    ``CandleSeries`` over the same memory, and ``len``/truth/iteration work
+    like the list of lists ccxt returns.
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        data = np.asarray(data, dtype=np.float64)
+        if data.size == 0:
+            data = data.reshape(0, 6)
+        if data.ndim != 2 or data.shape[1] < 6:
+            raise ValueError(f"Expected an (n, 6) candle array, got shape {data.shape}")
+        self.data = data[:, :6]
+
+    @classmethod
+    def from_ccxt(cls, candles):
+        """Build a series from ccxt's list of lists, copying once."""
+        if not candles:
+            return cls(np.zeros((0, 6)))
+        return cls(np.array(candles, dtype=np.float64))
+
+    @property
+    def ts(self):
+        return self.data[:, 0]
+
+    @property
+    def open(self):
+        return self.data[:, 1]
+
+    @property
+    def high(self):
+        return self.data[:, 2]
+
+    @property
+    def low(self):
+        return self.data[:, 3]
+
+    @property
+    def close(self):
+        return self.data[:, 4]
+
+    @property
+    def volume(self):
+        return self.data[:, 5]
+
+    @property
+    def last_ts(self):
+        return int(self.data[-1, 0]) if len(self.data) else None
+
+    def __len__(self):
+        return self.data.shape[0]
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return CandleSeries(self.data[item])
+        return self.data[item]
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __array__(self, dtype=None, copy=None):
+        return self.data if dtype is None else self.data.astype(dtype, copy=False)
+
+    def tolist(self):
+        return self.data.tolist()
+
+    def __repr__(self):
+        return f"CandleSeries({len(self)} candles, last_ts={self.last_ts})"
+
+
+def as_series(candles):
+    """Return ``candles`` as a ``CandleSeries``, wrapping arrays without a copy."""
+    if isinstance(candles, CandleSeries):
+        return candles
+    if isinstance(candles, np.ndarray):
+        return CandleSeries(candles)
+    return CandleSeries.from_ccxt(candles)
@@ -1,29 +1,152 @@
 # src/trading/data_fetcher.py
-import ccxt.async_support as ccxt
+import asyncio
+import os
+import time
+import numpy as np
 from src.utils.logger import get_logger
-from tenacity import retry, stop_after_attempt, wait_exponential
+from src.trading.candle_cache import CandleCache, timeframe_ms
+from src.trading.candles import CandleSeries
+from src.trading.exchange_registry import EXCHANGE_BACKEND, get_exchange_registry
+from src.trading.ohlcv_store import OHLCVStore
+from src.trading.rate_limiter import PRIORITY_DATA, RateLimitShed, get_rate_limiter, wait_unless_throttled
+from src.utils.metrics import FETCH_LATENCY, record_retry
+from tenacity import retry, retry_if_not_exception_type, stop_after_attempt
 
 logger = get_logger("DataFetcher")
 
+# সিমুলেটেড ক্যান্ডেল আসল ইতিহাসে মিশে না যায়
+OHLCV_STORE_ENABLED = os.getenv(
+    "OHLCV_STORE_ENABLED", "false" if EXCHANGE_BACKEND == "sim" else "true").lower() in ("1", "true", "yes")
+
 class AsyncDataFetcher:
-    def __init__(self):
-        self.exchange = ccxt.bitget({
-            'enableRateLimit': True,
-            'options': {'defaultType': 'swap'}
-        })
-
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
-    async def fetch_ticker(self, symbol):
-        logger.debug(f"Fetching ticker for {symbol}")
-        return await self.exchange.fetch_ticker(symbol)
-
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
-    async def fetch_historical_data(self, symbol, timeframe='1m', limit=100):
-        logger.debug(f"Fetching {limit} {timeframe} candles for {symbol}")
-        return await self.exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
+    def __init__(self, cache=None, store=None):
+        self.cache = cache or CandleCache()
+        if store is None and OHLCV_STORE_ENABLED:
+            store = OHLCVStore()
+        self.store = store
+        self._locks = {}
+        self._writes = None
+        self._writer = None
+
+    @property
+    def exchange(self):
+        # লুপের শেয়ার করা পাবলিক ক্লায়েন্ট; কানেকশন পুল ও মার্কেট ডেটা সবার জন্য এক
+        return get_exchange_registry().public
+
+    @retry(stop=stop_after_attempt(3), wait=wait_unless_throttled,
+           retry=retry_if_not_exception_type(RateLimitShed), before_sleep=record_retry)
+    async def fetch_ticker(self, symbol, priority=PRIORITY_DATA):
+        logger.debug("Fetching ticker for %s", symbol)
+        limiter = get_rate_limiter()
+        await limiter.acquire("ticker", priority)
+        with FETCH_LATENCY.labels("ticker", "").time():
+            return await limiter.send("ticker", self.exchange.fetch_ticker(symbol))
+
+    @retry(stop=stop_after_attempt(3), wait=wait_unless_throttled,
+           retry=retry_if_not_exception_type(RateLimitShed), before_sleep=record_retry)
+    async def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=100, priority=PRIORITY_DATA):
+        logger.debug("Fetching %d %s candles for %s since %s", limit, timeframe, symbol, since)
+        limiter = get_rate_limiter()
+        await limiter.acquire("ohlcv", priority)
+        with FETCH_LATENCY.labels("ohlcv", timeframe).time():
+            return await limiter.send(
+                "ohlcv", self.exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=limit))
+
+    async def fetch_historical_data(self, symbol, timeframe='1m', limit=100, priority=PRIORITY_DATA, max_age=None):
+        """Return the latest ``limit`` candles as a ``CandleSeries``, fetching only what the cache is missing.
+
+        ``max_age`` overrides how long cached candles count as fresh (see
+        ``CandleCache.is_fresh``).
+
+        If the rate limiter sheds the request, the cached candles are returned
+        as they are, even if stale; with nothing cached the shed propagates.
+        """
+        key = (symbol, timeframe)
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+
+        async with lock:
+            ring = self.cache.get(symbol, timeframe)
+            now = time.time()
+            if self.cache.is_fresh(ring, timeframe, limit, now, max_age):
+                self.cache.hits += 1
+                return CandleSeries(ring.window(limit).copy())
+
+            self.cache.misses += 1
+            if not ring.count and self.store is not None:
+                self._seed_from_store(ring, symbol, timeframe, limit, now)
+            since, fetch_limit = self.cache.since_for(ring, timeframe, limit, now)
+            try:
+                candles = await self.fetch_ohlcv(symbol, timeframe, since=since, limit=fetch_limit,
+                                                 priority=priority)
+            except RateLimitShed:
+                if not ring.count:
+                    raise
+                return CandleSeries(ring.window(limit).copy())
+            if since is None:
+                ring.clear()
+                ring.history_limit = max(ring.history_limit, limit)
+            ring.merge(candles or [])
+            ring.last_fetch = now
+            if self.store is not None and candles:
+                self._persist(symbol, timeframe, candles, now)
+            return CandleSeries(ring.window(limit).copy())
+
+    async def fetch_closed_candles(self, symbol, timeframe='1m', limit=100, max_age=None):
+        """Like ``fetch_historical_data`` but without the still-forming candle."""
+        candles = await self.fetch_historical_data(symbol, timeframe, limit + 1, max_age=max_age)
+        if candles and candles.last_ts + timeframe_ms(timeframe) > time.time() * 1000:
+            candles = candles[:-1]
+        return candles[-limit:]
+
+    def cached_price(self, symbol):
+        """Close of the most recently fetched cached candle of ``symbol`` (any timeframe), or None."""
+        latest = None
+        for (cached_symbol, _), ring in self.cache.series.items():
+            if cached_symbol == symbol and ring.count and (latest is None or ring.last_fetch > latest.last_fetch):
+                latest = ring
+        return float(latest.window(1)[-1][4]) if latest is not None else None
+
+    def _seed_from_store(self, ring, symbol, timeframe, limit, now):
+        """Fill an empty ring from disk when only a short tail is missing since the last run."""
+        stored = self.store.tail(symbol, timeframe, min(limit, ring.capacity))
+        if not len(stored):
+            return
+        missing = (int(now * 1000) - stored[-1, 0]) // timeframe_ms(timeframe) + 1
+        # স্টোরে শুধু ক্লোজড ক্যান্ডেল থাকে; বাকিটা ছোট একটি ইনক্রিমেন্টাল ফেচে আসে
+        if missing >= min(limit, ring.capacity) or len(stored) + missing - 1 < limit:
+            return
+        ring.merge(stored)
+        ring.history_limit = max(ring.history_limit, limit)
+
+    def _persist(self, symbol, timeframe, candles, now):
+        """Queue candles for the store; one writer task does the locked file I/O off the event loop."""
+        if self._writer is None or self._writer.done():
+            self._writes = asyncio.Queue()
+            self._writer = asyncio.create_task(self._write_store())
+        # রিং পরে বদলায়, তাই কপি পাঠানো হয়
+        self._writes.put_nowait((symbol, timeframe, np.array(candles, dtype=np.float64), int(now * 1000)))
+
+    async def _write_store(self):
+        while True:
+            symbol, timeframe, candles, now_ms = await self._writes.get()
+            try:
+                await asyncio.to_thread(self.store.append, symbol, timeframe, candles, now_ms)
+            except OSError as e:
+                logger.warning(f"Could not store {symbol}@{timeframe} candles: {e}")
+            finally:
+                self._writes.task_done()
+
+    async def flush_store(self):
+        """Wait until every queued candle is on disk."""
+        if self._writer is not None and not self._writer.done():
+            await self._writes.join()
 
     async def close(self):
-        try:
-            await self.exchange.close()
-        except Exception:
-            pass
\ No newline at end of file
+        """Flush queued candles; the exchange client belongs to the registry, see ``close_exchange_registry``."""
+        await self.flush_store()
+        if self._writer is not None:
+            self._writer.cancel()
+            await asyncio.gather(self._writer, return_exceptions=True)
+            self._writer = None
@@ -0,0 +1,133 @@
+# src/trading/ensemble.py
+import os
+from src.utils.logger import get_logger
+from src.trading.strategies import STRATEGY_MAP
+from src.utils.metrics import ANALYZE_TIME
+
+logger = get_logger("Ensemble")
+
+# ভারিত ভোটের |স্কোর| অন্তত এতটা হলে ট্রেড (1 = সব স্ট্র্যাটেজি একমত)
+ENSEMBLE_THRESHOLD = float(os.getenv("ENSEMBLE_THRESHOLD", "0.5"))
+
+
+class Member:
+    def __init__(self, name, strategy, allocation, weight):
+        self.name = name
+        self.strategy = strategy
+        self.allocation = allocation
+        self.weight = weight
+
+
+class EnsembleSignal:
+    """Combined decision for one (pair, timeframe) plus the vote of every strategy."""
+
+    __slots__ = ("direction", "size", "score", "votes", "shares")
+
+    def __init__(self, direction, size, score, votes, shares):
+        self.direction = direction  # 1 buy, -1 sell, 0 hold
+        self.size = size  # ট্রেড সাইজের যে অংশ এই সিগন্যাল পায় (0..1)
+        self.score = score
+        self.votes = votes
+        self.shares = shares  # একমত স্ট্র্যাটেজিগুলোর মধ্যে ট্রেডের ভাগ
+
+    def __bool__(self):
+        return self.direction != 0
+
+    def attribution(self, usd_amount):
+        """Per-strategy vote and USD share of a trade, for the trade record."""
+        return {
+            "score": round(self.score, 4),
+            "votes": dict(self.votes),
+            "allocation": {name: round(usd_amount * share, 2) for name, share in self.shares.items()},
+        }
+
+    def __repr__(self):
+        return f"EnsembleSignal({self.direction:+d}, size={self.size:.2f}, votes={self.votes})"
+
+
+class Ensemble:
+    """Several ``STRATEGY_MAP`` strategies evaluated over the same candles.
+
+    Candles are fetched once per (pair, timeframe) and fed to every member's
+    incremental state, so adding strategies adds CPU but no requests. The
+    members' last signals are combined by weighted vote: the trade goes in
+    the direction of the weighted mean when its magnitude reaches
+    ``threshold``, and its size is the capital allocation of the members
+    voting that way minus that of the members voting against it.
+    Allocations are fractions of the bot's trade size and are normalized to
+    sum to 1; a member's vote weight defaults to its allocation.
+    """
+
+    def __init__(self, members, threshold=ENSEMBLE_THRESHOLD):
+        total = sum(m.allocation for m in members) or 1.0
+        for m in members:
+            m.allocation /= total
+        self.members = members
+        self.threshold = threshold
+        self.total_weight = sum(m.weight for m in members) or 1.0
+        self.min_bars = max(m.strategy.min_bars for m in members)
+        self.names = [m.name for m in members]
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Build from ``strategies`` (``[{name, params, allocation, weight}]``) or the single ``strategy``."""
+        specs = settings.get("strategies") or [
+            {"name": settings.get("strategy", "Scalping"), "params": settings.get("strategy_params", {})}]
+        members = []
+        for spec in specs:
+            if isinstance(spec, str):
+                spec = {"name": spec}
+            strategy_class = STRATEGY_MAP.get(spec.get("name"))
+            if strategy_class is None:
+                logger.error(f"Invalid strategy: {spec.get('name')}")
+                continue
+            try:
+                strategy = strategy_class(**(spec.get("params") or {}))
+            except TypeError as e:
+                logger.error(f"Invalid parameters for {spec['name']}: {e}")
+                continue
+            # একই স্ট্র্যাটেজি ভিন্ন প্যারামিটারে একাধিকবার থাকলে আলাদা নাম
+            base = spec.get("label") or spec["name"]
+            count = sum(1 for m in members if m.name == base or m.name.startswith(f"{base} #"))
+            name = f"{base} #{count + 1}" if count else base
+            allocation = float(spec.get("allocation", 1.0))
+            members.append(Member(name, strategy, allocation, float(spec.get("weight", allocation))))
+        if not members:
+            members = [Member("Scalping", STRATEGY_MAP["Scalping"](), 1.0, 1.0)]
+        return cls(members, float(settings.get("ensemble_threshold", ENSEMBLE_THRESHOLD)))
+
+    @property
+    def name(self):
+        return "+".join(self.names)
+
+    def new_state(self):
+        return {"last_ts": None, "members": [m.strategy.new_state() for m in self.members],
+                "signals": [0] * len(self.members)}
+
+    def update(self, state, candles):
+        """Feed new closed candles to every member and return the combined signal."""
+        for i, m in enumerate(self.members):
+            member_state = state["members"][i]
+            signal = state["signals"][i]
+            with ANALYZE_TIME.labels(m.name).time():
+                for candle in candles:
+                    signal = m.strategy.update(member_state, candle)
+            state["signals"][i] = signal
+        if len(candles):
+            state["last_ts"] = candles.last_ts
+        return self.combine(state["signals"])
+
+    def combine(self, signals):
+        votes = {m.name: int(s) for m, s in zip(self.members, signals)}
+        score = sum(m.weight * s for m, s in zip(self.members, signals)) / self.total_weight
+        direction = (score > 0) - (score < 0) if abs(score) >= self.threshold - 1e-9 else 0
+        size, shares = 0.0, {}
+        if direction:
+            agree = [m for m, s in zip(self.members, signals) if s == direction]
+            against = sum(m.allocation for m, s in zip(self.members, signals) if s == -direction)
+            backing = sum(m.allocation for m in agree)
+            size = max(backing - against, 0.0)
+            shares = {m.name: m.allocation / backing for m in agree} if backing else {}
+            if size <= 0:
+                direction = 0
+        return EnsembleSignal(direction, size, score, votes, shares)
@@ -1,33 +1,130 @@
 # src/trading/exchange.py
+import asyncio
+import os
+import time
 import ccxt.async_support as ccxt
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import retry, retry_if_not_exception_type, stop_after_attempt
 from src.utils.logger import get_logger
+from src.trading.exchange_registry import get_exchange_registry
+from src.trading.rate_limiter import (PRIORITY_ORDER, PRIORITY_TRADE, RateLimitShed,
+                                      get_rate_limiter, wait_unless_throttled)
+from src.trading.order_pipeline import new_client_order_id
+from src.utils.metrics import ORDER_LATENCY, RETRIES, record_retry
 
 logger = get_logger("ExchangeClient")
 
+ORDER_MAX_ATTEMPTS = int(os.getenv("ORDER_MAX_ATTEMPTS", "3"))
+ORDER_RETRY_DELAY = float(os.getenv("ORDER_RETRY_DELAY", "0.5"))
+ORDER_POLL_INTERVAL = float(os.getenv("ORDER_POLL_INTERVAL", "0.5"))
+ORDER_FILL_TIMEOUT = float(os.getenv("ORDER_FILL_TIMEOUT", "30"))
+FINAL_ORDER_STATUSES = {"closed", "canceled", "rejected", "expired"}
+
 class ResilientExchangeClient:
-    def __init__(self, api_key=None, api_secret=None):
-        self.exchange = ccxt.bitget({
-            'enableRateLimit': True,
-            'options': {'defaultType': 'swap'},
-            'apiKey': api_key,
-            'secret': api_secret,
-        })
-
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
+    def __init__(self, api_key=None, api_secret=None, client=None):
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.client = client
+
+    @property
+    def exchange(self):
+        if self.client is not None:
+            return self.client
+        # রেজিস্ট্রির কানেকশন পুল ও আগে থেকে লোড করা মার্কেট ডেটা ব্যবহার হয়
+        return get_exchange_registry().private(self.api_key, self.api_secret)
+
+    @retry(stop=stop_after_attempt(3), wait=wait_unless_throttled,
+           retry=retry_if_not_exception_type(RateLimitShed), before_sleep=record_retry)
     async def fetch_ticker(self, symbol):
         try:
-            logger.debug(f"Fetching ticker for {symbol}")
-            return await self.exchange.fetch_ticker(symbol)
+            logger.debug("Fetching ticker for %s", symbol)
+            limiter = get_rate_limiter()
+            await limiter.acquire("ticker", PRIORITY_TRADE)
+            return await limiter.send("ticker", self.exchange.fetch_ticker(symbol))
         except Exception as e:
             logger.error(f"Error fetching ticker: {e}")
             raise
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
-    async def create_market_order(self, symbol, side, amount):
+    async def create_market_order(self, symbol, side, amount, client_order_id=None):
+        """Place a market order that fills at most once per ``client_order_id``.
+
+        The id is sent as Bitget's ``clientOid``. A network error leaves the
+        outcome unknown, so before each retry the order is looked up by that
+        id and returned if it exists. A resubmission the exchange already
+        accepted is rejected as a duplicate instead of filling again.
+        """
+        client_order_id = client_order_id or new_client_order_id()
+        limiter = get_rate_limiter()
+        error = None
+        for attempt in range(1, ORDER_MAX_ATTEMPTS + 1):
+            if attempt > 1:
+                existing = await self.find_order(symbol, client_order_id)
+                if existing is not None:
+                    logger.info("Order %s was placed by an earlier attempt", client_order_id)
+                    return existing
+                RETRIES.labels("ResilientExchangeClient.create_market_order").inc()
+            try:
+                logger.info("Creating %s market order for %s of %s (%s)", side, amount, symbol, client_order_id)
+                await limiter.acquire("order", PRIORITY_ORDER)
+                with ORDER_LATENCY.labels(side).time():
+                    return await limiter.send("order", self.exchange.create_market_order(
+                        symbol, side, amount, params={"clientOrderId": client_order_id}))
+            except ccxt.NetworkError as e:
+                error = e
+                logger.warning(f"Order {client_order_id} attempt {attempt} failed: {e}")
+                if not isinstance(e, ccxt.RateLimitExceeded):
+                    await asyncio.sleep(ORDER_RETRY_DELAY * attempt)
+            except ccxt.ExchangeError as e:
+                # আগের চেষ্টা পৌঁছে থাকলে এটি duplicate clientOid ত্রুটি
+                existing = await self.find_order(symbol, client_order_id) if attempt > 1 else None
+                if existing is not None:
+                    return existing
+                logger.error(f"Order failed: {e}")
+                raise
+        logger.error(f"Order {client_order_id} failed after {ORDER_MAX_ATTEMPTS} attempts: {error}")
+        raise error
+
+    async def fetch_order(self, symbol, order_id=None, client_order_id=None):
+        limiter = get_rate_limiter()
+        await limiter.acquire("order_status", PRIORITY_ORDER)
+        params = {"clientOrderId": client_order_id} if client_order_id else {}
+        return await limiter.send("order_status", self.exchange.fetch_order(order_id, symbol, params))
+
+    async def find_order(self, symbol, client_order_id):
+        """Return the order placed with ``client_order_id``, or None if it is not known."""
         try:
-            logger.info(f"Creating {side} market order for {amount} of {symbol}")
-            return await self.exchange.create_market_order(symbol, side, amount)
-        except Exception as e:
-            logger.error(f"Order failed: {e}")
-            raise
\ No newline at end of file
+            return await self.fetch_order(symbol, client_order_id=client_order_id)
+        except ccxt.OrderNotFound:
+            return None
+        except ccxt.BaseError as e:
+            # অজানা থাকলেও আবার পাঠানো নিরাপদ: এক্সচেঞ্জ একই clientOid দ্বিতীয়বার নেয় না
+            logger.warning(f"Lookup of order {client_order_id} failed: {e}")
+            return None
+
+    async def wait_for_fill(self, order, symbol, timeout=ORDER_FILL_TIMEOUT):
+        """Poll ``order`` until it is closed, canceled or ``timeout`` passes; returns the last state."""
+        deadline = time.monotonic() + timeout
+        delay = ORDER_POLL_INTERVAL
+        while order.get("status") not in FINAL_ORDER_STATUSES and time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 5.0)
+            try:
+                order = await self.fetch_order(symbol, order_id=order["id"])
+            except ccxt.BaseError as e:
+                logger.warning(f"Fill check for order {order.get('id')} failed: {e}")
+        return order
+
+    @retry(stop=stop_after_attempt(3), wait=wait_unless_throttled,
+           retry=retry_if_not_exception_type(RateLimitShed), before_sleep=record_retry)
+    async def fetch_balance(self):
+        limiter = get_rate_limiter()
+        await limiter.acquire("order_status", PRIORITY_TRADE)
+        return await limiter.send("order_status", self.exchange.fetch_balance())
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.close()
+            return
+        try:
+            await get_exchange_registry().release(self.api_key)
+        except Exception:
+            pass
@@ -0,0 +1,203 @@
+# src/trading/exchange_registry.py
+import asyncio
+import json
+import os
+import ssl
+import time
+import weakref
+import aiohttp
+import certifi
+import ccxt.async_support as ccxt
+from src.trading.rate_limiter import PRIORITY_BACKGROUND, PRIORITY_TRADE, RateLimitShed, get_rate_limiter
+from src.utils.logger import get_logger
+from src.utils.paths import DATA_DIR
+
+logger = get_logger("ExchangeRegistry")
+
+EXCHANGE_POOL_SIZE = int(os.getenv("EXCHANGE_POOL_SIZE", "50"))
+EXCHANGE_KEEPALIVE = float(os.getenv("EXCHANGE_KEEPALIVE", "60"))
+# সংযোগ গরম রাখতে এত সেকেন্ড পরপর হালকা একটি রিকোয়েস্ট; 0 হলে বন্ধ
+EXCHANGE_PING_INTERVAL = float(os.getenv("EXCHANGE_PING_INTERVAL", "30"))
+MARKETS_TTL = float(os.getenv("MARKETS_TTL", str(6 * 3600)))
+# sim হলে সব ক্লায়েন্ট লোকাল SimulatedExchange (অফলাইন লোড টেস্ট)
+EXCHANGE_BACKEND = os.getenv("EXCHANGE_BACKEND", "bitget")
+MARKETS_CACHE_PATH = os.getenv("MARKETS_CACHE_PATH", os.path.join(DATA_DIR, "bitget_swap_markets.json"))
+
+EXCHANGE_CONFIG = {
+    # থ্রটলিং শেয়ার করা RateLimitScheduler করে
+    'enableRateLimit': False,
+    'options': {'defaultType': 'swap'},
+}
+
+
+class ExchangeRegistry:
+    """Process-wide ccxt clients for one event loop.
+
+    All clients share one aiohttp session, so TCP/TLS connections are pooled
+    and kept alive across the data fetcher, order clients and dashboard.
+    Market metadata is loaded once, persisted to ``markets_path`` and reused
+    across restarts until it is ``markets_ttl`` old; private (API key)
+    clients copy it from the public client instead of fetching it again.
+    With ``EXCHANGE_BACKEND=sim`` every client is one ``SimulatedExchange``.
+    """
+
+    def __init__(self, markets_path=MARKETS_CACHE_PATH, markets_ttl=MARKETS_TTL,
+                 pool_size=EXCHANGE_POOL_SIZE, keepalive=EXCHANGE_KEEPALIVE,
+                 ping_interval=EXCHANGE_PING_INTERVAL):
+        self.markets_path = markets_path
+        self.markets_ttl = markets_ttl
+        self.ping_interval = ping_interval
+        self.simulated = EXCHANGE_BACKEND == "sim"
+        connector = aiohttp.TCPConnector(
+            limit=pool_size, keepalive_timeout=keepalive, ttl_dns_cache=300,
+            ssl=ssl.create_default_context(cafile=certifi.where()),
+            enable_cleanup_closed=True,
+        )
+        self.session = aiohttp.ClientSession(connector=connector)
+        self.public = self._create()
+        self._private = {}
+        self.markets_loaded_at = 0.0
+        self._markets_lock = asyncio.Lock()
+        self._task = None
+
+    def _create(self, **credentials):
+        if self.simulated:
+            from src.trading.sim_exchange import SimulatedExchange
+            return SimulatedExchange()
+        return ccxt.bitget({**EXCHANGE_CONFIG, **credentials, 'session': self.session})
+
+    def private(self, api_key, api_secret):
+        """Return the shared authenticated client for this key pair."""
+        if self.simulated:
+            return self.public
+        client = self._private.get(api_key)
+        if client is None or client.secret != api_secret:
+            client = self._private[api_key] = self._create(apiKey=api_key, secret=api_secret)
+            if self.public.markets:
+                client.set_markets_from_exchange(self.public)
+        return client
+
+    async def release(self, api_key):
+        client = self._private.pop(api_key, None)
+        if client is not None:
+            await client.close()
+
+    def stats(self):
+        connector = self.session.connector
+        return {
+            "markets": len(self.public.markets or {}),
+            "markets_age": round(time.time() - self.markets_loaded_at, 1) if self.markets_loaded_at else None,
+            "private_clients": len(self._private),
+            "pool_limit": connector.limit if connector else None,
+        }
+
+    def _read_markets_file(self):
+        try:
+            with open(self.markets_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_markets_file(self, payload):
+        os.makedirs(os.path.dirname(self.markets_path), exist_ok=True)
+        tmp = f"{self.markets_path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(payload, f, default=str)
+        os.replace(tmp, self.markets_path)
+
+    def _share_markets(self):
+        for client in self._private.values():
+            client.set_markets_from_exchange(self.public)
+
+    async def load_markets(self, reload=False):
+        """Return market metadata from memory, the disk cache or the exchange, in that order."""
+        async with self._markets_lock:
+            fresh = time.time() - self.markets_loaded_at < self.markets_ttl
+            if self.public.markets and fresh and not reload:
+                return self.public.markets
+
+            if self.simulated:
+                markets = await self.public.load_markets(reload=True)
+                self.markets_loaded_at = time.time()
+                return markets
+
+            if not reload and not self.public.markets:
+                cached = await asyncio.to_thread(self._read_markets_file)
+                if cached and time.time() - cached.get("fetched_at", 0) < self.markets_ttl:
+                    self.public.set_markets(cached["markets"], cached.get("currencies"))
+                    self.markets_loaded_at = cached["fetched_at"]
+                    self._share_markets()
+                    logger.info(f"Loaded {len(self.public.markets)} markets from {self.markets_path}")
+                    return self.public.markets
+
+            await get_rate_limiter().acquire("markets", PRIORITY_TRADE)
+            started = time.perf_counter()
+            markets = await self.public.load_markets(reload=True)
+            self.markets_loaded_at = time.time()
+            self._share_markets()
+            logger.info(f"Fetched {len(markets)} markets in {time.perf_counter() - started:.2f}s")
+            payload = {
+                "fetched_at": self.markets_loaded_at,
+                "markets": markets,
+                "currencies": self.public.currencies,
+            }
+            try:
+                await asyncio.to_thread(self._write_markets_file, payload)
+            except (OSError, TypeError, ValueError) as e:
+                logger.warning(f"Could not persist markets cache: {e}")
+            return markets
+
+    async def warm(self):
+        """Load markets and open a pooled connection before the first real request."""
+        await self.load_markets()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._maintain())
+
+    async def _ping(self):
+        limiter = get_rate_limiter()
+        await limiter.acquire("ticker", PRIORITY_BACKGROUND)
+        await limiter.send("ticker", self.public.fetch_time())
+
+    async def _maintain(self):
+        interval = self.ping_interval or self.markets_ttl
+        while True:
+            if self.ping_interval:
+                try:
+                    await self._ping()
+                except (RateLimitShed, ccxt.BaseError) as e:
+                    logger.debug(f"Keep-alive ping skipped: {e}")
+            await asyncio.sleep(interval)
+            if time.time() - self.markets_loaded_at >= self.markets_ttl:
+                try:
+                    await self.load_markets(reload=True)
+                except ccxt.BaseError as e:
+                    logger.error(f"Markets refresh failed: {e}")
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+        for client in [self.public, *self._private.values()]:
+            try:
+                await client.close()
+            except Exception:
+                pass
+        self._private.clear()
+        await self.session.close()
+
+
+_registries = weakref.WeakKeyDictionary()
+
+
+def get_exchange_registry():
+    """Return the registry for the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    registry = _registries.get(loop)
+    if registry is None:
+        registry = _registries[loop] = ExchangeRegistry()
+    return registry
+
+
+async def close_exchange_registry():
+    registry = _registries.pop(asyncio.get_running_loop(), None)
+    if registry is not None:
+        await registry.close()
@@ -0,0 +1,229 @@
+# src/trading/indicators.py
+"""Stateful indicators that update in constant time per new value.
+
+Every indicator keeps only what it needs for its window, so the per-candle
+cost does not depend on the lookback length. ``value`` is None until the
+indicator has seen enough data (``ready``).
+"""
+import math
+
+
+class _Window:
+    """Fixed-size ring of the last ``period`` values."""
+
+    def __init__(self, period):
+        self.period = int(period)
+        self.values = [0.0] * self.period
+        self.index = 0
+        self.count = 0
+
+    def push(self, value):
+        """Store ``value`` and return the value it evicted (None while filling)."""
+        evicted = self.values[self.index] if self.count == self.period else None
+        self.values[self.index] = value
+        self.index = (self.index + 1) % self.period
+        self.count = min(self.count + 1, self.period)
+        return evicted
+
+    @property
+    def full(self):
+        return self.count == self.period
+
+
+class RollingSum:
+    def __init__(self, period):
+        self.window = _Window(period)
+        self.total = 0.0
+
+    @property
+    def ready(self):
+        return self.window.full
+
+    @property
+    def value(self):
+        return self.total if self.ready else None
+
+    def update(self, x):
+        evicted = self.window.push(x)
+        self.total += x - (evicted or 0.0)
+        # প্রতি পূর্ণ চক্রে একবার যোগফল নতুন করে হিসাব, যাতে ফ্লোটিং এরর না জমে
+        if self.window.index == 0:
+            self.total = math.fsum(self.window.values[:self.window.count])
+        return self.value
+
+
+class SMA(RollingSum):
+    @property
+    def value(self):
+        return self.total / self.window.period if self.ready else None
+
+
+class EMA:
+    """Exponential moving average seeded with the SMA of the first ``period`` values."""
+
+    def __init__(self, period):
+        self.period = int(period)
+        self.alpha = 2.0 / (self.period + 1)
+        self.seed = SMA(period)
+        self.value = None
+
+    @property
+    def ready(self):
+        return self.value is not None
+
+    def update(self, x):
+        if self.value is None:
+            self.value = self.seed.update(x)
+        else:
+            self.value += self.alpha * (x - self.value)
+        return self.value
+
+
+class RollingStd:
+    """Rolling population variance/std (``np.std`` semantics) using windowed Welford updates."""
+
+    def __init__(self, period):
+        self.window = _Window(period)
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    @property
+    def ready(self):
+        return self.window.full
+
+    @property
+    def variance(self):
+        return max(self.m2 / self.window.count, 0.0) if self.ready else None
+
+    @property
+    def value(self):
+        return math.sqrt(self.variance) if self.ready else None
+
+    def update(self, x):
+        evicted = self.window.push(x)
+        if evicted is None:
+            delta = x - self.mean
+            self.mean += delta / self.window.count
+            self.m2 += delta * (x - self.mean)
+        else:
+            old_mean = self.mean
+            self.mean += (x - evicted) / self.window.period
+            self.m2 += (x - evicted) * (x - self.mean + evicted - old_mean)
+        if self.window.full and self.window.index == 0:
+            values = self.window.values
+            self.mean = math.fsum(values) / self.window.period
+            self.m2 = math.fsum((v - self.mean) ** 2 for v in values)
+        return self.value
+
+
+class ReturnsSum:
+    """Sum of the last ``period`` simple returns of a price series."""
+
+    def __init__(self, period):
+        self.sum = RollingSum(period)
+        self.previous = None
+
+    @property
+    def ready(self):
+        return self.sum.ready
+
+    @property
+    def value(self):
+        return self.sum.value
+
+    def update(self, price):
+        if self.previous is not None:
+            self.sum.update((price - self.previous) / self.previous)
+        self.previous = price
+        return self.value
+
+
+class ReturnVolatility:
+    """Rolling std of simple returns over the last ``period`` prices (``period - 1`` returns)."""
+
+    def __init__(self, period):
+        self.std = RollingStd(period - 1)
+        self.previous = None
+
+    @property
+    def ready(self):
+        return self.std.ready
+
+    @property
+    def value(self):
+        return self.std.value
+
+    def update(self, price):
+        if self.previous is not None:
+            self.std.update((price - self.previous) / self.previous)
+        self.previous = price
+        return self.value
+
+
+class RSI:
+    """Wilder's RSI."""
+
+    def __init__(self, period=14):
+        self.period = int(period)
+        self.previous = None
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.count = 0
+        self.value = None
+
+    @property
+    def ready(self):
+        return self.value is not None
+
+    def update(self, price):
+        if self.previous is None:
+            self.previous = price
+            return None
+        change = price - self.previous
+        self.previous = price
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+        self.count += 1
+        if self.count <= self.period:
+            # প্রথম `period`টি পরিবর্তনের সাধারণ গড় দিয়ে শুরু
+            self.avg_gain += gain / self.period
+            self.avg_loss += loss / self.period
+            if self.count < self.period:
+                return None
+        else:
+            self.avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+            self.avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+        if self.avg_loss == 0:
+            self.value = 100.0
+        else:
+            self.value = 100.0 - 100.0 / (1.0 + self.avg_gain / self.avg_loss)
+        return self.value
+
+
+class ATR:
+    """Wilder's average true range; ``update`` takes high, low and close."""
+
+    def __init__(self, period=14):
+        self.period = int(period)
+        self.previous_close = None
+        self.count = 0
+        self.value = None
+        self._seed = 0.0
+
+    @property
+    def ready(self):
+        return self.value is not None
+
+    def update(self, high, low, close):
+        if self.previous_close is None:
+            true_range = high - low
+        else:
+            true_range = max(high - low, abs(high - self.previous_close), abs(low - self.previous_close))
+        self.previous_close = close
+        self.count += 1
+        if self.value is None:
+            self._seed += true_range
+            if self.count == self.period:
+                self.value = self._seed / self.period
+        else:
+            self.value = (self.value * (self.period - 1) + true_range) / self.period
+        return self.value
@@ -0,0 +1,216 @@
+# src/trading/ohlcv_store.py
+"""Append-only on-disk candle history, one memory-mapped file per symbol/timeframe.
+
+    python -m src.trading.ohlcv_store --symbols BTC/USDT:USDT ETH/USDT:USDT --timeframe 1m --days 30 --fill-gaps
+"""
+import argparse
+import asyncio
+import contextlib
+import fcntl
+import os
+import time
+import numpy as np
+from src.utils.logger import get_logger
+from src.trading.candle_cache import timeframe_ms
+from src.utils.paths import DATA_DIR
+
+logger = get_logger("OHLCVStore")
+
+OHLCV_STORE_DIR = os.getenv("OHLCV_STORE_DIR", os.path.join(DATA_DIR, "ohlcv"))
+OHLCV_PAGE_LIMIT = int(os.getenv("OHLCV_PAGE_LIMIT", "200"))
+
+ROW_BYTES = 6 * np.dtype(np.float64).itemsize
+EMPTY = np.zeros((0, 6), dtype=np.float64)
+
+
+class OHLCVStore:
+    """Closed candles stored as raw ``(n, 6)`` float64 rows sorted by timestamp.
+
+    New candles are appended to the end of the file, and readers memory-map it,
+    so ``candles``, ``range`` and ``tail`` return views of the page cache with
+    no copy or parse step. The layout matches what the rest of the code
+    passes around (``[ts, open, high, low, close, volume]`` rows), so a range
+    goes straight into ``CandleRing.merge`` or ``BacktestEngine.run``. Only
+    closed candles are stored. History before the first row and holes left
+    by downtime are filled with ``merge``, which rewrites the file.
+    """
+
+    def __init__(self, root=OHLCV_STORE_DIR):
+        self.root = root
+        self._maps = {}  # (symbol, timeframe) -> (rows, memmap)
+
+    def path(self, symbol, timeframe):
+        safe = symbol.replace("/", "_").replace(":", "-")
+        return os.path.join(self.root, safe, f"{timeframe}.f8")
+
+    @contextlib.contextmanager
+    def _locked(self, path):
+        # বট ও ড্যাশবোর্ড একই ফাইলে লিখতে পারে, তাই লেখা প্রসেসগুলোর মধ্যে সিরিয়াল করা হয়
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def candles(self, symbol, timeframe):
+        """Memory-mapped view of every stored candle."""
+        key = (symbol, timeframe)
+        try:
+            # অসম্পূর্ণ শেষ সারি (চলমান append) বাদ পড়ে
+            rows = os.path.getsize(self.path(symbol, timeframe)) // ROW_BYTES
+        except OSError:
+            rows = 0
+        if rows == 0:
+            self._maps.pop(key, None)
+            return EMPTY
+        cached = self._maps.get(key)
+        if cached is None or cached[0] != rows:
+            mm = np.memmap(self.path(symbol, timeframe), dtype=np.float64, mode="r", shape=(rows, 6))
+            cached = self._maps[key] = (rows, mm)
+        return cached[1]
+
+    def range(self, symbol, timeframe, start=None, end=None):
+        """Candles with ``start <= ts < end`` (ms), as a view."""
+        data = self.candles(symbol, timeframe)
+        ts = data[:, 0]
+        lo = 0 if start is None else int(np.searchsorted(ts, start, side="left"))
+        hi = len(data) if end is None else int(np.searchsorted(ts, end, side="left"))
+        return data[lo:hi]
+
+    def tail(self, symbol, timeframe, limit):
+        return self.candles(symbol, timeframe)[-limit:]
+
+    def last_ts(self, symbol, timeframe):
+        data = self.candles(symbol, timeframe)
+        return int(data[-1, 0]) if len(data) else None
+
+    def gaps(self, symbol, timeframe, start=None, end=None):
+        """Missing ``(from_ts, to_ts)`` ranges between stored candles."""
+        ts = self.range(symbol, timeframe, start, end)[:, 0]
+        tf_ms = timeframe_ms(timeframe)
+        idx = np.flatnonzero(np.diff(ts) > tf_ms)
+        return [(int(ts[i]) + tf_ms, int(ts[i + 1])) for i in idx]
+
+    @staticmethod
+    def _closed_rows(candles, timeframe, now_ms):
+        rows = np.asarray(candles, dtype=np.float64)
+        if rows.size == 0:
+            return EMPTY
+        rows = rows[:, :6]
+        rows = rows[rows[:, 0] + timeframe_ms(timeframe) <= now_ms]
+        rows = rows[np.argsort(rows[:, 0], kind="stable")]
+        # একই টাইমস্ট্যাম্পে সর্বশেষ সারি রাখা হয়
+        keep = np.append(rows[1:, 0] != rows[:-1, 0], True) if len(rows) else np.zeros(0, bool)
+        return rows[keep]
+
+    @staticmethod
+    def _last_row_ts(f):
+        # শেষ পূর্ণ সারিটুকুই পড়া হয়; প্রতিটি append-এ নতুন memmap বানাতে হয় না
+        rows = f.seek(0, os.SEEK_END) // ROW_BYTES
+        if rows == 0:
+            return None
+        f.seek((rows - 1) * ROW_BYTES)
+        return int(np.frombuffer(f.read(ROW_BYTES), dtype=np.float64)[0])
+
+    def append(self, symbol, timeframe, candles, now_ms=None):
+        """Append closed candles newer than the last stored one; returns how many were written.
+
+        Blocks on a file lock and disk I/O, so async callers run it in a thread.
+        """
+        now_ms = now_ms or int(time.time() * 1000)
+        rows = self._closed_rows(candles, timeframe, now_ms)
+        if not len(rows):
+            return 0
+        path = self.path(symbol, timeframe)
+        with self._locked(path):
+            with open(path, "ab+") as f:
+                last = self._last_row_ts(f)
+                if last is not None:
+                    rows = rows[rows[:, 0] > last]
+                if not len(rows):
+                    return 0
+                f.write(np.ascontiguousarray(rows).tobytes())
+        return len(rows)
+
+    def merge(self, symbol, timeframe, candles, now_ms=None):
+        """Insert closed candles anywhere in the history; new rows win on equal timestamps."""
+        now_ms = now_ms or int(time.time() * 1000)
+        rows = self._closed_rows(candles, timeframe, now_ms)
+        if not len(rows):
+            return 0
+        path = self.path(symbol, timeframe)
+        with self._locked(path):
+            existing = self.candles(symbol, timeframe)
+            combined = np.concatenate((rows, existing))
+            _, first = np.unique(combined[:, 0], return_index=True)
+            merged = combined[first]
+            tmp = f"{path}.tmp"
+            merged.tofile(tmp)
+            os.replace(tmp, path)
+            self._maps.pop((symbol, timeframe), None)
+        return len(merged) - len(existing)
+
+    async def _fetch_range(self, fetcher, symbol, timeframe, start, end, page_limit):
+        tf_ms = timeframe_ms(timeframe)
+        rows, cursor = [], start
+        while cursor < end:
+            page = await fetcher.fetch_ohlcv(symbol, timeframe, since=cursor, limit=page_limit)
+            page = [c for c in page or [] if cursor <= c[0] < end]
+            if not page:
+                break
+            rows.extend(page)
+            cursor = int(page[-1][0]) + tf_ms
+        return rows
+
+    async def sync(self, fetcher, symbol, timeframe, since=None, page_limit=OHLCV_PAGE_LIMIT):
+        """Download what is missing before the first and after the last stored candle."""
+        tf_ms = timeframe_ms(timeframe)
+        now_ms = int(time.time() * 1000)
+        data = self.candles(symbol, timeframe)
+        added = 0
+        if len(data) and since is not None and since < data[0, 0]:
+            older = await self._fetch_range(fetcher, symbol, timeframe, since, int(data[0, 0]), page_limit)
+            added += await asyncio.to_thread(self.merge, symbol, timeframe, older, now_ms)
+        last = self.last_ts(symbol, timeframe)
+        start = last + tf_ms if last is not None else (since or now_ms - page_limit * tf_ms)
+        newer = await self._fetch_range(fetcher, symbol, timeframe, start, now_ms, page_limit)
+        added += await asyncio.to_thread(self.append, symbol, timeframe, newer, now_ms)
+        return added
+
+    async def fill_gaps(self, fetcher, symbol, timeframe, page_limit=OHLCV_PAGE_LIMIT):
+        """Backfill holes between stored candles; a hole the exchange has no data for stays."""
+        rows = []
+        for start, end in self.gaps(symbol, timeframe):
+            rows.extend(await self._fetch_range(fetcher, symbol, timeframe, start, end, page_limit))
+        if not rows:
+            return 0
+        return await asyncio.to_thread(self.merge, symbol, timeframe, rows)
+
+
+async def _sync(args):
+    from src.trading.data_fetcher import AsyncDataFetcher
+    from src.trading.exchange_registry import close_exchange_registry
+    store = OHLCVStore(args.root)
+    fetcher = AsyncDataFetcher(store=store)
+    since = int((time.time() - args.days * 86400) * 1000) if args.days else None
+    try:
+        for symbol in args.symbols:
+            added = await store.sync(fetcher, symbol, args.timeframe, since)
+            filled = await store.fill_gaps(fetcher, symbol, args.timeframe) if args.fill_gaps else 0
+            total = len(store.candles(symbol, args.timeframe))
+            logger.info(f"{symbol}@{args.timeframe}: +{added} new, +{filled} gap candles, {total} stored")
+    finally:
+        await close_exchange_registry()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download candle history into the local OHLCV store")
+    parser.add_argument("--symbols", nargs="+", required=True)
+    parser.add_argument("--timeframe", default="1m")
+    parser.add_argument("--days", type=float, default=0, help="history to keep before the first stored candle")
+    parser.add_argument("--fill-gaps", action="store_true")
+    parser.add_argument("--root", default=OHLCV_STORE_DIR)
+    asyncio.run(_sync(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+# src/trading/optimizer.py
+import itertools
+import json
+import os
+import random
+import time
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from src.utils.logger import get_logger
+from src.utils.paths import ROOT_DIR
+from src.trading.backtest import BacktestEngine
+from src.trading.strategies import STRATEGY_MAP
+
+logger = get_logger("Optimizer")
+
+RESULTS_DIR = os.getenv("OPTIMIZER_RESULTS_DIR", os.path.join(ROOT_DIR, "results", "optimizer"))
+
+# ওয়ার্কার প্রসেসে শেয়ার্ড মেমরি থেকে সংযুক্ত অ্যারে
+_worker_arrays = {}
+_worker_segments = []
+
+
+def param_grid(space):
+    keys = sorted(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+
+def param_samples(space, n, seed=None):
+    """Draw ``n`` distinct random combinations from ``space`` (all of them if fewer exist)."""
+    grid = param_grid(space)
+    if n >= len(grid):
+        return grid
+    return random.Random(seed).sample(grid, n)
+
+
+def walk_forward_splits(n_splits, train_fraction=0.7):
+    """Rolling ``(train, test)`` windows as fractions of each symbol's history.
+
+    The history is cut into ``n_splits`` consecutive windows; each window is
+    split into an in-sample and a following out-of-sample part.
+    """
+    size = 1.0 / n_splits
+    splits = []
+    for i in range(n_splits):
+        start = i * size
+        cut = start + size * train_fraction
+        splits.append(((start, cut), (cut, start + size)))
+    return splits
+
+
+class SharedCandles:
+    """Candle arrays copied once into shared memory and attached by every worker."""
+
+    def __init__(self, datasets):
+        self.segments = []
+        self.meta = {}
+        for symbol, candles in datasets.items():
+            candles = np.ascontiguousarray(candles, dtype=np.float64)
+            segment = shared_memory.SharedMemory(create=True, size=max(candles.nbytes, 1))
+            np.ndarray(candles.shape, dtype=np.float64, buffer=segment.buf)[:] = candles
+            self.segments.append(segment)
+            self.meta[symbol] = (segment.name, candles.shape)
+
+    def close(self):
+        for segment in self.segments:
+            segment.close()
+            segment.unlink()
+        self.segments = []
+
+
+def _attach(meta):
+    for symbol, (name, shape) in meta.items():
+        segment = shared_memory.SharedMemory(name=name)
+        _worker_segments.append(segment)
+        _worker_arrays[symbol] = np.ndarray(shape, dtype=np.float64, buffer=segment.buf)
+
+
+def _evaluate(task):
+    strategy_name, params, span, engine_kwargs = task
+    engine = BacktestEngine(STRATEGY_MAP[strategy_name](**params), **engine_kwargs)
+    datasets = {}
+    for symbol, candles in _worker_arrays.items():
+        n = candles.shape[0]
+        datasets[symbol] = candles[int(span[0] * n):int(span[1] * n)]
+    results, _, equity = engine.run_many(datasets)
+    final = float(equity[-1]) if equity.size else engine.initial_balance
+    trades = sum(int(r.trades.shape[0]) for r in results.values())
+    peak = np.maximum.accumulate(equity) if equity.size else np.ones(1)
+    return {
+        "params": params,
+        "span": list(span),
+        "total_return": final / engine.initial_balance - 1,
+        "max_drawdown": float(((equity - peak) / peak).min()) if equity.size else 0.0,
+        "trades": trades,
+    }
+
+
+class Optimizer:
+    """Grid/random parameter sweeps and walk-forward analysis on a process pool."""
+
+    def __init__(self, strategy_name, datasets, workers=None, score="total_return", **engine_kwargs):
+        self.strategy_name = strategy_name
+        self.datasets = datasets
+        self.workers = workers or os.cpu_count() or 1
+        self.score = score
+        self.engine_kwargs = engine_kwargs
+
+    def _map(self, pool, tasks):
+        chunksize = max(1, len(tasks) // (self.workers * 4))
+        return pool.map(_evaluate, tasks, chunksize=chunksize)
+
+    def _rank(self, results):
+        return sorted(results, key=lambda r: r[self.score], reverse=True)
+
+    def run(self, param_sets, n_splits=0, train_fraction=0.7):
+        """Evaluate ``param_sets``; with ``n_splits`` run a walk-forward analysis instead."""
+        shared = SharedCandles(self.datasets)
+        started = time.perf_counter()
+        try:
+            with mp.Pool(self.workers, initializer=_attach, initargs=(shared.meta,)) as pool:
+                if not n_splits:
+                    tasks = [(self.strategy_name, p, (0.0, 1.0), self.engine_kwargs) for p in param_sets]
+                    report = {"ranked": self._rank(self._map(pool, tasks))}
+                else:
+                    report = self._walk_forward(pool, param_sets, n_splits, train_fraction)
+        finally:
+            shared.close()
+
+        report.update({
+            "strategy": self.strategy_name,
+            "symbols": sorted(self.datasets),
+            "param_sets": len(param_sets),
+            "workers": self.workers,
+            "score": self.score,
+            "seconds": round(time.perf_counter() - started, 3),
+        })
+        logger.info(f"Evaluated {len(param_sets)} parameter sets for {self.strategy_name} "
+                    f"in {report['seconds']}s on {self.workers} workers")
+        return report
+
+    def _walk_forward(self, pool, param_sets, n_splits, train_fraction):
+        splits = walk_forward_splits(n_splits, train_fraction)
+        tasks = [(self.strategy_name, p, train, self.engine_kwargs)
+                 for train, _ in splits for p in param_sets]
+        in_sample = self._map(pool, tasks)
+
+        best = []
+        for i in range(len(splits)):
+            chunk = in_sample[i * len(param_sets):(i + 1) * len(param_sets)]
+            best.append(self._rank(chunk)[0])
+
+        oos_tasks = [(self.strategy_name, b["params"], test, self.engine_kwargs)
+                     for b, (_, test) in zip(best, splits)]
+        out_of_sample = self._map(pool, oos_tasks)
+
+        folds = [{"in_sample": b, "out_of_sample": o} for b, o in zip(best, out_of_sample)]
+        return {
+            "folds": folds,
+            "ranked": self._rank(out_of_sample),
+            "oos_total_return": float(np.prod([1 + o["total_return"] for o in out_of_sample]) - 1),
+        }
+
+
+def save_report(report, out_dir=RESULTS_DIR):
+    os.makedirs(out_dir, exist_ok=True)
+    name = f"{report['strategy'].replace(' ', '_')}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    path = os.path.join(out_dir, name)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    return path
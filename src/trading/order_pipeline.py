@@ -0,0 +1,108 @@
+# src/trading/order_pipeline.py
+import asyncio
+import os
+import time
+import uuid
+from src.utils.logger import get_logger
+from src.utils.metrics import ORDER_QUEUE_WAIT
+
+logger = get_logger("OrderPipeline")
+
+ORDER_WORKERS = int(os.getenv("ORDER_WORKERS", "4"))
+ORDER_QUEUE_SIZE = int(os.getenv("ORDER_QUEUE_SIZE", "100"))
+ORDER_DRAIN_TIMEOUT = float(os.getenv("ORDER_DRAIN_TIMEOUT", "30"))
+
+
+def new_client_order_id():
+    """Unique id sent to Bitget as ``clientOid`` (at most 50 characters)."""
+    return f"bot{uuid.uuid4().hex}"
+
+
+class OrderPipeline:
+    """Executes trade signals off the scan loop.
+
+    ``submit`` queues a signal and returns at once, and ``workers`` tasks
+    call ``execute(pair, signal, client_order_id)`` concurrently, so a slow
+    order no longer holds up the scan of other pairs. The client order id is
+    fixed when the signal is queued, which makes every retry of that order
+    idempotent on the exchange. A pair with a signal queued or executing
+    does not accept another one. Fill tracking runs in tasks started with
+    ``track`` and does not occupy a worker.
+    """
+
+    def __init__(self, execute, workers=ORDER_WORKERS, max_pending=ORDER_QUEUE_SIZE):
+        self.execute = execute
+        self.workers = max(1, int(workers))
+        self.queue = asyncio.Queue(max_pending)
+        self.pending = set()
+        self.trackers = set()
+        self._tasks = []
+        self.submitted = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def stats(self):
+        return {
+            "queued": self.queue.qsize(),
+            "pending_pairs": len(self.pending),
+            "tracking": len(self.trackers),
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+    def submit(self, pair, signal):
+        """Queue a signal; returns its client order id, or None if it was dropped."""
+        if pair in self.pending:
+            self.dropped += 1
+            logger.info("Order for %s already in flight, dropping new signal", pair)
+            return None
+        client_order_id = new_client_order_id()
+        try:
+            self.queue.put_nowait((pair, signal, client_order_id, time.perf_counter()))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(f"Order queue full, dropping signal for {pair}")
+            return None
+        self.pending.add(pair)
+        self.submitted += 1
+        return client_order_id
+
+    def start(self):
+        self._tasks = [t for t in self._tasks if not t.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    async def _worker(self):
+        while True:
+            pair, signal, client_order_id, queued_at = await self.queue.get()
+            ORDER_QUEUE_WAIT.observe(time.perf_counter() - queued_at)
+            try:
+                await self.execute(pair, signal, client_order_id)
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Order {client_order_id} for {pair} failed: {e}")
+            finally:
+                self.pending.discard(pair)
+                self.queue.task_done()
+
+    def track(self, coro):
+        """Run a fill-tracking coroutine in the background, keeping a reference until it ends."""
+        task = asyncio.create_task(coro)
+        self.trackers.add(task)
+        task.add_done_callback(self.trackers.discard)
+        return task
+
+    async def stop(self, timeout=ORDER_DRAIN_TIMEOUT):
+        """Let queued orders and fill trackers finish for up to ``timeout`` seconds, then cancel."""
+        try:
+            if self._tasks:
+                await asyncio.wait_for(self.queue.join(), timeout)
+            if self.trackers:
+                await asyncio.wait(list(self.trackers), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Order pipeline did not drain in {timeout}s ({self.stats()})")
+        for task in [*self._tasks, *self.trackers]:
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self.trackers, return_exceptions=True)
+        self._tasks = []
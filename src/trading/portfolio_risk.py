@@ -0,0 +1,245 @@
+# src/trading/portfolio_risk.py
+import math
+import os
+import time
+import numpy as np
+from src.utils.logger import get_logger
+from src.trading.candle_cache import timeframe_ms
+from src.trading.candles import as_series
+
+logger = get_logger("PortfolioRisk")
+
+RISK_TIMEFRAME = os.getenv("RISK_TIMEFRAME", "5m")
+RISK_WINDOW = int(os.getenv("RISK_WINDOW", "100"))  # কোভেরিয়েন্সের জন্য কতগুলো বার
+RISK_MIN_PERIODS = int(os.getenv("RISK_MIN_PERIODS", "20"))
+RISK_VAR_Z = float(os.getenv("RISK_VAR_Z", "1.65"))  # ~95% একতরফা
+RISK_VAR_HORIZON = float(os.getenv("RISK_VAR_HORIZON", "1"))  # বারের সংখ্যা
+RISK_MAX_VAR = float(os.getenv("RISK_MAX_VAR", "0.02"))
+RISK_MAX_GROSS = float(os.getenv("RISK_MAX_GROSS", "1.0"))
+RISK_MAX_SYMBOL = float(os.getenv("RISK_MAX_SYMBOL", "0.25"))
+RISK_MAX_CORRELATED = float(os.getenv("RISK_MAX_CORRELATED", "0.5"))
+RISK_MIN_FILL = float(os.getenv("RISK_MIN_FILL", "0.25"))
+
+
+class PortfolioRisk:
+    """Net USD positions and a rolling return covariance over the traded universe.
+
+    Returns of ``timeframe`` bars live in a ``window x symbols`` ring keyed by
+    bar timestamp, and the cross-product sums behind the covariance
+    (``sum r_i r_j``, ``sum r_i`` and the count over bars where both symbols
+    have data) are updated only for rows that changed, so a new bar costs one
+    rank-``k`` update instead of a full recompute. Symbols without enough
+    shared history get zero correlation, and every variance is floored at
+    ``min_vol ** 2``, the same floor as ``RiskManager``.
+
+    ``size`` checks a batch of proposed trades against the per-symbol,
+    gross and correlated exposure limits and the parametric portfolio VaR in
+    one vectorized pass over cached ``cov @ w`` and ``corr @ w`` vectors, and
+    returns the largest part of each trade that fits. Positions are those of
+    this process only; with sharding each replica limits its own book.
+    """
+
+    def __init__(self, symbols=(), timeframe=RISK_TIMEFRAME, window=RISK_WINDOW,
+                 min_periods=RISK_MIN_PERIODS, min_vol=0.01):
+        self.timeframe = timeframe
+        self.tf_ms = timeframe_ms(timeframe)
+        self.window = int(window)
+        self.min_periods = max(2, int(min_periods))
+        self.min_var = min_vol ** 2
+        self.symbols = []
+        self.index = {}
+        self.positions = np.zeros(0)
+        self._resize(list(symbols))
+
+    # --- ইউনিভার্স ---
+
+    def _resize(self, symbols):
+        old = (self.index, self.positions, getattr(self, "returns", None), getattr(self, "mask", None),
+               getattr(self, "last_ts", None), getattr(self, "last_close", None))
+        n, w = len(symbols), self.window
+        self.symbols = symbols
+        self.index = {s: i for i, s in enumerate(symbols)}
+        self.positions = np.zeros(n)
+        self.returns = np.zeros((w, n))
+        self.mask = np.zeros((w, n))
+        self.last_ts = np.full(n, -1, dtype=np.int64)
+        self.last_close = np.full(n, np.nan)
+        if old[2] is None:
+            self.row_ts = np.full(w, -1, dtype=np.int64)
+        keep = [(i, old[0][s]) for i, s in enumerate(symbols) if s in old[0]]
+        if keep:
+            new, prev = map(list, zip(*keep))
+            for name, values in zip(("positions", "returns", "mask", "last_ts", "last_close"), old[1:]):
+                getattr(self, name)[..., new] = values[..., prev]
+        self._rebuild()
+
+    def set_universe(self, symbols):
+        """Track ``symbols``; symbols with an open position stay until it is closed."""
+        held = [s for s in self.symbols if s not in symbols and self.positions[self.index[s]] != 0]
+        symbols = list(dict.fromkeys([*symbols, *held]))
+        if symbols != self.symbols:
+            self._resize(symbols)
+
+    # --- কোভেরিয়েন্স ---
+
+    def _rebuild(self):
+        """Recompute every running sum from the ring."""
+        r, m = self.returns, self.mask
+        self.cross = r.T @ r  # sum r_i r_j
+        self.sums = r.T @ m  # sum r_i over bars where j also has data
+        self.counts = m.T @ m
+        self._committed = (r.copy(), m.copy())
+        self.dirty = np.zeros(self.window, dtype=bool)
+        self.refreshes = 0
+        self._update_cov()
+
+    def observe(self, symbol, candles, now_ms=None):
+        """Feed closed ``timeframe`` candles of ``symbol``; only bars newer than the last seen are used."""
+        i = self.index.get(symbol)
+        if i is None:
+            return 0
+        data = as_series(candles).data
+        if not len(data):
+            return 0
+        now_ms = now_ms or int(time.time() * 1000)
+        ts, close = data[:, 0].astype(np.int64), data[:, 4]
+        closed = (ts + self.tf_ms <= now_ms) & (ts > self.last_ts[i])
+        # আগের বারের ক্লোজ থাকলে প্রথম নতুন বারের রিটার্নও হিসাব হয়
+        prev_ts = np.concatenate(([self.last_ts[i]], ts[:-1]))
+        prev_close = np.concatenate(([self.last_close[i]], close[:-1]))
+        use = closed & (prev_ts == ts - self.tf_ms) & (prev_close > 0)
+        if closed.any():
+            last = int(np.flatnonzero(closed)[-1])
+            self.last_ts[i], self.last_close[i] = ts[last], close[last]
+        if not use.any():
+            return 0
+
+        ts, ret = ts[use], close[use] / prev_close[use] - 1
+        newest = max(int(ts[-1]), int(self.row_ts.max()))
+        keep = ts > newest - self.window * self.tf_ms
+        ts, ret = ts[keep], ret[keep]
+        slots = (ts // self.tf_ms) % self.window
+        # নতুন বার পুরোনো সারির জায়গা নেয়; ঘোরার পর পুরোনো বার বাদ
+        stale = self.row_ts[slots] < ts
+        if stale.any():
+            reset = slots[stale]
+            self.returns[reset] = 0.0
+            self.mask[reset] = 0.0
+            self.row_ts[reset] = ts[stale]
+        fits = self.row_ts[slots] == ts
+        self.returns[slots[fits], i] = ret[fits]
+        self.mask[slots[fits], i] = 1.0
+        self.dirty[slots[fits]] = True
+        self.dirty[slots[stale]] = True
+        return int(fits.sum())
+
+    def refresh(self):
+        """Apply observed bars to the running sums and recompute the covariance."""
+        rows = np.flatnonzero(self.dirty)
+        if not len(rows):
+            return False
+        self.refreshes += 1
+        # প্রতি পূর্ণ চক্রে একবার নতুন করে হিসাব, যাতে ফ্লোটিং এরর না জমে
+        if self.refreshes >= self.window or len(rows) * 2 >= self.window:
+            self._rebuild()
+            return True
+        old_r, old_m = self._committed[0][rows], self._committed[1][rows]
+        new_r, new_m = self.returns[rows], self.mask[rows]
+        self.cross += new_r.T @ new_r - old_r.T @ old_r
+        self.sums += new_r.T @ new_m - old_r.T @ old_m
+        self.counts += new_m.T @ new_m - old_m.T @ old_m
+        self._committed[0][rows], self._committed[1][rows] = new_r, new_m
+        self.dirty[rows] = False
+        self._update_cov()
+        return True
+
+    def _update_cov(self):
+        counts = np.maximum(self.counts, 1.0)
+        mean_i = self.sums / counts
+        cov = self.cross / counts - mean_i * mean_i.T
+        enough = self.counts >= self.min_periods
+        cov = np.where(enough, cov, 0.0)
+        diag = np.maximum(np.diagonal(cov), self.min_var)
+        np.fill_diagonal(cov, diag)
+        vol = np.sqrt(diag)
+        corr = np.clip(cov / np.outer(vol, vol), -1.0, 1.0)
+        np.fill_diagonal(corr, 1.0)
+        self.cov, self.vol, self.corr = cov, vol, corr
+        self._update_exposure()
+
+    def _update_exposure(self):
+        w = self.positions
+        self.cov_w = self.cov @ w
+        self.corr_w = self.corr @ w
+        self.variance = float(w @ self.cov_w)
+        self.gross = float(np.abs(w).sum())
+
+    # --- পজিশন ---
+
+    def apply(self, symbol, usd):
+        """Add a signed USD amount to the position of ``symbol`` (buy positive, sell negative)."""
+        i = self.index.get(symbol)
+        if i is None:
+            self.set_universe([*self.symbols, symbol])
+            i = self.index[symbol]
+        old = self.positions[i]
+        self.positions[i] += usd
+        self.cov_w += usd * self.cov[:, i]
+        self.corr_w += usd * self.corr[:, i]
+        self.variance = float(self.positions @ self.cov_w)
+        self.gross += float(abs(self.positions[i]) - abs(old))
+
+    def var(self, positions=None):
+        """Parametric VaR in USD over ``RISK_VAR_HORIZON`` bars."""
+        variance = self.variance if positions is None else float(positions @ self.cov @ positions)
+        return RISK_VAR_Z * math.sqrt(max(variance, 0.0) * RISK_VAR_HORIZON)
+
+    def size(self, symbols, usd, balance, max_var=RISK_MAX_VAR, max_gross=RISK_MAX_GROSS,
+             max_symbol=RISK_MAX_SYMBOL, max_correlated=RISK_MAX_CORRELATED):
+        """Largest part of each signed USD trade that keeps the book within every limit.
+
+        Each trade is checked on its own against the current positions. A trade
+        that reduces a limit already exceeded is allowed up to the point where
+        it would make things worse again. Limits are fractions of ``balance``.
+        """
+        idx = np.fromiter((self.index.get(s, -1) for s in symbols), dtype=np.int64)
+        usd = np.asarray(usd, dtype=np.float64)
+        sign, want = np.sign(usd), np.abs(usd)
+        # অজানা সিম্বল (-1) শেষের ফাঁকা পজিশন ও ন্যূনতম ভ্যারিয়েন্স পায়
+        w = np.append(self.positions, 0.0)[idx]
+        cov_w = np.append(self.cov_w, 0.0)[idx]
+        corr_w = np.append(self.corr_w, 0.0)[idx]
+        var_i = np.append(np.diagonal(self.cov), self.min_var)[idx]
+
+        # |x_i + t| ≤ সীমা ধরনের শর্ত: t ≤ সীমা - sign * x_i
+        symbol_room = max_symbol * balance - sign * w
+        gross_room = max_gross * balance - self.gross + np.abs(w) - sign * w
+        correlated_room = max_correlated * balance - sign * corr_w
+
+        # VaR: var + 2 t s (cov w)_i + t^2 cov_ii ≤ max(var, limit^2)
+        limit = max_var * balance / (RISK_VAR_Z * math.sqrt(RISK_VAR_HORIZON))
+        c = self.variance - max(self.variance, limit * limit)
+        b = sign * cov_w
+        var_room = (np.sqrt(np.maximum(b * b - var_i * c, 0.0)) - b) / var_i
+
+        allowed = np.minimum.reduce([want, symbol_room, gross_room, correlated_room, var_room])
+        allowed = np.maximum(allowed, 0.0)
+        return sign * allowed
+
+    def size_trade(self, symbol, usd, balance, min_fill=RISK_MIN_FILL):
+        """Signed USD amount to trade for one signal, or 0 if less than ``min_fill`` of it fits."""
+        sized = float(self.size([symbol], [usd], balance)[0])
+        fraction = abs(sized) / abs(usd) if usd else 0.0
+        logger.info("Risk assessment: %s %s | Size: $%.2f of $%.2f, VaR: $%.2f, Gross: $%.2f",
+                    'Accept' if fraction >= min_fill else 'Reject', symbol, sized, usd, self.var(), self.gross)
+        return sized if fraction >= min_fill else 0.0
+
+    def stats(self):
+        held = np.flatnonzero(self.positions)
+        return {
+            "symbols": len(self.symbols),
+            "positions": {self.symbols[i]: round(float(self.positions[i]), 2) for i in held},
+            "gross": round(self.gross, 2),
+            "var": round(self.var(), 2),
+            "bars": int((self.row_ts >= 0).sum()),
+        }
@@ -0,0 +1,219 @@
+# src/trading/rate_limiter.py
+import asyncio
+import heapq
+import itertools
+import os
+import time
+import weakref
+import ccxt.async_support as ccxt
+from tenacity import wait_exponential
+from src.utils.logger import get_logger
+from src.utils.metrics import RATE_LIMIT_SHED, RATE_LIMIT_WAIT, RATE_LIMITED
+
+logger = get_logger("RateLimiter")
+
+# কম সংখ্যা = বেশি অগ্রাধিকার
+PRIORITY_ORDER = 0
+PRIORITY_TRADE = 1  # ট্রেড পাথের টিকার/ভোলাটিলিটি ডেটা
+PRIORITY_DATA = 2   # স্ক্যান লুপের ক্যান্ডেল পোলিং
+PRIORITY_BACKGROUND = 3  # ড্যাশবোর্ড, মার্কেট মেটাডেটা
+PRIORITY_NAMES = {0: "order", 1: "trade", 2: "data", 3: "background"}
+
+# Bitget-এর ডকুমেন্টেড সীমা: (রিকোয়েস্ট/সেকেন্ড, বার্স্ট)
+BITGET_LIMITS = {
+    "ohlcv": (20, 20),
+    "ticker": (20, 20),
+    "markets": (20, 20),
+    "order": (10, 10),
+    "order_status": (20, 20),
+}
+RATE_LIMIT_GLOBAL = float(os.getenv("RATE_LIMIT_GLOBAL", "50"))
+RATE_LIMIT_MAX_WAIT = float(os.getenv("RATE_LIMIT_MAX_WAIT", "5"))
+RATE_LIMIT_PENALTY = float(os.getenv("RATE_LIMIT_PENALTY", "2"))
+
+
+class RateLimitShed(Exception):
+    """A low-priority request was dropped because its endpoint is saturated."""
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def delay(self, weight, now):
+        """Seconds until ``weight`` tokens are available (0 if they are now)."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        blocked = max(self.blocked_until - now, 0.0)
+        if self.tokens >= weight:
+            return blocked
+        return max(blocked, (weight - self.tokens) / self.rate)
+
+    def take(self, weight):
+        self.tokens -= weight
+
+    def penalize(self, seconds, now):
+        self.tokens = 0.0
+        self.blocked_until = max(self.blocked_until, now + seconds)
+
+
+class RateLimitScheduler:
+    """Weighted token buckets per endpoint plus one account-wide bucket.
+
+    Every exchange call acquires from its endpoint bucket and the global
+    bucket. Waiters are served in priority order, and an endpoint whose
+    bucket is empty does not block other endpoints, so an order never waits
+    behind a backlog of candle requests. Requests at ``PRIORITY_DATA`` or
+    lower are shed with ``RateLimitShed`` when their projected or actual
+    wait exceeds ``max_wait``. A 429 empties the endpoint bucket for
+    ``penalty`` seconds instead of each caller backing off blindly.
+    Must be used from a single event loop.
+    """
+
+    def __init__(self, limits=BITGET_LIMITS, global_rate=RATE_LIMIT_GLOBAL,
+                 max_wait=RATE_LIMIT_MAX_WAIT, penalty=RATE_LIMIT_PENALTY):
+        self.buckets = {name: TokenBucket(rate, burst) for name, (rate, burst) in limits.items()}
+        self.global_bucket = TokenBucket(global_rate)
+        self.max_wait = max_wait
+        self.penalty = penalty
+        self._waiters = []  # heap of (priority, seq, endpoint, weight, future, enqueued)
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._dispatcher = None
+        self.granted = 0
+        self.shed = 0
+        self.throttled = 0
+        self.wait_total = 0.0
+        self.max_wait_seen = 0.0
+
+    def _bucket(self, endpoint):
+        bucket = self.buckets.get(endpoint)
+        if bucket is None:
+            bucket = self.buckets[endpoint] = TokenBucket(*BITGET_LIMITS["ticker"])
+        return bucket
+
+    def stats(self):
+        return {
+            "queued": len(self._waiters),
+            "granted": self.granted,
+            "shed": self.shed,
+            "throttled": self.throttled,
+            "avg_wait": round(self.wait_total / self.granted, 4) if self.granted else 0.0,
+            "max_wait": round(self.max_wait_seen, 4),
+        }
+
+    def _shed(self, endpoint, priority, reason):
+        self.shed += 1
+        RATE_LIMIT_SHED.labels(endpoint).inc()
+        return RateLimitShed(f"{endpoint} request shed at priority {PRIORITY_NAMES.get(priority, priority)}: {reason}")
+
+    def _record(self, endpoint, priority, waited):
+        self.granted += 1
+        self.wait_total += waited
+        self.max_wait_seen = max(self.max_wait_seen, waited)
+        RATE_LIMIT_WAIT.labels(endpoint, PRIORITY_NAMES.get(priority, str(priority))).observe(waited)
+
+    async def acquire(self, endpoint, priority=PRIORITY_DATA, weight=1):
+        bucket = self._bucket(endpoint)
+        now = time.monotonic()
+        if not self._waiters and bucket.delay(weight, now) == 0 and self.global_bucket.delay(weight, now) == 0:
+            bucket.take(weight)
+            self.global_bucket.take(weight)
+            self._record(endpoint, priority, 0.0)
+            return
+
+        if priority >= PRIORITY_DATA:
+            # লাইনে সামনে যত রিকোয়েস্ট আছে তা থেকে আনুমানিক অপেক্ষা
+            ahead = sum(w for p, _, e, w, f, _ in self._waiters if e == endpoint and p <= priority and not f.done())
+            projected = bucket.delay(ahead + weight, now)
+            if projected > self.max_wait:
+                raise self._shed(endpoint, priority, f"projected wait {projected:.1f}s")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), endpoint, weight, future, now))
+        self._wakeup.set()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        await future
+        self._record(endpoint, priority, time.monotonic() - now)
+
+    async def _dispatch(self):
+        while self._waiters:
+            self._wakeup.clear()
+            now = time.monotonic()
+            sleep_for = self.max_wait
+            global_blocked = False
+            pending = []
+            for entry in sorted(self._waiters):
+                priority, _, endpoint, weight, future, enqueued = entry
+                if future.done():
+                    continue  # কলার বাতিল করেছে
+                if priority >= PRIORITY_DATA and now - enqueued > self.max_wait:
+                    future.set_exception(self._shed(endpoint, priority, "waited too long"))
+                    continue
+                if not global_blocked:
+                    g = self.global_bucket.delay(weight, now)
+                    if g > 0:
+                        # উচ্চ অগ্রাধিকারের জন্য গ্লোবাল টোকেন সংরক্ষিত থাকে
+                        global_blocked = True
+                        sleep_for = min(sleep_for, g)
+                if global_blocked:
+                    pending.append(entry)
+                    continue
+                e = self._bucket(endpoint).delay(weight, now)
+                if e > 0:
+                    sleep_for = min(sleep_for, e)
+                    pending.append(entry)
+                    continue
+                self._bucket(endpoint).take(weight)
+                self.global_bucket.take(weight)
+                future.set_result(None)
+            heapq.heapify(pending)
+            self._waiters = pending
+            if pending:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), sleep_for)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def send(self, endpoint, request):
+        """Await ``request`` (an exchange call already admitted by ``acquire``), noting 429s."""
+        try:
+            return await request
+        except ccxt.RateLimitExceeded:
+            self.throttled += 1
+            RATE_LIMITED.labels(endpoint).inc()
+            self._bucket(endpoint).penalize(self.penalty, time.monotonic())
+            logger.warning(f"Exchange throttled {endpoint}, pausing it for {self.penalty}s")
+            raise
+
+
+_exponential = wait_exponential(multiplier=1, min=2, max=10)
+
+
+def wait_unless_throttled(retry_state):
+    """tenacity wait: retry a 429 at once (the bucket paces it), back off on other errors."""
+    if isinstance(retry_state.outcome.exception(), ccxt.RateLimitExceeded):
+        return 0
+    return _exponential(retry_state)
+
+
+_schedulers = weakref.WeakKeyDictionary()
+
+
+def get_rate_limiter():
+    """Return the scheduler shared by every exchange client on the running loop."""
+    loop = asyncio.get_running_loop()
+    scheduler = _schedulers.get(loop)
+    if scheduler is None:
+        scheduler = _schedulers[loop] = RateLimitScheduler()
+    return scheduler
+
+
+def set_rate_limiter(scheduler):
+    """Use ``scheduler`` for every exchange client on the running loop (benchmarks, tests)."""
+    _schedulers[asyncio.get_running_loop()] = scheduler
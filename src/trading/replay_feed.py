@@ -0,0 +1,108 @@
+# src/trading/replay_feed.py
+"""Local websocket server that replays recorded market data.
+
+The input is a JSON-lines file with one event per line::
+
+    {"type": "candle", "symbol": "BTC/USDT:USDT", "timeframe": "1m", "candle": [ts, o, h, l, c, v]}
+    {"type": "ticker", "symbol": "BTC/USDT:USDT", "ticker": {"timestamp": ts, "last": 65000.0}}
+
+Clients connect to ``/ws``, send ``{"op": "subscribe", "args": [{"symbol": ..., "timeframe": ...}]}``
+and receive the matching events paced by their timestamps divided by ``speed``.
+
+    python -m src.trading.replay_feed --file data/replay.jsonl --port 8765 --speed 60
+"""
+import argparse
+import asyncio
+import json
+from aiohttp import web, WSMsgType
+from src.utils.logger import get_logger
+
+logger = get_logger("ReplayFeed")
+
+
+def load_events(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def event_ts(event):
+    if event["type"] == "candle":
+        return event["candle"][0]
+    return event["ticker"].get("timestamp") or 0
+
+
+class ReplayFeedServer:
+    def __init__(self, events, speed=0.0, loop_forever=False):
+        self.events = events
+        self.speed = speed  # 0 হলে কোনো বিরতি ছাড়াই যত দ্রুত সম্ভব
+        self.loop_forever = loop_forever
+        self.app = web.Application()
+        self.app.router.add_get("/ws", self.handle)
+
+    def matches(self, event, subscriptions):
+        if event["type"] == "ticker":
+            return any(symbol == event["symbol"] for symbol, _ in subscriptions)
+        return (event["symbol"], event["timeframe"]) in subscriptions
+
+    async def _replay(self, ws, subscriptions):
+        while True:
+            previous_ts = None
+            for event in self.events:
+                if not self.matches(event, subscriptions):
+                    continue
+                ts = event_ts(event)
+                if self.speed and previous_ts is not None and ts > previous_ts:
+                    await asyncio.sleep((ts - previous_ts) / 1000 / self.speed)
+                previous_ts = ts
+                await ws.send_json(event)
+            if not self.loop_forever:
+                break
+
+    async def handle(self, request):
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        subscriptions = set()
+        replay_task = None
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                data = json.loads(msg.data)
+                if data.get("op") != "subscribe":
+                    continue
+                subscriptions |= {(a["symbol"], a["timeframe"]) for a in data.get("args", [])}
+                # প্রথম সাবস্ক্রিপশনের পর রিপ্লে শুরু; পরের সাবস্ক্রিপশনগুলো চলমান রিপ্লেতে যুক্ত হয়
+                if replay_task is None:
+                    replay_task = asyncio.create_task(self._replay(ws, subscriptions))
+        finally:
+            if replay_task is not None:
+                replay_task.cancel()
+        return ws
+
+    async def start(self, host="127.0.0.1", port=8765):
+        runner = web.AppRunner(self.app)
+        await runner.setup()
+        site = web.TCPSite(runner, host, port)
+        await site.start()
+        logger.info(f"Replaying {len(self.events)} events on ws://{host}:{port}/ws")
+        return runner
+
+
+async def _serve(args):
+    server = ReplayFeedServer(load_events(args.file), args.speed, args.loop)
+    await server.start(args.host, args.port)
+    await asyncio.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded market data over a websocket")
+    parser.add_argument("--file", required=True)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--speed", type=float, default=0.0)
+    parser.add_argument("--loop", action="store_true")
+    asyncio.run(_serve(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,71 @@
 # src/trading/risk_manager.py
 import numpy as np
 from src.utils.logger import get_logger
+from src.trading.candles import as_series
+from src.trading.indicators import ReturnVolatility
 
 logger = get_logger("RiskManager")
 
 class RiskManager:
+    """Single-trade volatility check used by the backtester.
+
+    The live bot sizes trades with ``PortfolioRisk`` instead, which replaces
+    this check with exposure, correlation and VaR limits over the whole book.
+    """
+
     def __init__(self, min_vol=0.01):
         self.min_volatility = min_vol
 
+    def new_volatility_state(self, window=100):
+        """Incremental counterpart of ``calculate_volatility`` over ``window`` candles."""
+        return ReturnVolatility(window)
+
     def calculate_volatility(self, hist_data):
-        if not hist_data or len(hist_data) < 2:
+        if isinstance(hist_data, ReturnVolatility):
+            if not hist_data.ready:
+                return self.min_volatility
+            return max(hist_data.value, self.min_volatility)
+
+        if hist_data is None or len(hist_data) < 2:
             return self.min_volatility
             
-        closes = [candle[4] for candle in hist_data]
+        closes = as_series(hist_data).close
         returns = np.diff(closes) / closes[:-1]
         volatility = np.std(returns)
-        logger.debug(f"Calculated volatility: {volatility:.6f}")
+        logger.debug("Calculated volatility: %.6f", volatility)
         return max(volatility, self.min_volatility)
 
-    def should_accept_trade(self, size, volatility, balance, max_risk=0.02):
-        position_value = size * balance
-        risk = volatility * position_value
+    def should_accept_trade(self, usd_amount, volatility, balance, max_risk=0.02):
+        # usd_amount ইতিমধ্যে USD-তে; ব্যালান্স দিয়ে আবার গুণ হবে না
+        risk = volatility * abs(usd_amount)
         max_acceptable_risk = balance * max_risk
         accept = risk <= max_acceptable_risk
-        logger.info(f"Risk assessment: {'Accept' if accept else 'Reject'} | "
-                    f"Risk: ${risk:.2f}, Max: ${max_acceptable_risk:.2f}")
-        return accept
\ No newline at end of file
+        logger.info("Risk assessment: %s | Risk: $%.2f, Max: $%.2f",
+                    'Accept' if accept else 'Reject', risk, max_acceptable_risk)
+        return accept
+
+    def rolling_volatility(self, closes, window=100):
+        """Vectorized ``calculate_volatility`` for every bar of a close series.
+
+        Element ``t`` is the std of the returns inside the ``window`` closes
+        ending at bar ``t``; bars without a full window get ``min_volatility``.
+        """
+        closes = np.asarray(closes, dtype=np.float64)
+        volatility = np.full(closes.shape[0], self.min_volatility)
+        n = window - 1  # রিটার্নের সংখ্যা
+        if closes.shape[0] < window or n < 1:
+            return volatility
+
+        returns = np.diff(closes) / closes[:-1]
+        csum = np.concatenate(([0.0], np.cumsum(returns)))
+        csum_sq = np.concatenate(([0.0], np.cumsum(returns * returns)))
+        total = csum[n:] - csum[:-n]
+        total_sq = csum_sq[n:] - csum_sq[:-n]
+        variance = np.maximum(total_sq / n - (total / n) ** 2, 0.0)
+        volatility[window - 1:] = np.maximum(np.sqrt(variance), self.min_volatility)
+        return volatility
+
+    def should_accept_trades(self, usd_amount, volatility, balance, max_risk=0.02):
+        """Vectorized ``should_accept_trade`` over an array of volatilities."""
+        risk = np.asarray(volatility) * abs(usd_amount)
+        return risk <= balance * max_risk
@@ -0,0 +1,207 @@
+# src/trading/scanner.py
+import asyncio
+import heapq
+import itertools
+import os
+import time
+import zlib
+from src.utils.logger import get_logger
+from src.trading.candle_cache import timeframe_ms
+from src.utils.metrics import SCHEDULE_LAG
+
+logger = get_logger("ScanScheduler")
+
+SCAN_CONCURRENCY = int(os.getenv("SCAN_CONCURRENCY", "10"))
+# ক্যান্ডেল ক্লোজের এত সেকেন্ড পরে মূল্যায়ন, যাতে এক্সচেঞ্জে ক্যান্ডেলটি চূড়ান্ত হয়
+SCHEDULE_SETTLE = float(os.getenv("SCHEDULE_SETTLE", "1.5"))
+# প্রতি জবের স্থির অফসেট (সর্বোচ্চ সেকেন্ড, টাইমফ্রেমের ১০% এর বেশি নয়), যাতে সব রিকোয়েস্ট একসাথে না যায়
+SCHEDULE_JITTER = float(os.getenv("SCHEDULE_JITTER", "2"))
+# ক্লোজড ক্যান্ডেল এখনো না এলে আবার চেষ্টা
+SCHEDULE_RETRY = float(os.getenv("SCHEDULE_RETRY", "2"))
+SCHEDULE_MAX_RETRIES = int(os.getenv("SCHEDULE_MAX_RETRIES", "3"))
+
+
+class ScanScheduler:
+    """Fans out per (pair, timeframe) work with bounded concurrency.
+
+    The shared RateLimitScheduler already throttles requests to the exchange
+    rate limit, so the semaphore only caps how many jobs are in flight at
+    once. Results are returned in (pair, timeframe) order regardless of
+    completion order.
+    """
+
+    def __init__(self, max_concurrency=SCAN_CONCURRENCY):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.last_cycle_seconds = 0.0
+        self.last_job_count = 0
+
+    async def _run_job(self, semaphore, worker, pair, timeframe):
+        async with semaphore:
+            try:
+                return await worker(pair, timeframe)
+            except Exception as e:
+                logger.error(f"Error processing {pair}@{timeframe}: {e}")
+                return None
+
+    async def scan(self, pairs, timeframes, worker):
+        """Run ``worker(pair, timeframe)`` for every combination.
+
+        Returns a list of ``(pair, timeframe, result)`` tuples in input order.
+        """
+        jobs = [(pair, timeframe) for pair in pairs for timeframe in timeframes]
+        return await self.scan_jobs(jobs, worker)
+
+    async def scan_jobs(self, jobs, worker):
+        """Run ``worker`` for an explicit list of ``(pair, timeframe)`` jobs."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        started = time.perf_counter()
+
+        results = await asyncio.gather(*[
+            self._run_job(semaphore, worker, pair, timeframe)
+            for pair, timeframe in jobs
+        ])
+
+        self.last_cycle_seconds = time.perf_counter() - started
+        self.last_job_count = len(jobs)
+        logger.info("Scanned %d pair/timeframe jobs in %.2fs (concurrency=%d)",
+                    len(jobs), self.last_cycle_seconds, self.max_concurrency)
+        return [(pair, timeframe, result) for (pair, timeframe), result in zip(jobs, results)]
+
+
+class CandleScheduler:
+    """Min-heap of (pair, timeframe) jobs keyed by their next candle close.
+
+    Each job is due ``settle`` seconds after its timeframe boundary, plus a
+    fixed per-job offset of up to ``jitter`` seconds derived from its key so
+    the same jobs do not all hit the exchange in the same instant. Jobs
+    whose boundaries were missed (a long cycle, an error) run once and move
+    to the next boundary in the future; the worker catches up by reading
+    every candle closed since its last run. A job that found no new closed
+    candle can be retried shortly after, up to ``max_retries`` times per
+    boundary. Jobs that are added run immediately to warm their state.
+    """
+
+    def __init__(self, settle=SCHEDULE_SETTLE, jitter=SCHEDULE_JITTER, retry=SCHEDULE_RETRY,
+                 max_retries=SCHEDULE_MAX_RETRIES, clock=time.time):
+        self.settle = settle
+        self.jitter = jitter
+        self.retry_delay = retry
+        self.max_retries = max_retries
+        self.clock = clock
+        self._heap = []  # (due, seq, key)
+        self._seq = itertools.count()
+        self.jobs = {}  # key -> [seq, boundary_ms, retries]
+        self.runs = 0
+        self.missed = 0
+        self.retries = 0
+
+    def _offset(self, key):
+        tf_seconds = timeframe_ms(key[1]) / 1000
+        spread = min(self.jitter, tf_seconds * 0.1)
+        return self.settle + spread * (zlib.crc32(f"{key[0]}|{key[1]}".encode()) / 2 ** 32)
+
+    def _push(self, key, due, boundary_ms, retries=0):
+        seq = next(self._seq)
+        self.jobs[key] = [seq, boundary_ms, retries]
+        heapq.heappush(self._heap, (due, seq, key))
+
+    def _schedule_next(self, key, now):
+        """Queue ``key`` at its first boundary whose due time is after ``now``."""
+        tf_ms = timeframe_ms(key[1])
+        offset = self._offset(key)
+        boundary = (int((now - offset) * 1000) // tf_ms + 1) * tf_ms
+        # একই বাউন্ডারির রিট্রাই গোনা চলতে থাকে
+        job = self.jobs.get(key)
+        retries = job[2] if job is not None and job[1] == boundary else 0
+        self._push(key, boundary / 1000 + offset, boundary, retries)
+
+    def set_jobs(self, jobs):
+        """Schedule new ``(pair, timeframe)`` jobs now and forget jobs no longer listed."""
+        jobs = dict.fromkeys(jobs)
+        now = self.clock()
+        for key in [k for k in self.jobs if k not in jobs]:
+            del self.jobs[key]
+        for key in jobs:
+            if key not in self.jobs:
+                self._push(key, now, None)
+        # বাদ পড়া জবের হিপ এন্ট্রি অলসভাবে ফেলা হয়; হিপ খুব বড় হলে নতুন করে বানানো
+        if len(self._heap) > 2 * len(self.jobs) + 64:
+            self._heap = [e for e in self._heap if self._valid(e)]
+            heapq.heapify(self._heap)
+
+    def reset(self):
+        """Make every job due now, e.g. after the strategy changed."""
+        now = self.clock()
+        for key, (_, boundary, _) in list(self.jobs.items()):
+            self._push(key, now, boundary)
+
+    def _valid(self, entry):
+        job = self.jobs.get(entry[2])
+        return job is not None and job[0] == entry[1]
+
+    def next_due(self):
+        """Due time of the earliest job, or None when there are no jobs."""
+        while self._heap and not self._valid(self._heap[0]):
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self):
+        """Return every job that is due and queue each at its next boundary."""
+        now = self.clock()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            if not self._valid(entry):
+                continue
+            key = entry[2]
+            boundary = self.jobs[key][1]
+            if boundary is not None and entry[0] >= boundary / 1000:
+                # ক্লোজের পর কতক্ষণে মূল্যায়ন শুরু হলো; একাধিক বার পার হলে বাকিগুলো মিস
+                SCHEDULE_LAG.observe(now - boundary / 1000)
+                self.missed += int((now - entry[0]) * 1000 // timeframe_ms(key[1]))
+            self.runs += 1
+            due.append(key)
+            self._schedule_next(key, now)
+        return due
+
+    async def wait_due(self, timeout=None):
+        """Sleep until jobs are due (at most ``timeout`` seconds) and return them."""
+        next_due = self.next_due()
+        delay = timeout if next_due is None else max(next_due - self.clock(), 0.0)
+        if timeout is not None:
+            delay = min(delay, timeout)
+        if delay:
+            await asyncio.sleep(delay)
+        return self.pop_due()
+
+    def expected_close(self, key):
+        """Open timestamp (ms) of the candle that the last run of ``key`` should have seen closed."""
+        job = self.jobs.get(key)
+        if job is None:
+            return None
+        boundary = job[1] - timeframe_ms(key[1])
+        return boundary - timeframe_ms(key[1])
+
+    def retrying(self, key):
+        """True while ``key`` is being re-run for the same boundary."""
+        job = self.jobs.get(key)
+        return job is not None and job[2] > 0
+
+    def retry(self, key):
+        """Run ``key`` again shortly because its boundary candle was not closed on the exchange yet."""
+        job = self.jobs.get(key)
+        if job is None or job[2] >= self.max_retries:
+            return False
+        self.retries += 1
+        self._push(key, self.clock() + self.retry_delay, job[1], job[2] + 1)
+        return True
+
+    def stats(self):
+        next_due = self.next_due()
+        return {
+            "jobs": len(self.jobs),
+            "next_due_in": round(next_due - self.clock(), 2) if next_due is not None else None,
+            "runs": self.runs,
+            "missed_boundaries": self.missed,
+            "retries": self.retries,
+        }
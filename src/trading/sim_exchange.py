@@ -0,0 +1,443 @@
+# src/trading/sim_exchange.py
+"""Local stand-in for the ccxt Bitget client: market data, a matching engine and one account.
+
+    EXCHANGE_BACKEND=sim SIM_SOURCE=synthetic uvicorn src.api.bot_service:app --port 8000
+"""
+import asyncio
+import datetime
+import os
+import random
+import time
+import uuid
+import zlib
+from collections import Counter
+import numpy as np
+import ccxt.async_support as ccxt
+from src.utils.logger import get_logger
+from src.trading.candle_cache import timeframe_ms
+from src.trading.ohlcv_store import OHLCVStore
+
+logger = get_logger("SimExchange")
+
+SIM_SOURCE = os.getenv("SIM_SOURCE", "replay")  # replay | synthetic | quotes
+SIM_SYMBOLS = [s for s in os.getenv(
+    "SIM_SYMBOLS", "BTC/USDT:USDT,ETH/USDT:USDT,SOL/USDT:USDT,XRP/USDT:USDT,DOGE/USDT:USDT").split(",") if s]
+SIM_SEED = int(os.getenv("SIM_SEED", "7"))
+SIM_START = os.getenv("SIM_START")  # ms টাইমস্ট্যাম্প; না দিলে এখন থেকে
+SIM_SPEED = float(os.getenv("SIM_SPEED", "1"))  # 0 = ঘড়ি শুধু advance() দিয়ে চলে
+SIM_BALANCE = float(os.getenv("SIM_BALANCE", "1000"))
+SIM_LEVERAGE = float(os.getenv("SIM_LEVERAGE", "1"))
+SIM_FEE = float(os.getenv("SIM_FEE", "0.0006"))
+SIM_SLIPPAGE = float(os.getenv("SIM_SLIPPAGE", "0.0002"))
+SIM_IMPACT = float(os.getenv("SIM_IMPACT", "0.1"))  # অর্ডার/ক্যান্ডেল ভলিউম অনুপাতের উপর দাম সরে
+SIM_VOLATILITY = float(os.getenv("SIM_VOLATILITY", "0.001"))  # প্রতি মিনিটের রিটার্নের std
+SIM_HISTORY_BARS = int(os.getenv("SIM_HISTORY_BARS", "1500"))
+SIM_LATENCY = float(os.getenv("SIM_LATENCY", "0.05"))
+SIM_LATENCY_JITTER = float(os.getenv("SIM_LATENCY_JITTER", "0.02"))
+SIM_ERROR_RATE = float(os.getenv("SIM_ERROR_RATE", "0"))
+SIM_LOST_ACK_RATE = float(os.getenv("SIM_LOST_ACK_RATE", "0"))
+SIM_RATE_LIMIT = float(os.getenv("SIM_RATE_LIMIT", "0"))  # রিকোয়েস্ট/সেকেন্ড, 0 = সীমা নেই
+SIM_FILL_DELAY = float(os.getenv("SIM_FILL_DELAY", "0.2"))
+
+BAR_MS = 60_000
+CHUNK_BARS = 1440
+
+
+class SimClock:
+    """Exchange time in ms: ``start`` plus wall time times ``speed``, plus manual ``advance`` steps."""
+
+    def __init__(self, start_ms=None, speed=SIM_SPEED):
+        self.start_ms = int(start_ms) if start_ms is not None else int(time.time() * 1000)
+        self.speed = speed
+        self._t0 = time.monotonic()
+        self.offset_ms = 0
+
+    def now_ms(self):
+        return self.start_ms + self.offset_ms + int((time.monotonic() - self._t0) * 1000 * self.speed)
+
+    def advance(self, ms):
+        self.offset_ms += int(ms)
+
+
+class SimMarket:
+    """1m bars of one symbol: stored history when there is any, extended by a seeded random walk."""
+
+    def __init__(self, symbol, start_ms, seed, bars=None, volatility=SIM_VOLATILITY):
+        self.symbol = symbol
+        self.volatility = volatility
+        self.rng = np.random.default_rng([seed, zlib.crc32(symbol.encode())])
+        if bars is None or not len(bars):
+            first = (start_ms // BAR_MS - SIM_HISTORY_BARS) * BAR_MS
+            price = float(10 ** self.rng.uniform(-1, 4.5))
+            bars = np.array([[first - BAR_MS, price, price, price, price, 0.0]])
+        self.bars = np.ascontiguousarray(bars, dtype=np.float64)
+
+    def _extend(self):
+        n = CHUNK_BARS
+        last_ts, last_close = self.bars[-1, 0], self.bars[-1, 4]
+        returns = self.rng.normal(0.0, self.volatility, n)
+        close = last_close * np.cumprod(1 + returns)
+        open_ = np.concatenate(([last_close], close[:-1]))
+        wick = np.abs(self.rng.normal(0.0, self.volatility / 2, (2, n)))
+        quote_volume = self.rng.lognormal(12, 1, n)
+        chunk = np.column_stack((
+            last_ts + BAR_MS * np.arange(1, n + 1),
+            open_,
+            np.maximum(open_, close) * (1 + wick[0]),
+            np.minimum(open_, close) * (1 - wick[1]),
+            close,
+            quote_volume / close,
+        ))
+        self.bars = np.concatenate((self.bars, chunk))
+
+    def ensure(self, now_ms):
+        while self.bars[-1, 0] <= now_ms:
+            self._extend()
+
+    def bar_at(self, now_ms):
+        self.ensure(now_ms)
+        i = int(np.searchsorted(self.bars[:, 0], now_ms, side="right")) - 1
+        return self.bars[max(i, 0)]
+
+    def price(self, now_ms):
+        """Price inside the current bar, moving linearly from its open to its close."""
+        bar = self.bar_at(now_ms)
+        frac = min(max((now_ms - bar[0]) / BAR_MS, 0.0), 1.0)
+        return float(bar[1] + (bar[4] - bar[1]) * frac)
+
+    def candles(self, now_ms, start_ms):
+        """1m bars from ``start_ms`` up to ``now_ms``; the last one is cut at the current price."""
+        self.ensure(now_ms)
+        ts = self.bars[:, 0]
+        lo = int(np.searchsorted(ts, start_ms, side="left"))
+        hi = int(np.searchsorted(ts, now_ms, side="right"))
+        rows = self.bars[lo:hi].copy()
+        if len(rows) and rows[-1, 0] + BAR_MS > now_ms:
+            price = self.price(now_ms)
+            last = rows[-1]
+            last[2], last[3], last[4] = max(last[1], price), min(last[1], price), price
+            last[5] *= (now_ms - last[0]) / BAR_MS
+        return rows
+
+
+class SimulatedExchange:
+    """Implements the ccxt methods the bot calls, against simulated markets and one account.
+
+    Prices come from 1m bars: the local OHLCV store when it has history at the
+    clock's start (``replay``), a deterministic random walk per symbol
+    (``synthetic``, and the continuation of stored history), or the last
+    price passed to ``quote`` (``quotes``, for paper trading on live data).
+    Market orders fill ``fill_delay`` seconds after submission at the price
+    of that moment, plus slippage and an impact term that grows with the
+    order's share of the bar volume, and update a one-way position and a
+    USDT balance. Latency, network errors, lost acknowledgements and 429s
+    are injected from a seeded RNG, so a run with the same requests and a
+    stepped clock (``speed=0``) is reproducible.
+    """
+
+    id = "bitget-sim"
+
+    def __init__(self, symbols=None, source=SIM_SOURCE, clock=None, seed=SIM_SEED, balance=SIM_BALANCE,
+                 leverage=SIM_LEVERAGE, fee=SIM_FEE, slippage=SIM_SLIPPAGE, impact=SIM_IMPACT,
+                 latency=SIM_LATENCY, latency_jitter=SIM_LATENCY_JITTER, error_rate=SIM_ERROR_RATE,
+                 lost_ack_rate=SIM_LOST_ACK_RATE, rate_limit=SIM_RATE_LIMIT, fill_delay=SIM_FILL_DELAY,
+                 store=None):
+        self.source = source
+        self.clock = clock or SimClock(SIM_START)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.leverage = leverage
+        self.fee = fee
+        self.slippage = slippage
+        self.impact = impact
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.lost_ack_rate = lost_ack_rate
+        self.rate_limit = rate_limit
+        self.fill_delay = fill_delay
+        self.store = store if store is not None or source != "replay" else OHLCVStore()
+        self.secret = None
+        self.symbols = []
+        self.markets = {}
+        self.currencies = {}
+        self.listed = list(symbols or SIM_SYMBOLS)
+        self._markets = {}
+        self._quotes = {}
+        self._tokens = rate_limit
+        self._tokens_at = time.monotonic()
+        self.cash = balance
+        self.positions = {}  # symbol -> [contracts, entry_price]
+        self.orders = {}
+        self.open_orders = {}
+        self.by_client_id = {}
+        self.calls = Counter()
+        self.counters = {"requests": 0, "errors": 0, "lost_acks": 0, "rate_limited": 0, "orders": 0, "fills": 0}
+        logger.info("Simulated exchange with %s prices (seed %d, %d listed symbols)", source, seed, len(self.listed))
+
+    # --- ভেতরের অংশ ---
+
+    def _market(self, symbol):
+        market = self._markets.get(symbol)
+        if market is None:
+            bars = None
+            if self.store is not None:
+                stored = self.store.candles(symbol, "1m")
+                start = self.clock.start_ms
+                if len(stored) and stored[0, 0] <= start <= stored[-1, 0] + BAR_MS:
+                    bars = np.array(stored)
+            market = self._markets[symbol] = SimMarket(symbol, self.clock.start_ms, self.seed, bars)
+        return market
+
+    def _check_symbol(self, symbol):
+        if self.markets and symbol not in self.markets:
+            raise ccxt.BadSymbol(f"{self.id} does not have market symbol {symbol}")
+
+    def _price(self, symbol, now_ms=None):
+        if self.source == "quotes":
+            price = self._quotes.get(symbol)
+            if price is None:
+                raise ccxt.ExchangeError(f"{self.id} has no quote for {symbol}")
+            return price
+        return self._market(symbol).price(now_ms or self.clock.now_ms())
+
+    async def _request(self, endpoint):
+        """Latency, 429 and network-error injection in front of every call."""
+        self.counters["requests"] += 1
+        self.calls[endpoint] += 1
+        if self.latency or self.latency_jitter:
+            await asyncio.sleep(self.latency + self.rng.uniform(0, self.latency_jitter))
+        if self.rate_limit:
+            now = time.monotonic()
+            self._tokens = min(self.rate_limit, self._tokens + (now - self._tokens_at) * self.rate_limit)
+            self._tokens_at = now
+            if self._tokens < 1:
+                self.counters["rate_limited"] += 1
+                raise ccxt.RateLimitExceeded(f"{self.id} 429 Too Many Requests ({endpoint})")
+            self._tokens -= 1
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self.counters["errors"] += 1
+            raise ccxt.RequestTimeout(f"{self.id} simulated timeout ({endpoint})")
+        self._settle()
+
+    def _settle(self):
+        now = self.clock.now_ms()
+        for order in [o for o in self.open_orders.values() if o["fill_at"] <= now]:
+            self._fill(order)
+
+    def _fill(self, order):
+        symbol = order["symbol"]
+        self.open_orders.pop(order["id"], None)
+        try:
+            mark = self._price(symbol, order["fill_at"])
+        except ccxt.ExchangeError:
+            order["status"] = "rejected"
+            return
+        bar = self._market(symbol).bar_at(order["fill_at"]) if self.source != "quotes" else None
+        share = order["amount"] / float(bar[5]) if bar is not None and bar[5] > 0 else 0.0
+        direction = 1 if order["side"] == "buy" else -1
+        price = mark * (1 + direction * (self.slippage + self.impact * share))
+        qty = direction * order["amount"]
+        cost = order["amount"] * price
+        fee = cost * self.fee
+
+        contracts, entry = self.positions.get(symbol, (0.0, 0.0))
+        realized = 0.0
+        if contracts and (contracts > 0) != (direction > 0):
+            closed = min(abs(qty), abs(contracts))
+            realized = closed * (price - entry) * (1 if contracts > 0 else -1)
+        new_contracts = contracts + qty
+        if abs(new_contracts) < 1e-12:
+            new_contracts, entry = 0.0, 0.0
+        elif (new_contracts > 0) != (contracts > 0):
+            entry = price  # পজিশন উল্টে গেছে
+        elif abs(new_contracts) > abs(contracts):
+            entry = (contracts * entry + qty * price) / new_contracts
+        if new_contracts:
+            self.positions[symbol] = [new_contracts, entry]
+        else:
+            self.positions.pop(symbol, None)
+        self.cash += realized - fee
+
+        order.update({
+            "status": "closed", "filled": order["amount"], "remaining": 0.0,
+            "average": price, "price": price, "cost": cost, "lastTradeTimestamp": order["fill_at"],
+            "fee": {"cost": fee, "currency": "USDT"},
+        })
+        order["info"]["realizedPnl"] = realized
+        self.counters["fills"] += 1
+
+    def _public_order(self, order):
+        out = {k: v for k, v in order.items() if k != "fill_at"}
+        out["info"] = dict(order["info"])
+        return out
+
+    def _equity(self):
+        unrealized, used = 0.0, 0.0
+        for symbol, (contracts, entry) in self.positions.items():
+            mark = self._price(symbol)
+            unrealized += contracts * (mark - entry)
+            used += abs(contracts) * mark / self.leverage
+        return self.cash + unrealized, used
+
+    # --- ccxt মেথড ---
+
+    def milliseconds(self):
+        return self.clock.now_ms()
+
+    def quote(self, symbol, ticker):
+        """Set the price orders on ``symbol`` fill at in ``quotes`` mode (a ticker dict or a number)."""
+        price = ticker.get("last") if isinstance(ticker, dict) else ticker
+        if price:
+            self._quotes[symbol] = float(price)
+
+    def set_markets(self, markets, currencies=None):
+        self.markets = dict(markets)
+        self.currencies = dict(currencies or {})
+        self.symbols = sorted(self.markets)
+        return self.markets
+
+    def set_markets_from_exchange(self, other):
+        return self.set_markets(other.markets, other.currencies)
+
+    async def load_markets(self, reload=False, params=None):
+        if self.markets and not reload:
+            return self.markets
+        await self._request("markets")
+        markets = {}
+        for symbol in self.listed:
+            base, quote = symbol.split(":")[0].split("/")
+            markets[symbol] = {
+                "id": f"{base}{quote}", "symbol": symbol, "base": base, "quote": quote, "settle": quote,
+                "type": "swap", "spot": False, "swap": True, "contract": True, "linear": True,
+                "active": True, "contractSize": 1.0, "precision": {"amount": 1e-6, "price": 1e-8},
+                "limits": {"amount": {"min": 1e-6, "max": None}, "cost": {"min": 1.0, "max": None}},
+                "taker": self.fee, "maker": self.fee,
+            }
+        return self.set_markets(markets, {"USDT": {"id": "USDT", "code": "USDT"}})
+
+    async def fetch_time(self, params=None):
+        await self._request("time")
+        return self.clock.now_ms()
+
+    async def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None, params=None):
+        await self._request("ohlcv")
+        if self.source == "quotes":
+            raise ccxt.NotSupported(f"{self.id} has no candles in quotes mode")
+        self._check_symbol(symbol)
+        tf_ms = timeframe_ms(timeframe)
+        limit = min(int(limit or 100), 1000)
+        now = self.clock.now_ms()
+        start = since if since is not None else (now // tf_ms - limit + 1) * tf_ms
+        rows = self._market(symbol).candles(now, start // tf_ms * tf_ms)
+        if not len(rows):
+            return []
+        # 1m বার থেকে টাইমফ্রেমের ক্যান্ডেল
+        keys = rows[:, 0] // tf_ms * tf_ms
+        first = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+        last = np.concatenate((first[1:] - 1, [len(rows) - 1]))
+        candles = np.column_stack((
+            keys[first], rows[first, 1],
+            np.maximum.reduceat(rows[:, 2], first), np.minimum.reduceat(rows[:, 3], first),
+            rows[last, 4], np.add.reduceat(rows[:, 5], first),
+        ))
+        candles = candles[candles[:, 0] >= (since or 0)]
+        candles = candles[:limit] if since is not None else candles[-limit:]
+        return [[int(c[0]), *c[1:]] for c in candles.tolist()]
+
+    async def fetch_ticker(self, symbol, params=None):
+        await self._request("ticker")
+        self._check_symbol(symbol)
+        now = self.clock.now_ms()
+        last = self._price(symbol, now)
+        spread = last * self.slippage
+        return {
+            "symbol": symbol, "timestamp": now,
+            "datetime": datetime.datetime.fromtimestamp(now / 1000, datetime.timezone.utc).isoformat(),
+            "last": last, "close": last, "bid": last - spread, "ask": last + spread, "info": {},
+        }
+
+    async def create_order(self, symbol, type, side, amount, price=None, params=None):
+        await self._request("order")
+        params = params or {}
+        if type != "market":
+            raise ccxt.NotSupported(f"{self.id} only simulates market orders")
+        if side not in ("buy", "sell"):
+            raise ccxt.InvalidOrder(f"{self.id} invalid side {side}")
+        self._check_symbol(symbol)
+        amount = float(amount)
+        if not amount > 0:
+            raise ccxt.InvalidOrder(f"{self.id} amount must be positive, got {amount}")
+        client_order_id = params.get("clientOrderId") or params.get("clientOid")
+        if client_order_id and client_order_id in self.by_client_id:
+            raise ccxt.DuplicateOrderId(f"{self.id} Duplicate clientOid {client_order_id}")
+
+        now = self.clock.now_ms()
+        mark = self._price(symbol, now)
+        equity, used = self._equity()
+        contracts = self.positions.get(symbol, (0.0, 0.0))[0]
+        direction = 1 if side == "buy" else -1
+        added = max(abs(contracts + direction * amount) - abs(contracts), 0.0)
+        if added * mark / self.leverage > equity - used:
+            raise ccxt.InsufficientFunds(f"{self.id} insufficient margin for {amount} {symbol}")
+
+        order_id = uuid.UUID(int=self.rng.getrandbits(128)).hex[:18]
+        order = {
+            "id": order_id, "clientOrderId": client_order_id or order_id, "symbol": symbol,
+            "type": "market", "side": side, "amount": amount, "filled": 0.0, "remaining": amount,
+            "price": None, "average": None, "cost": 0.0, "status": "open", "fee": None,
+            "timestamp": now, "lastTradeTimestamp": None, "trades": [],
+            "datetime": datetime.datetime.fromtimestamp(now / 1000, datetime.timezone.utc).isoformat(),
+            "fill_at": now + int(self.fill_delay * 1000), "info": {},
+        }
+        self.orders[order_id] = self.open_orders[order_id] = order
+        self.by_client_id[order["clientOrderId"]] = order_id
+        self.counters["orders"] += 1
+        if order["fill_at"] <= now:
+            self._fill(order)
+        # অর্ডার এক্সচেঞ্জে পৌঁছেছে কিন্তু উত্তর হারিয়ে গেছে
+        if self.lost_ack_rate and self.rng.random() < self.lost_ack_rate:
+            self.counters["lost_acks"] += 1
+            raise ccxt.RequestTimeout(f"{self.id} simulated timeout after accepting {order_id}")
+        return self._public_order(order)
+
+    async def create_market_order(self, symbol, side, amount, price=None, params=None):
+        return await self.create_order(symbol, "market", side, amount, price, params)
+
+    async def fetch_order(self, id, symbol=None, params=None):
+        await self._request("order_status")
+        params = params or {}
+        order_id = id or self.by_client_id.get(params.get("clientOrderId") or params.get("clientOid"))
+        order = self.orders.get(order_id)
+        if order is None or (symbol and order["symbol"] != symbol):
+            raise ccxt.OrderNotFound(f"{self.id} order {id or params} not found")
+        return self._public_order(order)
+
+    async def fetch_balance(self, params=None):
+        await self._request("balance")
+        equity, used = self._equity()
+        usdt = {"free": equity - used, "used": used, "total": equity}
+        return {"USDT": usdt, "free": {"USDT": usdt["free"]}, "used": {"USDT": used},
+                "total": {"USDT": equity}, "info": {}}
+
+    async def fetch_positions(self, symbols=None, params=None):
+        await self._request("positions")
+        positions = []
+        for symbol, (contracts, entry) in self.positions.items():
+            if symbols and symbol not in symbols:
+                continue
+            mark = self._price(symbol)
+            positions.append({
+                "symbol": symbol, "side": "long" if contracts > 0 else "short",
+                "contracts": abs(contracts), "contractSize": 1.0, "entryPrice": entry, "markPrice": mark,
+                "notional": abs(contracts) * mark, "unrealizedPnl": contracts * (mark - entry),
+                "leverage": self.leverage, "marginMode": "cross", "info": {},
+            })
+        return positions
+
+    def stats(self):
+        return {**self.counters, "cash": round(self.cash, 2), "positions": len(self.positions),
+                "clock": self.clock.now_ms()}
+
+    async def close(self):
+        pass
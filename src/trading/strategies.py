@@ -1,77 +1,187 @@
 # src/trading/strategies.py
 import numpy as np
 from src.utils.logger import get_logger
+from src.trading.candles import as_series
+from src.trading.indicators import SMA, ReturnsSum
 
 logger = get_logger("Strategies")
 
+
+def close_matrix(block):
+    """Return the close prices of a candle block as a ``symbols x candles`` matrix.
+
+    ``block`` is either a 2-D matrix of closes or a 3-D ``symbols x candles x fields``
+    array, where fields are the ccxt layout ``[ts, o, h, l, c, v]`` or plain OHLCV.
+    Symbols with a shorter history can be left-padded with NaN; NaN windows yield 0.
+    """
+    block = np.asarray(block, dtype=np.float64)
+    if block.ndim == 3:
+        return block[:, :, 4 if block.shape[2] >= 6 else 3]
+    if block.ndim == 2:
+        return block
+    raise ValueError(f"Expected a 2-D or 3-D candle block, got shape {block.shape}")
+
+
+def _signals(buy, sell):
+    return np.where(buy, 1, np.where(sell, -1, 0)).astype(np.int8)
+
+
 class Strategy:
+    min_bars = 1
+
     def __init__(self, name):
         self.name = name
-    
+
+    def params(self):
+        """Tunable parameters, as accepted by the constructor."""
+        return {}
+
+    def analyze_many(self, block):
+        """Return one signal (1 buy, -1 sell, 0 hold) per symbol of ``block``."""
+        raise NotImplementedError
+
     def analyze(self, data):
+        series = as_series(data)
+        if len(series) < self.min_bars:
+            return 0
+        return int(self.analyze_many(series.close[None])[0])
+
+    def new_state(self):
+        """Incremental indicator state for one (symbol, timeframe) series."""
+        return {"bars": 0, "last_ts": None}
+
+    def update(self, state, candle):
+        """Feed one ccxt candle into ``state`` and return the signal, in constant time.
+
+        After the same candles, the signal equals ``analyze`` over them.
+        """
+        state["bars"] += 1
+        state["last_ts"] = candle[0]
+        signal = self.signal_from_state(state, candle[4])
+        return signal if state["bars"] >= self.min_bars else 0
+
+    def signal_from_state(self, state, close):
         raise NotImplementedError
 
 class MeanReversion(Strategy):
-    def __init__(self):
+    def __init__(self, period=20, band=0.01):
         super().__init__("Mean Reversion")
-        
-    def analyze(self, data):
-        if len(data) < 20:
+        self.period = int(period)
+        self.band = band  # SMA থেকে ±১% দূরে গেলে সিগন্যাল
+        self.min_bars = self.period
+
+    def params(self):
+        return {"period": self.period, "band": self.band}
+
+    def analyze_many(self, block):
+        closes = close_matrix(block)
+        if closes.shape[1] < self.min_bars:
+            return np.zeros(closes.shape[0], dtype=np.int8)
+
+        sma = closes[:, -self.period:].mean(axis=1)
+        last_close = closes[:, -1]
+        return _signals(last_close < sma * (1 - self.band), last_close > sma * (1 + self.band))
+
+    def new_state(self):
+        state = super().new_state()
+        state["sma"] = SMA(self.period)
+        return state
+
+    def signal_from_state(self, state, close):
+        sma = state["sma"].update(close)
+        if sma is None:
             return 0
-            
-        closes = np.array([d[4] for d in data])
-        sma = np.mean(closes[-20:])
-        last_close = closes[-1]
-        
-        if last_close < sma * 0.99:
+        if close < sma * (1 - self.band):
             return 1
-        elif last_close > sma * 1.01:
+        if close > sma * (1 + self.band):
             return -1
         return 0
 
 class Momentum(Strategy):
-    def __init__(self):
+    def __init__(self, window=5, threshold=0.01, min_bars=10):
         super().__init__("Momentum")
-        
-    def analyze(self, data):
-        if len(data) < 10:
+        self.window = int(window)
+        self.threshold = threshold
+        self.min_bars = max(int(min_bars), self.window + 1)
+
+    def params(self):
+        return {"window": self.window, "threshold": self.threshold, "min_bars": self.min_bars}
+
+    def analyze_many(self, block):
+        closes = close_matrix(block)
+        if closes.shape[1] < self.min_bars:
+            return np.zeros(closes.shape[0], dtype=np.int8)
+
+        # শেষ `window`টি রিটার্নের যোগফল
+        window = closes[:, -(self.window + 1):]
+        returns = np.diff(window, axis=1) / window[:, :-1]
+        momentum = returns.sum(axis=1)
+        return _signals(momentum > self.threshold, momentum < -self.threshold)
+
+    def new_state(self):
+        state = super().new_state()
+        state["momentum"] = ReturnsSum(self.window)
+        return state
+
+    def signal_from_state(self, state, close):
+        momentum = state["momentum"].update(close)
+        if momentum is None:
             return 0
-            
-        closes = np.array([d[4] for d in data])
-        returns = np.diff(closes) / closes[:-1]
-        momentum = np.sum(returns[-5:])
-        
-        if momentum > 0.01:
+        if momentum > self.threshold:
             return 1
-        elif momentum < -0.01:
+        if momentum < -self.threshold:
             return -1
         return 0
 
 class Scalping(Strategy):
-    def __init__(self):
+    min_bars = 5
+
+    def __init__(self, threshold=0.005):
         super().__init__("Scalping")
-        self.threshold = 0.005  # 0.5% প্রাইস মুভমেন্ট
-        
-    def analyze(self, data):
-        if len(data) < 5:
-            return 0
-            
+        self.threshold = threshold  # 0.5% প্রাইস মুভমেন্ট
+
+    def params(self):
+        return {"threshold": self.threshold}
+
+    def analyze_many(self, block):
+        closes = close_matrix(block)
+        if closes.shape[1] < self.min_bars:
+            return np.zeros(closes.shape[0], dtype=np.int8)
+
         # বর্তমান এবং পূর্ববর্তী ক্লোজ প্রাইস
-        current_price = data[-1][4]
-        previous_price = data[-2][4]
-        
+        current_price = closes[:, -1]
+        previous_price = closes[:, -2]
+
         # প্রাইস পরিবর্তনের শতাংশ
         price_change = (current_price - previous_price) / previous_price
-        
-        # সিগন্যাল জেনারেশন
-        if price_change < -0.005:  # 0.5% ডিপ
-            return 1  # কিনুন
-        elif price_change > 0.005:  # 0.5% রাইজ
-            return -1  # বিক্রি করুন
+
+        # সিগন্যাল জেনারেশন: ডিপে কিনুন, রাইজে বিক্রি করুন
+        return _signals(price_change < -self.threshold, price_change > self.threshold)
+
+    def new_state(self):
+        state = super().new_state()
+        state["change"] = ReturnsSum(1)
+        return state
+
+    def signal_from_state(self, state, close):
+        price_change = state["change"].update(close)
+        if price_change is None:
+            return 0
+        if price_change < -self.threshold:
+            return 1
+        if price_change > self.threshold:
+            return -1
         return 0
 
 STRATEGY_MAP = {
     "Mean Reversion": MeanReversion,
     "Momentum": Momentum,
     "Scalping": Scalping
-}
\ No newline at end of file
+}
+
+# অপটিমাইজারের ডিফল্ট সার্চ স্পেস
+PARAM_SPACE = {
+    "Mean Reversion": {"period": [10, 20, 30, 40], "band": [0.005, 0.01, 0.015, 0.02]},
+    "Momentum": {"window": [3, 5, 8, 13], "threshold": [0.005, 0.01, 0.015, 0.02]},
+    "Scalping": {"threshold": [0.002, 0.003, 0.005, 0.0075, 0.01]},
+}
@@ -0,0 +1,236 @@
+# src/trading/stream.py
+import asyncio
+import json
+import os
+import time
+import aiohttp
+import ccxt.async_support as ccxt
+import ccxt.pro as ccxtpro
+from src.utils.logger import get_logger
+from src.trading.candle_cache import timeframe_ms
+from src.trading.candles import CandleSeries
+from src.trading.data_fetcher import AsyncDataFetcher
+from src.trading.exchange_registry import get_exchange_registry
+from src.trading.rate_limiter import PRIORITY_DATA
+
+logger = get_logger("StreamingData")
+
+MARKET_DATA_SOURCE = os.getenv("MARKET_DATA_SOURCE", "rest")  # rest | stream | replay
+REPLAY_FEED_URL = os.getenv("REPLAY_FEED_URL", "ws://localhost:8765/ws")
+
+
+class BitgetStreamFeed:
+    """Push feed backed by ccxt.pro Bitget websockets."""
+
+    def __init__(self):
+        self.exchange = ccxtpro.bitget({'options': {'defaultType': 'swap'}})
+        self.queue = asyncio.Queue()
+        self.tasks = {}
+
+    async def _watch_candles(self, symbol, timeframe):
+        while True:
+            try:
+                candles = await self.exchange.watch_ohlcv(symbol, timeframe)
+                for candle in candles:
+                    await self.queue.put({"type": "candle", "symbol": symbol,
+                                          "timeframe": timeframe, "candle": candle})
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Candle stream error for {symbol}@{timeframe}: {e}")
+                await asyncio.sleep(1)
+
+    async def _watch_ticker(self, symbol):
+        while True:
+            try:
+                ticker = await self.exchange.watch_ticker(symbol)
+                await self.queue.put({"type": "ticker", "symbol": symbol, "ticker": ticker})
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ticker stream error for {symbol}: {e}")
+                await asyncio.sleep(1)
+
+    async def subscribe(self, pairs, timeframes):
+        if not self.exchange.markets:
+            registry = get_exchange_registry()
+            await registry.load_markets()
+            self.exchange.set_markets_from_exchange(registry.public)
+        for symbol in pairs:
+            if symbol not in self.tasks:
+                self.tasks[symbol] = asyncio.create_task(self._watch_ticker(symbol))
+            for timeframe in timeframes:
+                if (symbol, timeframe) not in self.tasks:
+                    self.tasks[(symbol, timeframe)] = asyncio.create_task(
+                        self._watch_candles(symbol, timeframe))
+
+    async def events(self):
+        while True:
+            yield await self.queue.get()
+
+    async def close(self):
+        for task in self.tasks.values():
+            task.cancel()
+        self.tasks.clear()
+        try:
+            await self.exchange.close()
+        except Exception:
+            pass
+
+
+class ReplayStreamFeed:
+    """Websocket client for the local replay server in ``src.trading.replay_feed``."""
+
+    def __init__(self, url=REPLAY_FEED_URL):
+        self.url = url
+        self.session = None
+        self.ws = None
+        self.subscriptions = set()
+
+    async def _connect(self):
+        if self.ws is None or self.ws.closed:
+            self.session = self.session or aiohttp.ClientSession()
+            self.ws = await self.session.ws_connect(self.url, heartbeat=30)
+            if self.subscriptions:
+                await self._send_subscriptions(self.subscriptions)
+
+    async def _send_subscriptions(self, keys):
+        await self.ws.send_json({"op": "subscribe",
+                                 "args": [{"symbol": s, "timeframe": tf} for s, tf in keys]})
+
+    async def subscribe(self, pairs, timeframes):
+        await self._connect()
+        new = {(s, tf) for s in pairs for tf in timeframes} - self.subscriptions
+        if new:
+            self.subscriptions |= new
+            await self._send_subscriptions(new)
+
+    async def events(self):
+        while True:
+            await self._connect()
+            async for msg in self.ws:
+                if msg.type == aiohttp.WSMsgType.TEXT:
+                    yield json.loads(msg.data)
+                elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                    break
+            logger.warning("Replay feed disconnected, reconnecting")
+            await asyncio.sleep(1)
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+        if self.session is not None:
+            await self.session.close()
+
+
+class StreamingDataFetcher(AsyncDataFetcher):
+    """AsyncDataFetcher that keeps candle and ticker state from a push feed.
+
+    REST is only used to backfill history the feed has not delivered yet,
+    and not at all when ``backfill`` is off (offline replay).
+    Every time a candle for a new timestamp arrives, the previous candle of
+    that series is closed and its key is published on ``closed``.
+    """
+
+    def __init__(self, feed, cache=None, backfill=True):
+        super().__init__(cache=cache)
+        self.feed = feed
+        self.backfill = backfill
+        self.tickers = {}
+        self.streaming = set()
+        self.closed = asyncio.Queue()
+        self._consumer = None
+
+    async def subscribe(self, pairs, timeframes):
+        await self.feed.subscribe(pairs, timeframes)
+        self.streaming |= {(s, tf) for s in pairs for tf in timeframes}
+        if self._consumer is None or self._consumer.done():
+            self._consumer = asyncio.create_task(self._consume())
+
+    async def _consume(self):
+        async for event in self.feed.events():
+            try:
+                self.on_event(event)
+            except Exception as e:
+                logger.error(f"Bad stream event {event!r}: {e}")
+
+    def on_event(self, event):
+        symbol = event["symbol"]
+        if event["type"] == "ticker":
+            self.tickers[symbol] = event["ticker"]
+            return
+
+        timeframe = event["timeframe"]
+        candle = event["candle"]
+        ring = self.cache.get(symbol, timeframe)
+        last_ts = ring.last_ts
+        ring.merge([candle])
+        ring.last_fetch = time.time()
+        if last_ts is not None and candle[0] > last_ts:
+            if self.store is not None:
+                # আগের ক্যান্ডেলটি এখন চূড়ান্ত, তাই ডিস্কে যোগ হয়
+                self._persist(symbol, timeframe, ring.window(2)[:-1], ring.last_fetch)
+            self.closed.put_nowait((symbol, timeframe))
+
+    def cached_price(self, symbol):
+        ticker = self.tickers.get(symbol)
+        if ticker is not None and ticker.get("last"):
+            return float(ticker["last"])
+        return super().cached_price(symbol)
+
+    async def fetch_ticker(self, symbol, priority=PRIORITY_DATA):
+        ticker = self.tickers.get(symbol)
+        if ticker is not None:
+            return ticker
+        if not self.backfill:
+            # রিপ্লেতে টিকার না থাকলে সর্বশেষ ক্যান্ডেলের ক্লোজ ব্যবহার
+            price = super().cached_price(symbol)
+            if price is None:
+                raise ccxt.ExchangeError(f"replay feed has no ticker or candle for {symbol} yet")
+            return {"symbol": symbol, "timestamp": int(time.time() * 1000), "last": price}
+        return await super().fetch_ticker(symbol, priority)
+
+    async def fetch_historical_data(self, symbol, timeframe='1m', limit=100, priority=PRIORITY_DATA, max_age=None):
+        ring = self.cache.get(symbol, timeframe)
+        has_history = ring.count >= limit or (ring.count and ring.history_limit >= limit)
+        if (symbol, timeframe) in self.streaming and (has_history or not self.backfill):
+            self.cache.hits += 1
+            return CandleSeries(ring.window(limit).copy())
+        return await super().fetch_historical_data(symbol, timeframe, limit, priority, max_age)
+
+    async def fetch_closed_candles(self, symbol, timeframe='1m', limit=100, max_age=None):
+        """Like ``fetch_historical_data`` but without the still-forming candle."""
+        candles = await self.fetch_historical_data(symbol, timeframe, limit + 1, max_age=max_age)
+        # স্ট্রিমে শেষ ক্যান্ডেলটি সবসময় চলমান ক্যান্ডেল
+        forming = (symbol, timeframe) in self.streaming or (
+            candles and candles.last_ts + timeframe_ms(timeframe) > time.time() * 1000)
+        if candles and forming:
+            candles = candles[:-1]
+        return candles[-limit:]
+
+    async def wait_for_closed(self, timeout=None):
+        """Wait for at least one candle close and return all closed keys, deduplicated."""
+        try:
+            first = await asyncio.wait_for(self.closed.get(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        keys = [first]
+        while not self.closed.empty():
+            key = self.closed.get_nowait()
+            if key not in keys:
+                keys.append(key)
+        return keys
+
+    async def close(self):
+        if self._consumer is not None:
+            self._consumer.cancel()
+        await self.feed.close()
+        await super().close()
+
+
+def create_data_fetcher(source=MARKET_DATA_SOURCE):
+    if source == "stream":
+        return StreamingDataFetcher(BitgetStreamFeed())
+    if source == "replay":
+        return StreamingDataFetcher(ReplayStreamFeed(), backfill=False)
+    return AsyncDataFetcher()
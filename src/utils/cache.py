@@ -0,0 +1,76 @@
+# src/utils/cache.py
+import asyncio
+import time
+
+
+class AsyncTTLCache:
+    """TTL cache for coroutine results with single-flight loading.
+
+    Concurrent ``get_or_load`` calls for a key that is not cached share one
+    in-flight load, so N identical requests cost one upstream call. Failed
+    loads are not cached. Must be used from a single event loop.
+    """
+
+    def __init__(self, ttl, max_entries=256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}  # key -> (expires_at, value)
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+        }
+
+    def invalidate(self, key=None):
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def _evict(self, now):
+        expired = [k for k, (expires, _) in self._entries.items() if expires <= now]
+        for k in expired:
+            del self._entries[k]
+        # এখনও বেশি থাকলে সবচেয়ে আগে মেয়াদ শেষ হবে এমনগুলো বাদ
+        overflow = len(self._entries) - self.max_entries
+        if overflow > 0:
+            for k in sorted(self._entries, key=lambda k: self._entries[k][0])[:overflow]:
+                del self._entries[k]
+        self.evictions += len(expired) + max(overflow, 0)
+
+    async def get_or_load(self, key, loader):
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            self.hits += 1
+            return entry[1]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task)
+
+        self.misses += 1
+        task = asyncio.ensure_future(loader())
+        self._inflight[key] = task
+        try:
+            # shield: একজন কলার বাতিল হলেও বাকিদের জন্য লোড চলতে থাকে
+            value = await asyncio.shield(task)
+        finally:
+            if self._inflight.get(key) is task:
+                del self._inflight[key]
+        now = time.monotonic()
+        self._entries[key] = (now + self.ttl, value)
+        if len(self._entries) > self.max_entries:
+            self._evict(now)
+        return value
@@ -1,26 +1,122 @@
 # src/utils/logger.py
+import atexit
+import datetime
+import json
 import logging
 import os
+import queue
+import time
 from logging.config import dictConfig
+from logging.handlers import QueueHandler, QueueListener
 
 LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'logs')
 os.makedirs(LOG_DIR, exist_ok=True)
 
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')  # text | json
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+# একই লাইন থেকে সেকেন্ডে সর্বোচ্চ কতগুলো DEBUG/INFO লগ (0 = সীমা নেই)
+LOG_RATE_LIMIT = float(os.getenv('LOG_RATE_LIMIT', '20'))
+LOG_RATE_BURST = int(os.getenv('LOG_RATE_BURST', '50'))
+
+# LogRecord-এর নিজস্ব অ্যাট্রিবিউট; বাকিগুলো `extra` থেকে আসে এবং JSON-এ যায়
+RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'suppressed'}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with ``extra`` fields as top-level keys."""
+
+    def format(self, record):
+        doc = {
+            'ts': datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRS and not key.startswith('_'):
+                doc[key] = value
+        if getattr(record, 'suppressed', 0):
+            doc['suppressed'] = record.suppressed
+        if record.exc_info or record.exc_text:
+            doc['exc'] = record.exc_text or self.formatException(record.exc_info)
+        return json.dumps(doc, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record):
+        line = super().format(record)
+        suppressed = getattr(record, 'suppressed', 0)
+        return f"{line} (+{suppressed} similar suppressed)" if suppressed else line
+
+
+class RateLimitFilter(logging.Filter):
+    """Token bucket per call site for records below WARNING.
+
+    Hot loops log from the same line over and over; past ``rate`` records per
+    second (after a ``burst``) they are dropped, and the next record let
+    through carries the number dropped in ``record.suppressed``.
+    """
+
+    def __init__(self, rate=LOG_RATE_LIMIT, burst=LOG_RATE_BURST):
+        super().__init__()
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.sites = {}  # (pathname, lineno) -> [tokens, updated, suppressed]
+
+    def filter(self, record):
+        if self.rate <= 0 or record.levelno >= logging.WARNING:
+            return True
+        now = time.monotonic()
+        site = self.sites.get((record.pathname, record.lineno))
+        if site is None:
+            site = self.sites[(record.pathname, record.lineno)] = [float(self.burst), now, 0]
+        site[0] = min(self.burst, site[0] + (now - site[1]) * self.rate)
+        site[1] = now
+        if site[0] < 1:
+            site[2] += 1
+            return False
+        site[0] -= 1
+        record.suppressed, site[2] = site[2], 0
+        return True
+
+
+class AsyncQueueHandler(QueueHandler):
+    """Hands records to the listener thread unformatted and never blocks the caller."""
+
+    def __init__(self, q):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # মেসেজ ফরম্যাটিং লিসেনার থ্রেডে হয়; শুধু ট্রেসব্যাক এখনই স্ট্রিং করা হয়
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
 LOG_CONFIG = {
     'version': 1,
     'formatters': {
         'default': {
+            '()': TextFormatter,
             'format': '%(asctime)s | %(name)s | %(levelname)s | %(message)s'
-        }
+        },
+        'json': {'()': JsonFormatter},
     },
     'handlers': {
-        'console': {'class': 'logging.StreamHandler', 'formatter': 'default'},
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'json' if LOG_FORMAT == 'json' else 'default'},
         'file': {
             'class': 'logging.handlers.TimedRotatingFileHandler',
-            'filename': os.path.join(LOG_DIR, 'trading.log'),
+            'filename': os.path.join(LOG_DIR, 'trading.jsonl' if LOG_FORMAT == 'json' else 'trading.log'),
             'when': 'midnight',
             'backupCount': 7,
-            'formatter': 'default'
+            'formatter': 'json' if LOG_FORMAT == 'json' else 'default'
         }
     },
     'root': {'level': os.getenv('LOG_LEVEL', 'INFO'), 'handlers': ['console', 'file']},
@@ -28,5 +124,46 @@ LOG_CONFIG = {
 
 dictConfig(LOG_CONFIG)
 
+# কনসোল/ফাইল হ্যান্ডলার লিসেনার থ্রেডে সরে যায়; রুট লগার শুধু কিউতে রাখে
+_root = logging.getLogger()
+_handlers = list(_root.handlers)
+_queue = queue.Queue(LOG_QUEUE_SIZE)
+_listener = QueueListener(_queue, *_handlers, respect_handler_level=True)
+_queue_handler = AsyncQueueHandler(_queue)
+_queue_handler.addFilter(RateLimitFilter())
+for _handler in _handlers:
+    _root.removeHandler(_handler)
+_root.addHandler(_queue_handler)
+_listener.start()
+
+
+def _restart_listener():
+    """Give a forked child its own queue and listener thread.
+
+    Threads do not survive a fork (gunicorn ``--preload`` workers), so
+    without this the child's records would sit in a queue nobody drains.
+    The parent's queue may have been locked mid-put, so it is replaced too.
+    """
+    global _queue, _listener
+    _queue = queue.Queue(LOG_QUEUE_SIZE)
+    _queue_handler.queue = _queue
+    _listener = QueueListener(_queue, *_handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def _stop_listener():
+    _listener.stop()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_listener)
+atexit.register(_stop_listener)
+
 def get_logger(name):
-    return logging.getLogger(name)
\ No newline at end of file
+    return logging.getLogger(name)
+
+def logging_stats():
+    return {
+        "queued": _queue.qsize(),
+        "dropped": _queue_handler.dropped,
+    }
@@ -0,0 +1,63 @@
+# src/utils/metrics.py
+import asyncio
+from prometheus_client import Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
+
+# স্ট্র্যাটেজি/রিস্ক চেক মাইক্রোসেকেন্ডে চলে, তাই ছোট বাকেট
+FAST_BUCKETS = (1e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 5e-2, 0.1)
+CYCLE_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+
+CYCLE_DURATION = Histogram(
+    "bot_cycle_duration_seconds", "Wall time of one trading loop cycle, sleep excluded",
+    buckets=CYCLE_BUCKETS)
+CYCLE_JOBS = Gauge("bot_cycle_jobs", "Pair/timeframe jobs evaluated in the last cycle")
+SCHEDULE_LAG = Histogram(
+    "bot_schedule_lag_seconds", "Time from a candle close to the start of its scheduled evaluation",
+    buckets=(0.5, 1, 1.5, 2, 3, 5, 10, 30, 60, 300))
+FETCH_LATENCY = Histogram(
+    "bot_fetch_latency_seconds", "Latency of one exchange market-data request",
+    ["endpoint", "timeframe"])
+ANALYZE_TIME = Histogram(
+    "bot_strategy_analyze_seconds", "Time spent in Strategy.analyze for one series",
+    ["strategy"], buckets=FAST_BUCKETS)
+RISK_CHECK_TIME = Histogram(
+    "bot_risk_check_seconds", "Time spent sizing a trade against the portfolio limits",
+    buckets=FAST_BUCKETS)
+PORTFOLIO_VAR = Gauge("bot_portfolio_var_usd", "Parametric VaR of the open positions")
+PORTFOLIO_GROSS = Gauge("bot_portfolio_gross_usd", "Gross USD exposure of the open positions")
+ORDER_LATENCY = Histogram(
+    "bot_order_latency_seconds", "Latency of order placement on the exchange", ["side"])
+ORDER_QUEUE_WAIT = Histogram(
+    "bot_order_queue_wait_seconds", "Time a signal waited in the order pipeline before execution",
+    buckets=FAST_BUCKETS + (0.25, 0.5, 1, 2.5, 5))
+ORDER_FILL_TIME = Histogram(
+    "bot_order_fill_seconds", "Time from order acknowledgement to a final order status")
+MONGO_INSERT_LATENCY = Histogram(
+    "bot_mongo_insert_seconds", "Latency of one trade journal insert_many batch")
+MONGO_INSERTED = Counter("bot_mongo_inserted_trades_total", "Trades written to Mongo")
+RETRIES = Counter("bot_retries_total", "Retries scheduled by tenacity", ["operation"])
+LOOP_LAG = Histogram(
+    "bot_event_loop_lag_seconds", "How late the event loop wakes up a sleeping task",
+    buckets=(1e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1, 2.5, 5))
+TRADES = Counter("bot_trades_total", "Executed trades", ["mode", "side"])
+RATE_LIMIT_WAIT = Histogram(
+    "bot_rate_limit_wait_seconds", "Time a request queued for an exchange rate-limit slot",
+    ["endpoint", "priority"], buckets=(1e-3, 1e-2, 5e-2, 0.1, 0.25, 0.5, 1, 2.5, 5, 10))
+RATE_LIMIT_SHED = Counter("bot_rate_limit_shed_total", "Low-priority requests dropped under pressure", ["endpoint"])
+RATE_LIMITED = Counter("bot_rate_limited_total", "429 responses from the exchange", ["endpoint"])
+
+
+def record_retry(retry_state):
+    """tenacity ``before_sleep`` hook that counts retries per decorated function."""
+    RETRIES.labels(retry_state.fn.__qualname__ if retry_state.fn else "unknown").inc()
+
+
+async def monitor_loop_lag(interval=0.5):
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        LOOP_LAG.observe(max(loop.time() - started - interval, 0.0))
+
+
+def render_latest():
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,6 @@
+# src/utils/paths.py
+import os
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# স্পিল ফাইল, মার্কেট ক্যাশ ও OHLCV স্টোর সব এখানে
+DATA_DIR = os.getenv("DATA_DIR", os.path.join(ROOT_DIR, "data"))
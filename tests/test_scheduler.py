@@ -0,0 +1,114 @@
+from src.trading.scanner import CandleScheduler
+
+KEY = ("BTC/USDT:USDT", "1m")
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_scheduler(now=1000.0, **kwargs):
+    clock = FakeClock(now)
+    options = {"settle": 1.5, "jitter": 0, "retry": 2, "max_retries": 3, "clock": clock}
+    options.update(kwargs)
+    return CandleScheduler(**options), clock
+
+
+def test_new_jobs_run_immediately_then_at_next_close():
+    schedule, clock = make_scheduler()
+    schedule.set_jobs([KEY])
+    assert schedule.next_due() == 1000.0
+    assert schedule.pop_due() == [KEY]
+    # 1m candle closing at 1020s, evaluated after the settle delay
+    assert schedule.next_due() == 1021.5
+
+    clock.now = 1021.4
+    assert schedule.pop_due() == []
+    clock.now = 1021.5
+    assert schedule.pop_due() == [KEY]
+    assert schedule.next_due() == 1081.5
+    assert schedule.missed == 0
+    assert schedule.runs == 2
+
+
+def test_expected_close_is_the_candle_that_just_closed():
+    schedule, clock = make_scheduler()
+    schedule.set_jobs([KEY])
+    schedule.pop_due()
+    clock.now = 1021.5
+    schedule.pop_due()
+    # the candle opened at 960s closed at 1020s
+    assert schedule.expected_close(KEY) == 960_000
+    assert schedule.expected_close(("ETH/USDT:USDT", "1m")) is None
+
+
+def test_missed_boundaries_are_counted_and_run_once():
+    schedule, clock = make_scheduler()
+    schedule.set_jobs([KEY])
+    schedule.pop_due()
+    clock.now = 1021.5 + 3 * 60
+    assert schedule.pop_due() == [KEY]
+    assert schedule.missed == 3
+    assert schedule.next_due() == 1261.5
+    assert schedule.pop_due() == []
+
+
+def test_retry_reruns_the_same_boundary_up_to_max_retries():
+    schedule, clock = make_scheduler()
+    schedule.set_jobs([KEY])
+    schedule.pop_due()
+    clock.now = 1021.5
+    schedule.pop_due()
+    assert not schedule.retrying(KEY)
+
+    for attempt in range(1, 4):
+        assert schedule.retry(KEY)
+        assert schedule.next_due() == clock.now + 2
+        clock.now += 2
+        assert schedule.pop_due() == [KEY]
+        assert schedule.retrying(KEY)
+        assert schedule.jobs[KEY][2] == attempt
+    assert not schedule.retry(KEY)
+    assert schedule.retries == 3
+    assert schedule.next_due() == 1081.5
+
+    # the next boundary starts with a fresh retry budget
+    clock.now = 1081.5
+    schedule.pop_due()
+    assert not schedule.retrying(KEY)
+    assert schedule.retry(KEY)
+
+
+def test_reset_makes_every_job_due_now():
+    other = ("ETH/USDT:USDT", "5m")
+    schedule, clock = make_scheduler()
+    schedule.set_jobs([KEY, other])
+    schedule.pop_due()
+    clock.now = 1030.0
+    schedule.reset()
+    assert schedule.next_due() == 1030.0
+    assert sorted(schedule.pop_due()) == sorted([KEY, other])
+    assert schedule.next_due() == 1081.5
+
+
+def test_removed_jobs_are_dropped():
+    other = ("ETH/USDT:USDT", "1m")
+    schedule, clock = make_scheduler()
+    schedule.set_jobs([KEY, other])
+    schedule.pop_due()
+    schedule.set_jobs([KEY])
+    assert not schedule.retry(other)
+    clock.now = 1100.0
+    assert schedule.pop_due() == [KEY]
+    assert schedule.stats()["jobs"] == 1
+
+
+def test_jitter_offset_is_stable_and_bounded():
+    schedule, _ = make_scheduler(jitter=2)
+    offsets = {key: schedule._offset(key) for key in [KEY, ("ETH/USDT:USDT", "1m"), ("BTC/USDT:USDT", "1d")]}
+    assert all(1.5 <= offset <= 3.5 for offset in offsets.values())
+    assert offsets == {key: schedule._offset(key) for key in offsets}
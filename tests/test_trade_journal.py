@@ -0,0 +1,151 @@
+import asyncio
+import os
+from bson import ObjectId, json_util
+from pymongo.errors import AutoReconnect
+from src.database.memory import InMemoryDatabase
+from src.database.trade_journal import TradeJournal
+from src.database.trade_stats import TradeRollups, rollup_id
+
+
+def make_journal(tmp_path, **kwargs):
+    db = InMemoryDatabase()
+    options = {"batch_size": 100, "spill_path": str(tmp_path / "spill.jsonl"),
+               "dead_letter_path": str(tmp_path / "rejected.jsonl"),
+               "rollups": TradeRollups(db.trade_stats)}
+    options.update(kwargs)
+    return db, TradeJournal(db.trades, **options)
+
+
+def trade(n, **fields):
+    return {"pair": "BTC/USDT:USDT", "side": "buy", "amount": 10.0, "profit": 1.0, "mode": "paper", "n": n, **fields}
+
+
+def read_lines(path):
+    with open(path) as f:
+        return [json_util.loads(line) for line in f if line.strip()]
+
+
+def total_trades(db):
+    doc = next((d for d in db.trade_stats.docs if d["_id"] == rollup_id()), None)
+    return doc["trades"] if doc else 0
+
+
+def test_flush_writes_in_batches(tmp_path):
+    db, journal = make_journal(tmp_path)
+
+    async def run():
+        for n in range(250):
+            await journal.append(trade(n))
+        await journal.stop()
+
+    asyncio.run(run())
+    assert len(db.trades.docs) == 250
+    assert db.calls["trades.insert_many"] == 3
+    assert journal.stats()["flushed"] == 250
+    assert total_trades(db) == 250
+    assert not os.path.exists(journal.spill_path)
+
+
+def test_duplicate_keys_are_skipped_not_dead_lettered(tmp_path):
+    db, journal = make_journal(tmp_path)
+    existing = trade(0, _id=ObjectId())
+    db.trades.docs.append(dict(existing))
+
+    async def run():
+        await journal.append(dict(existing))
+        await journal.append(trade(1))
+        await journal.stop()
+
+    asyncio.run(run())
+    assert len(db.trades.docs) == 2
+    stats = journal.stats()
+    assert stats["flushed"] == 1
+    assert stats["rejected"] == 0
+    assert total_trades(db) == 1
+    assert not os.path.exists(journal.dead_letter_path)
+    assert not os.path.exists(journal.spill_path)
+
+
+def test_rejected_trades_go_to_the_dead_letter_file(tmp_path):
+    db, journal = make_journal(tmp_path)
+    db.trades.validator = lambda doc: "amount must be positive" if doc["amount"] <= 0 else None
+
+    async def run():
+        await journal.append(trade(0))
+        await journal.append(trade(1, amount=-5.0))
+        await journal.flush()
+        # পরের ফ্লাশে বাতিল ট্রেড আবার চেষ্টা হয় না
+        await journal.append(trade(2))
+        await journal.stop()
+
+    asyncio.run(run())
+    assert sorted(d["n"] for d in db.trades.docs) == [0, 2]
+    assert journal.stats()["flushed"] == 2
+    assert journal.stats()["rejected"] == 1
+    assert total_trades(db) == 2
+    rejected = read_lines(journal.dead_letter_path)
+    assert len(rejected) == 1
+    assert rejected[0]["error"]["code"] == 121
+    assert rejected[0]["trade"]["n"] == 1
+    assert not os.path.exists(journal.spill_path)
+
+
+def test_failed_flush_spills_and_next_flush_replays(tmp_path):
+    db, journal = make_journal(tmp_path, batch_size=2)
+    insert_many = db.trades.insert_many
+
+    async def unreachable(docs, ordered=True):
+        raise AutoReconnect("connection refused")
+
+    async def run():
+        db.trades.insert_many = unreachable
+        for n in range(5):
+            await journal.append(trade(n))
+        assert await journal.flush() == 0
+        assert len(read_lines(journal.spill_path)) == 5
+        assert journal.interval == 2 * journal.flush_interval
+
+        db.trades.insert_many = insert_many
+        await journal.append(trade(5))
+        # ফ্লাশটি ব্যাকগ্রাউন্ড ফ্লাশারও করতে পারে; stop সব শেষ হওয়া পর্যন্ত অপেক্ষা করে
+        await journal.stop()
+
+    asyncio.run(run())
+    assert sorted(d["n"] for d in db.trades.docs) == list(range(6))
+    stats = journal.stats()
+    assert stats["spilled"] == 5
+    assert stats["failures"] == 1
+    assert stats["flushed"] == 6
+    assert not stats["spill_pending"]
+    assert journal.interval == journal.flush_interval
+    assert total_trades(db) == 6
+
+
+def test_leftover_replay_file_is_merged_not_overwritten(tmp_path):
+    db, journal = make_journal(tmp_path)
+    # আগের রিপ্লে ক্র্যাশ করেছিল: .replay ফাইলে অর্ধেক লেখা শেষ লাইন, পাশে নতুন স্পিল
+    journal._append_lines(journal.replay_path, [trade(0, _id=ObjectId()), trade(1, _id=ObjectId())])
+    with open(journal.replay_path, "a") as f:
+        f.write('{"pair": "BTC/USDT:USDT", "n": ')
+    journal._append_lines(journal.spill_path, [trade(2, _id=ObjectId())])
+
+    async def run():
+        await journal.append(trade(3))
+        await journal.stop()
+
+    asyncio.run(run())
+    assert sorted(d["n"] for d in db.trades.docs) == [0, 1, 2, 3]
+    assert not os.path.exists(journal.replay_path)
+    assert not os.path.exists(journal.spill_path)
+
+
+def test_stop_flushes_the_buffer(tmp_path):
+    db, journal = make_journal(tmp_path, flush_interval=60)
+
+    async def run():
+        for n in range(3):
+            await journal.append(trade(n))
+        await journal.stop()
+
+    asyncio.run(run())
+    assert len(db.trades.docs) == 3